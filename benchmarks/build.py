@@ -0,0 +1,163 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+End-to-end benchmark of 'build_project', measuring the time taken by each stage
+of the pipeline and the peak memory usage for synthetic designs of several
+scales. Run with:
+
+    $> python3 -m benchmarks.build --scale small medium large
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+from timeit import default_timer as timer
+
+from .generator import SCALES, design_parameters, generate_design
+
+# Stages of the pipeline, in the order they are run
+STAGES = [
+    "Building scope", "Preprocessor evaluation", "YAML parse",
+    "Intrinsic construction", "Validation", "Elaboration", "Checking",
+]
+
+def measure_build(top_file, includes, run_checks=False):
+    """ Build a design, measuring each stage of the pipeline.
+
+    Args:
+        top_file  : Path to the top file of the design
+        includes  : List of files and folders to include
+        run_checks: Whether to run the rule checkers (default: False)
+
+    Returns:
+        dict: Time taken by each stage and in total (in seconds), the number of
+              objects produced, and the peak memory usage (in megabytes)
+    """
+    # NOTE: Imported here so that the cost is counted within the worker process
+    from blade.project import build_project
+    from blade.profiling import BuildProfile, peak_rss
+    from blade.reporting import get_report, ReportCommon
+    get_report().verbosity = ReportCommon.ERROR
+    profiler = BuildProfile(top_file)
+    start    = timer()
+    build_project(
+        top_file, includes=includes, run_checks=run_checks, quiet=True,
+        profiler=profiler
+    )
+    total = timer() - start
+    return {
+        "stages": { x["name"]: x["wall"] for x in profiler.stages },
+        "total" : total,
+        "counts": profiler.counts,
+        "memory": peak_rss(),
+    }
+
+def measure_scale(path, scale, run_checks=False, **overrides):
+    """
+    Generate a design at a scale and measure building it. The build runs within
+    a fresh process, so that the peak memory usage only covers this build.
+
+    Args:
+        path      : Directory to generate the design into
+        scale     : Name of the scale of the design (see SCALES)
+        run_checks: Whether to run the rule checkers (default: False)
+        overrides : Values to override individual design parameters with
+
+    Returns:
+        dict: The measurements returned by 'measure_build'
+    """
+    top_file = generate_design(path, scale, **overrides)
+    context  = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(measure_build, (top_file, [path], run_checks))
+
+def print_results(results):
+    """ Print a table of measurements, with a column for each scale.
+
+    Args:
+        results: Dictionary of measurements from 'measure_build' by scale
+    """
+    scales = list(results.keys())
+    rows   = [("Stage", scales)]
+    for stage in STAGES:
+        if any(stage in x["stages"] for x in results.values()):
+            rows.append((stage, [
+                "%0.03fs" % x["stages"][stage] if stage in x["stages"] else "-"
+                for x in results.values()
+            ]))
+    rows.append(("Total", ["%0.03fs" % x["total"] for x in results.values()]))
+    for count in next(iter(results.values()))["counts"]:
+        rows.append((count.capitalize(), [str(x["counts"][count]) for x in results.values()]))
+    rows.append(("Peak memory", ["%0.01fMB" % x["memory"] for x in results.values()]))
+    name_w = max(len(x[0]) for x in rows)
+    col_w  = max(len(y) for x in rows for y in x[1])
+    for name, values in rows:
+        print(name.ljust(name_w) + "  " + "  ".join(x.rjust(col_w) for x in values))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure each stage of building synthetic designs"
+    )
+    parser.add_argument(
+        "--scale", "-s", nargs="+", choices=list(SCALES.keys()),
+        default=list(SCALES.keys()), help="Scales of design to measure"
+    )
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="PARAM=VALUE",
+        help="Override a parameter of the generated designs (e.g. depth=6)"
+    )
+    parser.add_argument(
+        "--run-checks", action="store_true", default=False,
+        help="Run the rule checkers as part of each build"
+    )
+    parser.add_argument(
+        "--keep", default=None,
+        help="Directory to generate designs into, which is kept afterwards"
+    )
+    parser.add_argument(
+        "--json", default=None, help="Path to write the measurements to as JSON"
+    )
+    args = parser.parse_args()
+
+    # Parse the parameter overrides
+    overrides = {}
+    for item in args.set:
+        key, value = item.split("=", 1)
+        overrides[key.strip()] = float(value) if "." in value else int(value)
+    design_parameters(**overrides)
+
+    # Measure each scale in turn
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = args.keep if args.keep else tmp_dir
+        for scale in args.scale:
+            results[scale] = measure_scale(
+                os.path.join(root, scale), scale, run_checks=args.run_checks,
+                **overrides
+            )
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=4)
+
+if __name__ == "__main__":
+    main()
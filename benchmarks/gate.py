@@ -0,0 +1,252 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Performance regression gate. Builds a set of reference designs, and compares
+the time taken by each stage, the number of objects produced, and the peak
+memory usage against a stored baseline - failing if any metric has regressed
+beyond a tolerance. Record a baseline, then check a change against it with:
+
+    $> python3 -m benchmarks.gate --update
+    $> python3 -m benchmarks.gate
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+
+from .build import STAGES, measure_scale
+from .generator import design_parameters
+
+# Reference designs measured by the gate
+REFERENCE_DESIGNS = {
+    "small"    : design_parameters("small"),
+    "medium"   : design_parameters("medium"),
+    "registers": design_parameters("small", groups=4, registers=32, fields=8),
+}
+
+# Version of the baseline file format
+BASELINE_VERSION = 1
+
+def machine_description():
+    """ Describe the machine and interpreter running the benchmarks """
+    return {
+        "platform": platform.platform(),
+        "machine" : platform.machine(),
+        "python"  : platform.python_version(),
+        "cpus"    : os.cpu_count(),
+    }
+
+def measure_designs(designs, repeat=3, run_checks=False):
+    """
+    Measure every reference design, repeating each build and taking the best
+    time of each stage (the least disturbed by other activity on the machine).
+
+    Args:
+        designs   : Names of the reference designs to measure
+        repeat    : Number of times to build each design (default: 3)
+        run_checks: Whether to run the rule checkers (default: False)
+
+    Returns:
+        dict: Measurements of each design, by name
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in designs:
+            params = REFERENCE_DESIGNS[name]
+            runs   = [
+                measure_scale(os.path.join(tmp_dir, name), None, run_checks=run_checks, **params)
+                for _ in range(max(1, repeat))
+            ]
+            results[name] = {
+                "parameters": params,
+                "run_checks": run_checks,
+                "stages"    : {
+                    x: min(y["stages"][x] for y in runs) for x in runs[0]["stages"]
+                },
+                "total"     : min(x["total"] for x in runs),
+                "counts"    : runs[0]["counts"],
+                "memory"    : min(x["memory"] for x in runs),
+            }
+    return results
+
+def compare_design(baseline, current, time_tol, memory_tol, min_time):
+    """ Compare the measurements of a design against its baseline.
+
+    Args:
+        baseline  : Measurements of the design from the baseline
+        current   : Measurements of the design from this run
+        time_tol  : Relative increase in time allowed (e.g. 0.2 for 20%)
+        memory_tol: Relative increase in peak memory allowed
+        min_time  : Increase in time (in seconds) that is always allowed, so
+                    that noise on very short stages is ignored
+
+    Returns:
+        list: Tuples of metric, baseline value, current value, and whether it
+              has regressed
+    """
+    rows = []
+    def relative(base, now, tol, slack=0):
+        return (now > base * (1 + tol)) and ((now - base) > slack)
+    for stage in STAGES:
+        if stage in baseline["stages"] or stage in current["stages"]:
+            base = baseline["stages"].get(stage, 0)
+            now  = current["stages"].get(stage, 0)
+            rows.append((stage, base, now, relative(base, now, time_tol, min_time)))
+    rows.append((
+        "Total", baseline["total"], current["total"],
+        relative(baseline["total"], current["total"], time_tol, min_time)
+    ))
+    # NOTE: Object counts must match exactly, a difference means that the design
+    #       is no longer being built in the same way
+    for count in sorted(set(baseline["counts"]) | set(current["counts"])):
+        base = baseline["counts"].get(count, None)
+        now  = current["counts"].get(count, None)
+        rows.append((count.capitalize(), base, now, base != now))
+    rows.append((
+        "Peak memory", baseline["memory"], current["memory"],
+        relative(baseline["memory"], current["memory"], memory_tol)
+    ))
+    return rows
+
+def print_comparison(name, rows):
+    """ Print the comparison of a design against its baseline.
+
+    Args:
+        name: Name of the design
+        rows: Comparison returned by 'compare_design'
+    """
+    def fmt(metric, value):
+        if value == None:
+            return "-"
+        elif metric == "Peak memory":
+            return "%0.01fMB" % value
+        elif isinstance(value, float):
+            return "%0.03fs" % value
+        return str(value)
+    print(f"Design: {name}")
+    table = [("Metric", "Baseline", "Current", "Change", "")]
+    for metric, base, now, regressed in rows:
+        change = "-"
+        if isinstance(base, (int, float)) and isinstance(now, (int, float)) and base:
+            change = "%+0.01f%%" % (100 * (now - base) / base)
+        table.append((
+            metric, fmt(metric, base), fmt(metric, now), change,
+            "REGRESSED" if regressed else "",
+        ))
+    widths = [max(len(x[i]) for x in table) for i in range(4)]
+    for row in table:
+        print("  " + row[0].ljust(widths[0]) + "  " + "  ".join(
+            x.rjust(w) for x, w in zip(row[1:4], widths[1:])
+        ) + ("  " + row[4] if row[4] else ""))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check for performance regressions against a stored baseline"
+    )
+    parser.add_argument(
+        "--baseline", "-b", default=os.path.join(os.path.dirname(__file__), "baseline.json"),
+        help="Path to the baseline (default: benchmarks/baseline.json)"
+    )
+    parser.add_argument(
+        "--update", "-u", action="store_true", default=False,
+        help="Record a new baseline rather than comparing against it"
+    )
+    parser.add_argument(
+        "--design", "-d", nargs="+", choices=list(REFERENCE_DESIGNS.keys()),
+        default=None, help="Reference designs to measure (default: all)"
+    )
+    parser.add_argument(
+        "--repeat", "-r", type=int, default=3,
+        help="Number of times to build each design, keeping the best times (default: 3)"
+    )
+    parser.add_argument(
+        "--run-checks", action="store_true", default=False,
+        help="Run the rule checkers as part of each build"
+    )
+    parser.add_argument(
+        "--time-tolerance", type=float, default=0.2,
+        help="Relative increase in the time of any stage allowed (default: 0.2)"
+    )
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=0.1,
+        help="Relative increase in peak memory allowed (default: 0.1)"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.02,
+        help="Increase in the time of any stage that is always allowed (default: 0.02s)"
+    )
+    args = parser.parse_args()
+
+    # Load the baseline (unless recording a new one)
+    baseline = None
+    if not args.update:
+        if not os.path.isfile(args.baseline):
+            print(f"No baseline found at {args.baseline}, record one with --update")
+            sys.exit(2)
+        with open(args.baseline, "r") as fh:
+            baseline = json.load(fh)
+        if baseline.get("version", None) != BASELINE_VERSION:
+            print(f"Baseline {args.baseline} has an unsupported version, record it again with --update")
+            sys.exit(2)
+        if baseline["machine"] != machine_description():
+            print("WARNING: The baseline was recorded on a different machine or interpreter")
+
+    # Measure the reference designs
+    designs = args.design if args.design else (
+        [x for x in REFERENCE_DESIGNS if x in baseline["designs"]] if baseline else
+        list(REFERENCE_DESIGNS.keys())
+    )
+    current = measure_designs(designs, repeat=args.repeat, run_checks=args.run_checks)
+
+    # Store a new baseline
+    if args.update:
+        with open(args.baseline, "w") as fh:
+            json.dump({
+                "version": BASELINE_VERSION,
+                "machine": machine_description(),
+                "designs": current,
+            }, fh, indent=4)
+        print(f"Recorded baseline for {len(current)} designs in {args.baseline}")
+        return
+
+    # Compare against the baseline
+    failed = False
+    for name, result in current.items():
+        if name not in baseline["designs"]:
+            print(f"Design: {name}\n  No baseline recorded for this design")
+            failed = True
+            continue
+        base = baseline["designs"][name]
+        if base["parameters"] != result["parameters"] or base["run_checks"] != result["run_checks"]:
+            print(f"Design: {name}\n  The design has changed since the baseline was recorded")
+            failed = True
+            continue
+        rows = compare_design(
+            base, result, args.time_tolerance, args.memory_tolerance, args.min_time
+        )
+        print_comparison(name, rows)
+        failed = failed or any(x[3] for x in rows)
+    print("FAILED: Performance has regressed" if failed else "PASSED")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
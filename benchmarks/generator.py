@@ -0,0 +1,212 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Generates synthetic designs for benchmarking. The design is a hierarchy of !Mod
+types, where every type below the top is declared in its own file. Each level
+of the hierarchy instantiates types from the level below it, and the types on
+the lowest level include a file of register groups. Preprocessor directives are
+sprinkled through the files, so that every stage of the pipeline has work to do.
+"""
+
+import os
+import random
+
+# Parameters of a design, along with their default values
+DEFAULTS = {
+    "mod_types"  : 4,    # Number of !Mod types on each level below the top
+    "depth"      : 3,    # Number of levels in the hierarchy (including the top)
+    "children"   : 2,    # Number of !ModInst declarations within each !Mod
+    "instances"  : 2,    # Number of instances created by each !ModInst
+    "ports"      : 2,    # Number of input and output port pairs on each block
+    "groups"     : 1,    # Number of !Group declarations for each leaf !Mod type
+    "registers"  : 4,    # Number of !Reg declarations within each !Group
+    "fields"     : 4,    # Number of !Field declarations within each !Reg
+    "for_density": 0.25, # Fraction of registers declared within a '#for' loop
+    "if_density" : 0.25, # Fraction of !ModInst declarations within an '#if'
+    "seed"       : 0,    # Seed for choosing the types instantiated
+}
+
+# Named scales of design used by the benchmarks
+SCALES = {
+    "small" : { "mod_types": 2, "depth": 3, "children": 2, "instances": 2 },
+    "medium": { "mod_types": 4, "depth": 4, "children": 2, "instances": 3, "registers": 8 },
+    "large" : { "mod_types": 8, "depth": 5, "children": 3, "instances": 3, "registers": 16 },
+}
+
+def design_parameters(scale=None, **overrides):
+    """ Resolve the full set of parameters for a design.
+
+    Args:
+        scale    : Name of a scale from SCALES to start from (optional)
+        overrides: Values to override individual parameters with
+
+    Returns:
+        dict: Every parameter of the design
+    """
+    unknown = [x for x in overrides if x not in DEFAULTS]
+    if unknown:
+        raise Exception(f"Unknown design parameters: {', '.join(unknown)}")
+    if scale and scale not in SCALES:
+        raise Exception(f"Unknown design scale: {scale}")
+    return { **DEFAULTS, **(SCALES[scale] if scale else {}), **overrides }
+
+def mod_name(level, index):
+    """ Name of the !Mod type at a position in the hierarchy """
+    return "bench_top" if level == 0 else f"bench_l{level}_{index}"
+
+def generate_common(params):
+    """ Generate the file of definitions shared by every !Mod.
+
+    Args:
+        params: Parameters of the design
+
+    Returns:
+        list: Lines of the file
+    """
+    lines = ["#define BENCH_DATA_W 32"]
+    # NOTE: Options alternate between 1 and 2, as a value of 0 is not substituted
+    #       into an '#if' expression
+    for index in range(params["children"]):
+        lines.append(f"#define BENCH_OPT_{index} {1 + (index % 2)}")
+    lines += [
+        f"- !Def [BENCH_COUNT, {params['instances']}, \"Instances of each child\"]",
+        "- !His",
+        "  name : bench_sig",
+        "  ports:",
+        "  - !Port [data, BENCH_DATA_W, \"Data\", 1, 0, Master]",
+        "  - !Port [valid, 1, \"Valid\", 1, 0, Master]",
+    ]
+    return lines
+
+def generate_registers(params, name):
+    """ Generate the register groups for a leaf !Mod.
+
+    Args:
+        params: Parameters of the design
+        name  : Name of the !Mod the groups belong to
+
+    Returns:
+        list: Lines of the file
+    """
+    width  = max(1, 32 // max(1, params["fields"]))
+    looped = int(params["registers"] * params["for_density"] + 0.5)
+    def register(reg_name):
+        reg = ["  - !Reg", f"    name: {reg_name}", "    fields:"]
+        for index in range(params["fields"]):
+            reg.append(
+                f"    - !Field [field_{index}, {width}, {index * width}, U, 0, \"Field {index}\"]"
+            )
+        return reg
+    lines = []
+    for group in range(params["groups"]):
+        lines += ["- !Group", f"  name: {name}_grp_{group}", "  regs:"]
+        if looped > 0:
+            lines.append(f"#for idx in range({looped})")
+            lines += register("loop_$(idx)")
+            lines.append("#endfor")
+        for index in range(params["registers"] - looped):
+            lines += register(f"reg_{index}")
+    return lines
+
+def generate_mod(params, level, index, child_types):
+    """ Generate the declaration of a !Mod.
+
+    Args:
+        params     : Parameters of the design
+        level      : Level of the hierarchy the !Mod sits on
+        index      : Index of the !Mod within its level
+        child_types: Indices of the !Mod types it instantiates from the level below
+
+    Returns:
+        list: Lines of the file
+    """
+    name  = mod_name(level, index)
+    lines = ['#include "bench_common.yaml"']
+    for child in sorted(set(child_types)):
+        lines.append(f'#include "{mod_name(level + 1, child)}.yaml"')
+    if not child_types and params["groups"] > 0:
+        lines.append(f'#include "{name}_regs.yaml"')
+    lines += ["- !Mod", f"  name : {name}", "  ports:"]
+    for port in range(params["ports"]):
+        lines.append(f"  - !HisRef [in_{port}, bench_sig, \"Input {port}\", 1, Slave]")
+        lines.append(f"  - !HisRef [out_{port}, bench_sig, \"Output {port}\", 1, Master]")
+    if not child_types:
+        return lines
+    # Instantiate the children, some of which depend on a defined value
+    conditional = int(len(child_types) * params["if_density"] + 0.5)
+    lines.append("  modules:")
+    for inst, child in enumerate(child_types):
+        decl = f"  - !ModInst [u_{inst}, {mod_name(level + 1, child)}, \"Child {inst}\""
+        if inst < conditional:
+            lines += [
+                f"#if BENCH_OPT_{inst} == 1",
+                f"{decl}, 1]",
+                "#else",
+                f"{decl}, BENCH_COUNT]",
+                "#endif",
+            ]
+        else:
+            lines.append(f"{decl}, BENCH_COUNT]")
+    # Fan each input out to every child, and drive each output from the first
+    # child - tying off the outputs of the others
+    lines.append("  connections:")
+    for port in range(params["ports"]):
+        lines += ["  - !Connect", "    points:", f"    - !Point [in_{port}]"]
+        for inst in range(len(child_types)):
+            lines.append(f"    - !Point [in_{port}, u_{inst}]")
+        lines += [
+            "  - !Connect", "    points:",
+            f"    - !Point [out_{port}, u_0]", f"    - !Point [out_{port}]",
+        ]
+    lines.append("  defaults:")
+    for port in range(params["ports"]):
+        for inst in range(len(child_types)):
+            lines.append(f"  - !Point [out_{port}, u_{inst}]")
+    return lines
+
+def generate_design(path, scale=None, **overrides):
+    """ Generate a synthetic design into a directory.
+
+    Args:
+        path     : Directory to write the design into (created if necessary)
+        scale    : Name of a scale from SCALES to start from (optional)
+        overrides: Values to override individual parameters with (see DEFAULTS)
+
+    Returns:
+        str: Path to the top file of the design
+    """
+    params = design_parameters(scale, **overrides)
+    rng    = random.Random(params["seed"])
+    files  = { "bench_common.yaml": generate_common(params) }
+    for level in range(params["depth"]):
+        count = 1 if level == 0 else params["mod_types"]
+        leaf  = (level == params["depth"] - 1)
+        for index in range(count):
+            child_types = [] if leaf else [
+                rng.randrange(params["mod_types"]) for _ in range(params["children"])
+            ]
+            name = mod_name(level, index)
+            files[f"{name}.yaml"] = generate_mod(params, level, index, child_types)
+            if leaf and params["groups"] > 0:
+                files[f"{name}_regs.yaml"] = generate_registers(params, name)
+    os.makedirs(path, exist_ok=True)
+    for file_name, lines in files.items():
+        with open(os.path.join(path, file_name), 'w') as fh:
+            fh.write("\n".join(lines) + "\n")
+    return os.path.join(path, f"{mod_name(0, 0)}.yaml")
@@ -0,0 +1,340 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Micro-benchmarks of the preprocessor, measuring loading and evaluating a file,
+resolving defined values, expanding '#for' loops, and evaluating expressions on
+generated files. One parameter can be swept across several values to show how
+the cost of each operation scales with it. Run with:
+
+    $> python3 -m benchmarks.preprocessor --sweep defines=10,100,1000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from timeit import default_timer as timer
+
+from blade.preprocessor import Preprocessor
+from blade.preprocessor.common import evaluate_expression, preprocessor_regex
+from blade.preprocessor.for_block import PreprocessorForBlock
+from blade.preprocessor.line import PreprocessorLine
+from blade.preprocessor.statement import PreprocessorStatement
+from blade.reporting import get_report, ReportCommon
+
+# Parameters of a generated file, along with their default values
+DEFAULTS = {
+    "lines"     : 1000, # Number of lines of YAML in the file
+    "directives": 0.1,  # Fraction of lines wrapped within an '#if' block
+    "defines"   : 50,   # Number of '#define' statements in the file
+    "loops"     : 4,    # Number of '#for' loops in the file
+    "loop_size" : 8,    # Number of iterations of each '#for' loop
+    "loop_lines": 4,    # Number of lines within each '#for' loop
+}
+
+# Benchmarks that can be run, and the unit each is reported in
+BENCHMARKS = {
+    "load_file"          : "ms",
+    "evaluate"           : "ms",
+    "resolve_value"      : "us",
+    "for_block"          : "ms",
+    "evaluate_expression": "us",
+}
+
+def file_parameters(**overrides):
+    """ Resolve the full set of parameters for a generated file.
+
+    Args:
+        overrides: Values to override individual parameters with
+
+    Returns:
+        dict: Every parameter of the file
+    """
+    unknown = [x for x in overrides if x not in DEFAULTS]
+    if unknown:
+        raise Exception(f"Unknown file parameters: {', '.join(unknown)}")
+    return { **DEFAULTS, **overrides }
+
+def define_name(index):
+    """ Name of a defined value """
+    return f"BENCH_DEF_{index}"
+
+def generate_defines(params):
+    """ Generate the '#define' statements of a file.
+
+    Args:
+        params: Parameters of the file
+
+    Returns:
+        list: Lines declaring each defined value
+    """
+    # NOTE: Each value refers back to an earlier one, so that resolving a value
+    #       recurses - halving the index keeps the depth of recursion shallow
+    lines = []
+    for index in range(max(1, params["defines"])):
+        if index == 0:
+            lines.append(f"#define {define_name(index)} 1")
+        else:
+            lines.append(f"#define {define_name(index)} {define_name(index // 2)} + {index}")
+    return lines
+
+def generate_loop_body(params, variable="idx"):
+    """ Generate the lines within a '#for' loop.
+
+    Args:
+        params  : Parameters of the file
+        variable: Name of the loop variable (default: idx)
+
+    Returns:
+        list: Lines of the loop body
+    """
+    return [
+        f"  - !Field [f_$({variable})_{index}, 1, $({variable} + {index}), U, 0, \"Field\"]"
+        for index in range(params["loop_lines"])
+    ]
+
+def generate_file(path, params):
+    """ Generate a file exercising the preprocessor.
+
+    Args:
+        path  : Path to write the file to
+        params: Parameters of the file
+
+    Returns:
+        str: Path to the file
+    """
+    defines = max(1, params["defines"])
+    lines   = generate_defines(params)
+    every   = int(1 / params["directives"]) if params["directives"] > 0 else 0
+    spacing = params["lines"] // (params["loops"] + 1) if params["loops"] > 0 else 0
+    loop    = 0
+    for index in range(params["lines"]):
+        # Spread the '#for' loops evenly through the file
+        if spacing and loop < params["loops"] and index == spacing * (loop + 1):
+            lines.append(f"#for idx in range({params['loop_size']})")
+            lines += generate_loop_body(params)
+            lines.append("#endfor")
+            loop += 1
+        # Alternate between explicit and implicit uses of the defined values
+        value = define_name(index % defines)
+        if index % 2:
+            value = f"<{value}>"
+        line = f"- !Def [BENCH_NAME_{index}, {value}, \"Line {index}\"]"
+        if every and (index % every) == 0:
+            lines += [f"#if {define_name(index % defines)} > 0", line, "#else", "#endif"]
+        else:
+            lines.append(line)
+    with open(path, "w") as fh:
+        fh.write("\n".join(lines) + "\n")
+    return path
+
+def new_file(path):
+    """ Create a PreprocessorFile for a path within a fresh preprocessor """
+    preprocessor = Preprocessor()
+    preprocessor.add_scope("bench")
+    return preprocessor.add_file("bench", path)
+
+def evaluated_file(path):
+    """ Create a PreprocessorFile for a path, and evaluate it """
+    return new_file(path).evaluate()
+
+def bench_load_file(path, params, repeat):
+    """ Time loading a file, returning the best time in milliseconds """
+    best = None
+    for _ in range(repeat):
+        pre_file = new_file(path)
+        start    = timer()
+        pre_file.load_file()
+        taken    = timer() - start
+        best     = taken if best == None else min(best, taken)
+    return best * 1E3
+
+def bench_evaluate(path, params, repeat):
+    """ Time evaluating a loaded file, returning the best time in milliseconds """
+    best = None
+    for _ in range(repeat):
+        pre_file = new_file(path)
+        pre_file.load_file()
+        start    = timer()
+        pre_file.evaluate()
+        taken    = timer() - start
+        best     = taken if best == None else min(best, taken)
+    return best * 1E3
+
+def bench_resolve_value(path, params, repeat):
+    """
+    Time resolving every defined value of an evaluated file, returning the best
+    time per value in microseconds.
+    """
+    pre_file = evaluated_file(path)
+    names    = [define_name(x) for x in range(max(1, params["defines"]))]
+    best     = None
+    for _ in range(repeat):
+        start = timer()
+        for name in names:
+            pre_file.resolve_value(name)
+        taken = (timer() - start) / len(names)
+        best  = taken if best == None else min(best, taken)
+    return best * 1E6
+
+def bench_for_block(path, params, repeat):
+    """ Time expanding a '#for' loop, returning the best time in milliseconds """
+    pre_file  = evaluated_file(path)
+    statement = PreprocessorStatement(
+        PreprocessorLine(f"#for idx in range({params['loop_size']})"),
+        preprocessor_regex["for"], pre_file
+    )
+    block = PreprocessorForBlock(statement, pre_file)
+    for index, text in enumerate(generate_loop_body(params)):
+        line             = PreprocessorLine(text)
+        line.source_file = pre_file
+        line.input_line  = index
+        block.add_line(line)
+    best = None
+    for _ in range(repeat):
+        start = timer()
+        block.evaluate()
+        taken = timer() - start
+        best  = taken if best == None else min(best, taken)
+    return best * 1E3
+
+def bench_evaluate_expression(path, params, repeat):
+    """
+    Time evaluating expressions that refer to the defined values of a file,
+    returning the best time per expression in microseconds.
+    """
+    pre_file    = evaluated_file(path)
+    defines     = max(1, params["defines"])
+    expressions = [
+        f"<{define_name(x)}> + {define_name((x * 7) % defines)} * 2"
+        for x in range(min(defines, 100))
+    ]
+    best = None
+    for _ in range(repeat):
+        start = timer()
+        for expression in expressions:
+            evaluate_expression(expression, pre_file)
+        taken = (timer() - start) / len(expressions)
+        best  = taken if best == None else min(best, taken)
+    return best * 1E6
+
+def measure_file(path, params, benchmarks, repeat=5):
+    """ Generate a file and run a set of benchmarks against it.
+
+    Args:
+        path      : Path to generate the file at
+        params    : Parameters of the file
+        benchmarks: Names of the benchmarks to run (see BENCHMARKS)
+        repeat    : Number of times to repeat each benchmark (default: 5)
+
+    Returns:
+        dict: Best time of each benchmark, in the unit given by BENCHMARKS
+    """
+    generate_file(path, params)
+    results = {}
+    for name in benchmarks:
+        results[name] = globals()[f"bench_{name}"](path, params, max(1, repeat))
+        # NOTE: Items logged by the preprocessor are discarded between benchmarks
+        #       so that the report doesn't grow with the number of repeats
+        get_report().clear_items()
+    return results
+
+def print_results(param, results, benchmarks, label="default"):
+    """ Print a table of measurements, with a row for each value swept.
+
+    Args:
+        param     : Name of the parameter swept (or None)
+        results   : List of tuples of the parameter value and measurements
+        benchmarks: Names of the benchmarks run
+        label     : Label for the single row printed when no parameter is swept
+                    (default: 'default')
+    """
+    rows = [[param if param else "Case"] + [f"{x} ({BENCHMARKS[x]})" for x in benchmarks]]
+    for value, result in results:
+        rows.append([str(value) if param else label] + ["%0.03f" % result[x] for x in benchmarks])
+    widths = [max(len(x[i]) for x in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(
+            (x.ljust(w) if i == 0 else x.rjust(w)) for i, (x, w) in enumerate(zip(row, widths))
+        ))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the preprocessor on generated files"
+    )
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="PARAM=VALUE",
+        help="Override a parameter of the generated file (e.g. lines=5000)"
+    )
+    parser.add_argument(
+        "--sweep", default=None, metavar="PARAM=V1,V2,...",
+        help="Measure the benchmarks at each value of a parameter (e.g. defines=10,100,1000)"
+    )
+    parser.add_argument(
+        "--benchmark", "-b", nargs="+", choices=list(BENCHMARKS.keys()),
+        default=list(BENCHMARKS.keys()), help="Benchmarks to run (default: all)"
+    )
+    parser.add_argument(
+        "--repeat", "-r", type=int, default=5,
+        help="Number of times to repeat each benchmark, keeping the best time (default: 5)"
+    )
+    parser.add_argument(
+        "--json", default=None, help="Path to write the measurements to as JSON"
+    )
+    args = parser.parse_args()
+
+    # Parse the parameter overrides and sweep
+    def parse_value(value):
+        return float(value) if "." in value else int(value)
+    overrides = {}
+    for item in args.set:
+        key, value = item.split("=", 1)
+        overrides[key.strip()] = parse_value(value)
+    file_parameters(**overrides)
+    (param, values) = (None, [None])
+    if args.sweep:
+        param, values = args.sweep.split("=", 1)
+        param  = param.strip()
+        values = [parse_value(x) for x in values.split(",")]
+        file_parameters(**{ param: values[0] })
+
+    # NOTE: Debug messages are still recorded, so keep the report quiet
+    get_report().verbosity = ReportCommon.ERROR
+
+    # Measure the benchmarks at each value in turn
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for value in values:
+            params = file_parameters(**{ **overrides, **({ param: value } if param else {}) })
+            results.append((value, measure_file(
+                os.path.join(tmp_dir, "bench.yaml"), params, args.benchmark,
+                repeat=args.repeat
+            )))
+
+    print_results(param, results, args.benchmark, label=(",".join(args.set) or "default"))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({
+                "parameters": file_parameters(**overrides),
+                "sweep"     : param,
+                "results"   : [{ "value": x, **y } for x, y in results],
+            }, fh, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Benchmark of register elaboration, measuring 'elaborate_registers' on generated
+!Config declarations that exercise each feature of the register elaborator -
+arrayed registers, 'event' interrupt and 'setclear' expansions, !Define
+overrides, cross-references, and !Macro instances. Throughput is reported in
+registers and fields produced per second. Run with:
+
+    $> python3 -m benchmarks.registers --scenario plain array event mixed
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from timeit import default_timer as timer
+
+# Parameters of a register file, along with their default values
+DEFAULTS = {
+    "groups"          : 2,    # Number of !Group declarations of type REGISTER
+    "registers"       : 32,   # Number of !Reg declarations within each !Group
+    "fields"          : 4,    # Number of !Field declarations within each !Reg
+    "array"           : 16,   # Number of instances of each arrayed !Reg
+    "array_density"   : 0.25, # Fraction of registers that are arrayed
+    "event_density"   : 0.125,# Fraction of registers with the 'event' option
+    "setclear_density": 0.125,# Fraction of registers with the 'setclear' option
+    "define_density"  : 0.25, # Fraction of registers with a field overridden by a !Define
+    "xref_density"    : 0.25, # Fraction of fields whose reset is a cross-reference
+    "macros"          : 2,    # Number of !Macro instances of a MACRO type !Group
+    "macro_array"     : 4,    # Number of repeats of each !Macro instance
+}
+
+# Scenarios isolating each feature, as overrides of the default parameters
+SCENARIOS = {
+    "plain"   : {
+        "array_density": 0, "event_density": 0, "setclear_density": 0,
+        "define_density": 0, "xref_density": 0, "macros": 0,
+    },
+    "array"   : {
+        "array_density": 1, "event_density": 0, "setclear_density": 0,
+        "define_density": 0, "xref_density": 0, "macros": 0,
+    },
+    "event"   : {
+        "array_density": 0, "event_density": 1, "setclear_density": 0,
+        "define_density": 0, "xref_density": 0, "macros": 0,
+    },
+    "setclear": {
+        "array_density": 0, "event_density": 0, "setclear_density": 1,
+        "define_density": 0, "xref_density": 0, "macros": 0,
+    },
+    "define"  : {
+        "array_density": 0, "event_density": 0, "setclear_density": 0,
+        "define_density": 1, "xref_density": 0, "macros": 0,
+    },
+    "xref"    : {
+        "array_density": 0, "event_density": 0, "setclear_density": 0,
+        "define_density": 0, "xref_density": 1, "macros": 0,
+    },
+    "macro"   : {
+        "array_density": 0, "event_density": 0, "setclear_density": 0,
+        "define_density": 0, "xref_density": 0, "macros": 8,
+    },
+    "mixed"   : {},
+}
+
+def register_parameters(scenario=None, **overrides):
+    """ Resolve the full set of parameters for a register file.
+
+    Args:
+        scenario : Name of a scenario from SCENARIOS to start from (optional)
+        overrides: Values to override individual parameters with
+
+    Returns:
+        dict: Every parameter of the register file
+    """
+    unknown = [x for x in overrides if x not in DEFAULTS]
+    if unknown:
+        raise Exception(f"Unknown register parameters: {', '.join(unknown)}")
+    if scenario and scenario not in SCENARIOS:
+        raise Exception(f"Unknown scenario: {scenario}")
+    return { **DEFAULTS, **(SCENARIOS[scenario] if scenario else {}), **overrides }
+
+def spread(index, density):
+    """ Whether an item should have a feature, spreading items evenly by density """
+    return int((index + 1) * density) > int(index * density)
+
+def generate_group(params, name, macro=False):
+    """ Generate a !Group along with the !Define overrides of its registers.
+
+    Args:
+        params: Parameters of the register file
+        name  : Name of the !Group
+        macro : Whether the !Group is of MACRO type (default: False)
+
+    Returns:
+        tuple: Lines declaring the !Group, and lines declaring its !Defines
+    """
+    fields  = max(1, params["fields"])
+    width   = max(1, 32 // fields)
+    lines   = ["- !Group", f"  name: {name}"]
+    defines = []
+    if macro:
+        lines.append("  type: MACRO")
+    lines.append("  regs:")
+    for index in range(params["registers"]):
+        reg_name = f"reg_{index}"
+        lines   += ["  - !Reg", f"    name: {reg_name}"]
+        # NOTE: The first register is always plain, as cross-references point
+        #       at its fields. Only one expansion is applied to each register.
+        if index > 0 and spread(index, params["event_density"]):
+            lines.append("    options: [EVENT, HAS_LEVEL, HAS_MODE]")
+        elif index > 0 and spread(index, params["setclear_density"]):
+            lines.append("    options: [SETCLEAR]")
+        else:
+            if index > 0 and spread(index, params["array_density"]):
+                lines.append(f"    array: {params['array']}")
+            # NOTE: !Defines only apply to registers that are not expanded, as
+            #       expansion renames the registers it produces
+            if index > 0 and not macro and spread(index, params["define_density"]):
+                defines += [
+                    "- !Define", f"  group: {name}", f"  reg  : {reg_name}",
+                    "  field: field_0", "  reset: 1",
+                ]
+        lines.append("    fields:")
+        for i_field in range(fields):
+            reset = "0"
+            if index > 0 and spread(index * fields + i_field, params["xref_density"]):
+                reset = f"self/reg_0/field_{i_field}/reset"
+            lines.append(
+                f"    - !Field [field_{i_field}, {width}, {i_field * width}, U, {reset}, \"Field {i_field}\"]"
+            )
+    return (lines, defines)
+
+def generate_registers(path, params):
+    """ Generate a !Mod including a register file, which holds a !Config.
+
+    Args:
+        path  : Directory to write the files into (created if necessary)
+        params: Parameters of the register file
+
+    Returns:
+        str: Path to the file declaring the !Mod
+    """
+    regs    = []
+    defines = []
+    order   = []
+    for index in range(params["groups"]):
+        (lines, group_defs) = generate_group(params, f"bench_grp_{index}")
+        regs    += lines
+        defines += group_defs
+        order.append(f"  - !Register [bench_grp_{index}]")
+    if params["macros"] > 0:
+        (lines, _) = generate_group(params, "bench_macro", macro=True)
+        regs += lines
+        for index in range(params["macros"]):
+            order.append(
+                f"  - !Macro [bench_inst_{index}, bench_macro, {params['macro_array']}, 1, \"Macro {index}\"]"
+            )
+    regs += ["- !Config", "  order:"] + order + defines
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "bench_regs.yaml"), "w") as fh:
+        fh.write("\n".join(regs) + "\n")
+    top_file = os.path.join(path, "bench_regs_top.yaml")
+    with open(top_file, "w") as fh:
+        fh.write("\n".join([
+            '#include "bench_regs.yaml"',
+            "- !Mod",
+            "  name: bench_regs_top",
+            "  ports: []",
+        ]) + "\n")
+    return top_file
+
+def measure_registers(top_file, repeat=5):
+    """ Elaborate the registers of a generated !Mod, measuring the best time.
+
+    Args:
+        top_file: Path to the file declaring the !Mod
+        repeat  : Number of times to elaborate the registers (default: 5)
+
+    Returns:
+        dict: Best time taken (in seconds), number of registers and fields
+              produced, and the throughput of each
+    """
+    # NOTE: Imported here so that the import is not counted within the first run
+    from blade.elaborate.registers import elaborate_registers, find_register_config
+    from blade.project import elaborate_project, prepare_project
+    from blade.reporting import get_report, ReportCommon
+    from blade.schema import Mod
+    report = get_report()
+    report.verbosity = ReportCommon.ERROR
+    # Parse the design, and build its scope with a shallow elaboration
+    prepared = prepare_project(top_file, includes=[os.path.dirname(top_file)], quiet=True)
+    elaborate_project(prepared, max_depth=0)
+    module = [x for x in prepared.top_docs if isinstance(x, Mod)][0]
+    (config, _) = find_register_config(module.source)
+    best = None
+    for _ in range(max(1, repeat)):
+        start  = timer()
+        groups = elaborate_registers(config, prepared.elab_scope)
+        taken  = timer() - start
+        best   = taken if best == None else min(best, taken)
+        # NOTE: Items logged are discarded so the report doesn't grow with repeats
+        report.clear_items()
+    registers = sum(len(x.registers) for x in groups)
+    fields    = sum(len(y.fields) for x in groups for y in x.registers)
+    return {
+        "time"               : best,
+        "registers"          : registers,
+        "fields"             : fields,
+        "registers_per_second": registers / best,
+        "fields_per_second"  : fields / best,
+    }
+
+def print_results(results):
+    """ Print a table of measurements, with a row for each scenario.
+
+    Args:
+        results: Dictionary of measurements from 'measure_registers' by scenario
+    """
+    rows = [("Scenario", "Registers", "Fields", "Time", "Registers/s", "Fields/s")]
+    for name, result in results.items():
+        rows.append((
+            name, str(result["registers"]), str(result["fields"]),
+            "%0.03fs" % result["time"],
+            "%0.0f" % result["registers_per_second"],
+            "%0.0f" % result["fields_per_second"],
+        ))
+    widths = [max(len(x[i]) for x in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print(row[0].ljust(widths[0]) + "  " + "  ".join(
+            x.rjust(w) for x, w in zip(row[1:], widths[1:])
+        ))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the throughput of register elaboration"
+    )
+    parser.add_argument(
+        "--scenario", "-s", nargs="+", choices=list(SCENARIOS.keys()),
+        default=list(SCENARIOS.keys()), help="Scenarios to measure (default: all)"
+    )
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="PARAM=VALUE",
+        help="Override a parameter of the generated registers (e.g. array=64)"
+    )
+    parser.add_argument(
+        "--repeat", "-r", type=int, default=5,
+        help="Number of times to elaborate the registers, keeping the best time (default: 5)"
+    )
+    parser.add_argument(
+        "--keep", default=None,
+        help="Directory to generate the register files into, which is kept afterwards"
+    )
+    parser.add_argument(
+        "--json", default=None, help="Path to write the measurements to as JSON"
+    )
+    args = parser.parse_args()
+
+    # Parse the parameter overrides
+    overrides = {}
+    for item in args.set:
+        key, value = item.split("=", 1)
+        overrides[key.strip()] = float(value) if "." in value else int(value)
+    register_parameters(**overrides)
+
+    # Measure each scenario in turn
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = args.keep if args.keep else tmp_dir
+        for scenario in args.scenario:
+            params   = register_parameters(scenario, **overrides)
+            top_file = generate_registers(os.path.join(root, scenario), params)
+            results[scenario] = {
+                "parameters": params,
+                **measure_registers(top_file, repeat=args.repeat),
+            }
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=4)
+
+if __name__ == "__main__":
+    main()
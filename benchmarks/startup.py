@@ -0,0 +1,202 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Benchmark of the start-up time of the command line tool, measuring invocations
+that do no real work - printing the help, and building an empty top file - in a
+fresh interpreter each time. Optionally lists the slowest modules imported. Run
+with:
+
+    $> python3 -m benchmarks.startup --imports 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer as timer
+
+# Invocations that can be measured, as a function from a scratch directory to
+# the arguments passed to BLADE
+INVOCATIONS = {
+    "help" : lambda path: ["--help"],
+    "empty": lambda path: [
+        "--top", os.path.join(path, "empty.yaml"), "--quiet",
+        "--output", os.path.join(path, "empty.json"),
+    ],
+}
+
+def blade_command(arguments, python=sys.executable, options=None):
+    """ Build the command to run BLADE in a fresh interpreter.
+
+    Args:
+        arguments: List of arguments to pass to BLADE
+        python   : Path to the Python interpreter (default: this interpreter)
+        options  : List of options to pass to the interpreter (optional)
+
+    Returns:
+        list: The command
+    """
+    return [python] + (options or []) + ["-m", "blade"] + arguments
+
+def measure_invocation(arguments, repeat=10, python=sys.executable):
+    """ Run BLADE repeatedly, measuring the time taken by each run.
+
+    Args:
+        arguments: List of arguments to pass to BLADE
+        repeat   : Number of times to run BLADE (default: 10)
+        python   : Path to the Python interpreter (default: this interpreter)
+
+    Returns:
+        dict: Best and median time taken (in seconds), and the time taken by
+              each run
+    """
+    command = blade_command(arguments, python=python)
+    times   = []
+    for _ in range(max(1, repeat)):
+        start = timer()
+        subprocess.run(
+            command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        times.append(timer() - start)
+    return { "best": min(times), "median": statistics.median(times), "times": times }
+
+def measure_interpreter(repeat=10, python=sys.executable):
+    """
+    Measure starting an interpreter that does nothing, which bounds how quickly
+    BLADE could possibly start.
+
+    Args:
+        repeat: Number of times to start the interpreter (default: 10)
+        python: Path to the Python interpreter (default: this interpreter)
+
+    Returns:
+        float: Best time taken (in seconds)
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        start = timer()
+        subprocess.run([python, "-c", "pass"], check=True)
+        taken = timer() - start
+        best  = taken if best == None else min(best, taken)
+    return best
+
+def slowest_imports(arguments, count=10, python=sys.executable):
+    """ List the modules that take longest to import, using '-X importtime'.
+
+    Args:
+        arguments: List of arguments to pass to BLADE
+        count    : Number of modules to list (default: 10)
+        python   : Path to the Python interpreter (default: this interpreter)
+
+    Returns:
+        list: Tuples of the module name, and the time taken to import it along
+              with its own imports (in seconds), slowest first
+    """
+    result = subprocess.run(
+        blade_command(arguments, python=python, options=["-X", "importtime"]),
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        # Lines have the form 'import time: <self> | <cumulative> | <module>'
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        (_, cumulative, module) = line.split(":", 1)[1].split("|")
+        imports.append((module.strip(), int(cumulative) / 1E6))
+    return sorted(imports, key=lambda x: x[1], reverse=True)[:count]
+
+def print_results(results, interpreter):
+    """ Print a table of measurements, with a row for each invocation.
+
+    Args:
+        results    : Dictionary of measurements from 'measure_invocation'
+        interpreter: Best time taken to start an interpreter that does nothing
+    """
+    rows = [("Invocation", "Best", "Median")]
+    rows.append(("(interpreter)", "%0.03fs" % interpreter, "-"))
+    for name, result in results.items():
+        rows.append((name, "%0.03fs" % result["best"], "%0.03fs" % result["median"]))
+    widths = [max(len(x[i]) for x in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print(row[0].ljust(widths[0]) + "  " + "  ".join(
+            x.rjust(w) for x, w in zip(row[1:], widths[1:])
+        ))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the start-up time of BLADE"
+    )
+    parser.add_argument(
+        "--invocation", "-i", nargs="+", choices=list(INVOCATIONS.keys()),
+        default=list(INVOCATIONS.keys()), help="Invocations to measure (default: all)"
+    )
+    parser.add_argument(
+        "--repeat", "-r", type=int, default=10,
+        help="Number of times to run each invocation (default: 10)"
+    )
+    parser.add_argument(
+        "--imports", type=int, default=0, metavar="COUNT",
+        help="List the slowest modules imported by each invocation"
+    )
+    parser.add_argument(
+        "--python", default=sys.executable,
+        help="Python interpreter to run BLADE with (default: this interpreter)"
+    )
+    parser.add_argument(
+        "--json", default=None, help="Path to write the measurements to as JSON"
+    )
+    args = parser.parse_args()
+
+    # Measure each invocation in turn
+    results = {}
+    imports = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(os.path.join(tmp_dir, "empty.yaml"), "w") as fh:
+            fh.write("")
+        interpreter = measure_interpreter(repeat=args.repeat, python=args.python)
+        for name in args.invocation:
+            arguments     = INVOCATIONS[name](tmp_dir)
+            results[name] = measure_invocation(
+                arguments, repeat=args.repeat, python=args.python
+            )
+            if args.imports > 0:
+                imports[name] = slowest_imports(
+                    arguments, count=args.imports, python=args.python
+                )
+
+    print_results(results, interpreter)
+    for name, modules in imports.items():
+        print("")
+        print(f"Slowest imports for '{name}':")
+        width = max(len(x[0]) for x in modules)
+        for module, taken in modules:
+            print(f"  {module.ljust(width)}  {taken * 1E3:0.01f}ms")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({
+                "interpreter": interpreter,
+                "results"    : results,
+                "imports"    : imports,
+            }, fh, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -17,15 +17,25 @@
 #
 
 import argparse
-import json
-import logging
+import contextlib
+from datetime import datetime
 import os
 import sys
 from timeit import default_timer as timer
 import traceback
 
 # Import BLADE dependencies
-from blade.project import build_project
+from blade.project import BuildSession, prepare_project, elaborate_project
+from blade.writer import FORMATS, detect_format, import_format, write_blob
+from blade.writer import write_shards
+from blade.profiling import BuildProfile, begin_stage, write_profile
+from blade.profiling import start_tracing, stop_tracing
+from blade.profiling import cprofile_paused, start_cprofile, stop_cprofile
+from blade.profiling import write_collapsed_stacks
+from blade.profiling import trace_events, trace_import, trace_mark
+from blade.profiling import restart_stats, start_stats, stop_stats, stat_count
+from blade.profiling import stats_export, stats_import
+from blade.profiling import start_memory_tracing, stop_memory_tracing
 from blade.preprocessor.common import PreprocessorError
 from blade.schema import ValidationError
 from blade.parser import PhhidleParseError
@@ -35,14 +45,169 @@ from blade.elaborate.common import ElaborationError
 from blade.reporting import get_report, ReportCommon
 report = get_report()
 
+# ==============================================================================
+# Build Helpers
+# ==============================================================================
+
+class BuildTarget(object):
+    """ Tracks the state of building a single top file and writing its output """
+
+    def __init__(self, top_file, out_file, out_format):
+        """ Initialise the build target.
+
+        Args:
+            top_file  : Path to the top file to build
+            out_file  : Path to write the output to
+            out_format: Format of the output
+        """
+        self.top_file   = top_file
+        self.out_file   = out_file
+        self.out_format = out_format
+        self.cache      = None # BuildCache for this target (if enabled)
+        self.deps       = None # YAML dependencies of the blob (if captured)
+        self.sources    = None # Every file evaluated during the build (if captured)
+        self.environ    = None # Environment variables read by the build (if captured)
+        self.prepared   = None # PreparedProject ready to be elaborated
+        self.profile    = None # BuildProfile measuring each stage (if enabled)
+
+def report_failure(e, top_file, debug=False):
+    """ Report an exception raised while building a top file.
+
+    Args:
+        e       : The exception that was raised
+        top_file: Path to the top file being built
+        debug   : Whether to print the traceback (default: False)
+
+    Returns:
+        int: The exit code that the failure should produce
+    """
+    if isinstance(e, (PreprocessorError, PhhidleParseError)):
+        stage = "Preprocessor" if isinstance(e, PreprocessorError) else "Parse"
+        report.error(f"{stage} stage failed: {e}", body=traceback.format_exc())
+        error_code = 1
+    elif isinstance(e, ValidationError):
+        report.error(f"Validation failed for parameter {e.parameter}: {e}", body=traceback.format_exc())
+        if e.doc != None:
+            report.error(f"Document !{type(e.doc).__name__}::{e.doc.name} {e.doc.print_source()}")
+        error_code = 2
+    elif isinstance(e, ElaborationError):
+        report.error(f"Elaboration Error: {e}", body=traceback.format_exc())
+        if e.ph_doc != None:
+            report.error(f"Document !{type(e.ph_doc).__name__}::{e.ph_doc.name} {e.ph_doc.print_source()}")
+        error_code = 4
+    else:
+        report.error(f"Unexpected failure occurred in BLADE {top_file}: {e}", body=traceback.format_exc())
+        error_code = 5
+    if debug: print(traceback.format_exc())
+    return error_code
+
+def finish_target(target, args, depth, jobs=None):
+    """ Elaborate a prepared top file, then write out its blob.
+
+    Args:
+        target: The BuildTarget to finish
+        args  : Parsed command line arguments
+        depth : The maximum depth to elaborate to
+        jobs  : Number of processes to elaborate large subtrees with (optional)
+
+    Returns:
+        int: The exit code for this target (0 if successful)
+    """
+    df_blob    = None
+    violations = []
+    top_error  = 0
+    try:
+        # Pickup the design and records of the previous build, if incremental
+        tracker = None
+        if args.incremental:
+            from blade.cache import incremental_key, load_previous_build
+            key = incremental_key(target.top_file, { "max_depth": depth })
+            try:
+                (previous, records) = load_previous_build(
+                    target.out_file, key, fmt=target.out_format
+                )
+            except Exception as e:
+                report.warning(f"Could not load the previous build of {target.out_file}: {e}")
+                (previous, records) = (None, None)
+            from blade.elaborate.tracker import ElaborationTracker
+            tracker = ElaborationTracker(previous, records)
+        (df_blob, violations) = elaborate_project(
+            target.prepared,
+            max_depth  = depth,               # Maximum depth to elaborate to
+            run_checks = args.run_checks,     # Enable rule checking of the DF project
+            waivers    = args.waiver_file,    # Provide waiver files for rule checks
+            profile    = args.profile,        # Enable time profiling
+            jobs       = jobs,                # Parallel elaboration of subtrees
+            inst_path  = args.path,           # Focus elaboration on a single block
+            tracker    = tracker,             # Track dependencies of each block
+            profiler   = target.profile,      # Optionally record stage measurements
+        )
+        if violations and len(violations) > 0:
+            report.error(f"BLADE detected {len(violations)} rule violation{'s' if len(violations) > 1 else ''}")
+            top_error = 0 if args.ignore_check_errors else 6
+    except Exception as e:
+        top_error = report_failure(e, target.top_file, debug=args.debug)
+
+    # Write this object out to file
+    # NOTE: JSON blobs are streamed to file to avoid holding a second copy of
+    #       the whole design in memory as a dictionary and string
+    if df_blob != None:
+        # NOTE: Writing out is only captured by cProfile if requested
+        with (contextlib.nullcontext() if args.cprofile_output else cprofile_paused()):
+            if args.shard:
+                write_shards(df_blob, target.out_file)
+            else:
+                write_blob(df_blob, target.out_file, fmt=target.out_format)
+        if args.dependencies and args.MF:
+            with open(args.MF, 'w') as fh:
+                fh.write(f"{args.MT}: {' '.join(target.deps)}")
+        # Only cache clean builds, so that errors and violations are re-reported
+        if target.cache and top_error == 0 and not violations:
+            target.cache.store(target.out_file, target.sources, target.deps, target.environ)
+        # Keep the records of every block for the next incremental build
+        if tracker:
+            from blade.cache import store_build_records
+            store_build_records(target.out_file, key, tracker.records)
+
+    return top_error
+
+# State of a parallel batch build, inherited by forked worker processes
+active_batch = None
+
+def finish_target_worker(index):
+    """
+    Finish a top file within a worker process, using the prepared documents
+    inherited from the parent process when the worker was forked.
+
+    Args:
+        index: Index of the target within the active batch
+
+    Returns:
+        tuple: Exit code for the target, any report items logged by the worker,
+               the target's BuildProfile (if enabled), the spans traced by the
+               worker (if enabled), and the counters and timers recorded by the
+               worker (if enabled)
+    """
+    since                  = datetime.now()
+    mark                   = trace_mark()
+    restart_stats()
+    (targets, args, depth) = active_batch
+    # NOTE: Worker processes cannot fork their own pool to elaborate subtrees
+    top_error = finish_target(targets[index], args, depth)
+    return (
+        top_error, report.export_items(since, verbosity=report.verbosity),
+        targets[index].profile, trace_events(mark), stats_export()
+    )
+
 # ==============================================================================
 # Main Entrypoint
 # ==============================================================================
-def main():
-    # Capture the entry time
-    entry = timer()
+def build_parser():
+    """ Setup the supported command line options.
 
-    # Setup the supported command line options
+    Returns:
+        ArgumentParser: The parser for BLADE's command line
+    """
     parser = argparse.ArgumentParser(
         description="Tool for elaborating a design documented using the YAML "
         "schema into a DesignFormat project"
@@ -53,8 +218,12 @@ def main():
         help="Include a files or folder"
     )
     parser.add_argument(
-        "--top", "-t", required=True,
-        help="Path to the 'top' file to start elaborating from"
+        "--top", "-t", action="append", default=[],
+        help="Path to the 'top' file to start elaborating from, can be repeated along with --output"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="File listing a top file and output path on each line, all of which are built"
     )
     # - Input modifiers
     parser.add_argument(
@@ -63,8 +232,16 @@ def main():
     )
     # - Output file arguments
     parser.add_argument(
-        "--output", "-o", required=True,
-        help="Output path to store the DFBlob or DFProject file."
+        "--output", "-o", action="append", default=[],
+        help="Output path to store the DFBlob or DFProject file, one per --top."
+    )
+    parser.add_argument(
+        "--format", "-f", choices=list(FORMATS.keys()), default=None,
+        help="Format of the output file, by default chosen from its extension (plain JSON otherwise)"
+    )
+    parser.add_argument(
+        "--shard", action="store_true", default=False,
+        help="Write one file per block, with an index of the blocks written to the output path"
     )
     parser.add_argument(
         "--report", action="store_true", default=False,
@@ -91,6 +268,26 @@ def main():
         "--shallow", "-s", action="store_true",
         help="Run in shallow mode - generating DesignFormat blobs with short hierarchy"
     )
+    parser.add_argument(
+        "--depth", "-d", type=int, default=None,
+        help="Limit elaboration to this many levels of hierarchy below the top-level block"
+    )
+    parser.add_argument(
+        "--path",
+        help="Hierarchical path of a block to focus elaboration on (e.g. 'top.subsys_0.dma_3')"
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=None,
+        help="Elaborate large subtrees of the design (or several top files) in parallel using this many processes"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true", default=False,
+        help="Reuse unchanged subtrees of the design from the blob written by the previous build"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory to cache build results in, unchanged builds reuse the cached blob"
+    )
     # - Rule checker behaviour arguments
     parser.add_argument(
         "--run-checks", "-c", action="store_true",
@@ -113,13 +310,75 @@ def main():
         "--profile", "-p", action="store_true", default=False,
         help="Enable profiling, measures the execution time of each phase"
     )
+    parser.add_argument(
+        "--profile-out", metavar="FILE",
+        help="Write the wall time, CPU time, memory growth, and objects produced by each phase to a JSON file"
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE",
+        help="Write a timeline of the build in the Chrome trace-event format (for Perfetto)"
+    )
+    parser.add_argument(
+        "--cprofile", metavar="FILE",
+        help="Capture every function call made by the build with cProfile, writing the statistics to a .pstats file"
+    )
+    parser.add_argument(
+        "--cprofile-stacks", metavar="FILE",
+        help="Also write the calls captured by --cprofile as collapsed stacks, for flamegraph tools"
+    )
+    parser.add_argument(
+        "--cprofile-output", action="store_true", default=False,
+        help="Include writing out the output in the calls captured by --cprofile"
+    )
+    parser.add_argument(
+        "--memory-profile", action="store_true", default=False,
+        help="Trace memory allocations with tracemalloc, reporting the peak and retained memory of each phase"
+    )
+    parser.add_argument(
+        "--memory-sites", type=int, default=10,
+        help="Number of allocation sites to report for each phase with --memory-profile (default: 10)"
+    )
+    parser.add_argument(
+        "--stats", action="store_true", default=False,
+        help="Count calls to expensive operations (e.g. document lookups and expression evaluation) and print a summary"
+    )
     parser.add_argument(
         "--debug", action="store_true", default=False,
         help="Enable debug messages, including tracebacks after exceptions are caught."
     )
+    # - Resident server arguments
+    parser.add_argument(
+        "--watch", action="store_true", default=False,
+        help="Rebuild whenever any file the build depends on changes, until interrupted"
+    )
+    parser.add_argument(
+        "--serve", metavar="SOCKET",
+        help="Run as a server, handling build requests received on this Unix socket"
+    )
+    parser.add_argument(
+        "--connect", metavar="SOCKET",
+        help="Send this build to a server listening on this Unix socket"
+    )
+    return parser
 
-    # Parse the provided command line options
-    args = parser.parse_args()
+def run(args, server=None):
+    """ Run a build using the parsed command line options.
+
+    Args:
+        args  : Parsed command line options
+        server: BuildServer holding state from earlier builds (optional)
+
+    Returns:
+        int: The exit code of the build (0 if successful)
+    """
+    # Capture the entry time (and resource usage)
+    entry = begin_stage()
+
+    # Start recording a timeline of the build (if enabled)
+    if args.trace: start_tracing()
+
+    # Start counting calls to expensive operations (if enabled)
+    if args.stats: start_stats()
 
     # If debug is enabled, immediately wind up the verbosity
     if args.debug: report.verbosity = ReportCommon.DEBUG
@@ -128,21 +387,69 @@ def main():
     if args.report:
         if not os.path.isdir(os.path.dirname(os.path.abspath(args.report_path))):
             report.error(f"Report output directory does not exist: {args.report_path}")
-            sys.exit(-1)
+            return -1
         elif os.path.isdir(os.path.abspath(args.report_path)):
             report.error(f"Report output path is a directory: {args.report_path}")
-            sys.exit(-1)
+            return -1
+
+    # Pickup the pairs of top files and output paths to build
+    targets = []
+    if args.manifest:
+        if not os.path.isfile(args.manifest):
+            report.error(f"Manifest file does not exist: {args.manifest}")
+            return -1
+        with open(args.manifest, 'r') as fh:
+            for line in (x.strip() for x in fh.readlines()):
+                if len(line) == 0 or line.startswith('#'): continue
+                parts = line.split()
+                if len(parts) != 2:
+                    report.error(f"Manifest entries must be a top file and an output path: {line}")
+                    return -1
+                targets.append((parts[0], parts[1]))
+    if len(args.top) != len(args.output):
+        report.error("Every --top must be paired with an --output")
+        return -1
+    targets += list(zip(args.top, args.output))
+    if len(targets) == 0:
+        report.error("At least one --top and --output pair, or a --manifest, must be provided")
+        return -1
+    elif len(targets) > 1 and (args.MF or args.path):
+        report.error("The --MF and --path options can only be used with a single top file")
+        return -1
+
+    # Check the output formats are supported (they may need an optional package)
+    out_formats = {}
+    for _, out_file in targets:
+        out_format = args.format if args.format else detect_format(out_file)
+        try:
+            import_format(out_format)
+        except Exception as e:
+            report.error(str(e))
+            return -1
+        if args.shard and out_format != "json":
+            report.error(f"Sharded output only supports the 'json' format, not '{out_format}'")
+            return -1
+        out_formats[out_file] = out_format
 
     # Pickup the various arguments
     include_list = args.include if isinstance(args.include, list) else []
-    top_file     = args.top
-    out_file     = args.output
 
     # Ensure the include list is unique
     include_list = set(list([os.path.abspath(x) for x in include_list]))
 
     # Determine the depth we're working to (None -> infinite depth elaboration)
-    depth = 1 if args.shallow else None
+    if args.shallow and args.depth != None:
+        report.error("The --shallow and --depth options cannot be used together")
+        return -1
+    elif args.depth != None and args.depth < 0:
+        report.error(f"Elaboration depth must be zero or greater: {args.depth}")
+        return -1
+    depth = 1 if args.shallow else args.depth
+
+    # Incremental builds reuse blocks from a complete previous blob
+    if args.incremental and (args.shard or args.path):
+        report.warning("Incremental builds are not supported with --shard or --path, ignoring --incremental")
+        args.incremental = False
 
     # Parse out the options
     defines = {}
@@ -150,49 +457,131 @@ def main():
         parts = keyval.strip().split('=')
         defines[parts[0]] = parts[1] if len(parts) > 1 else True
 
-    # Trigger the parser
-    df_blob    = None
-    yaml_deps  = [] if args.MF != None else None
+    # Start capturing every function call (if enabled)
+    if args.cprofile_stacks and not args.cprofile:
+        report.error("The --cprofile-stacks option requires --cprofile")
+        return -1
+    if args.cprofile: start_cprofile()
+
+    # Start tracing memory allocations (if enabled)
+    if args.memory_profile: start_memory_tracing()
+
+    # Parse and validate every top file in turn, sharing the preprocessor scope
+    # and parsed documents between them
+    session    = BuildSession() if not server else server.get_session(
+        [x for x, _ in targets], include_list, defines
+    )
+    started    = []
+    pending    = []
     error_code = 0
-    try:
-        (df_blob, violations) = build_project(
-            top_file   = top_file,            # Path to file to elaborate from
-            includes   = include_list,        # File and folder paths to include
-            defines    = defines,             # Defined valued passed to the preprocessor phase
-            max_depth  = depth,               # Maximum depth to elaborate to
-            run_checks = args.run_checks,     # Enable rule checking of the DF project
-            waivers    = args.waiver_file,    # Provide waiver files for rule checks
-            quiet      = args.quiet,          # Run in quiet mode
-            deps       = yaml_deps,           # Optionally capture YAML dependencies of blob
-            profile    = args.profile,        # Enable time profiling
-        )
-        if violations and len(violations) > 0:
-            report.error(f"BLADE detected {len(violations)} rule violation{'s' if len(violations) > 1 else ''}")
-            error_code = 0 if args.ignore_check_errors else 6
-    except PreprocessorError as e:
-        report.error(f"Preprocessor stage failed: {e}", body=traceback.format_exc())
-        if args.debug: print(traceback.format_exc())
-        error_code = 1
-    except PhhidleParseError as e:
-        report.error(f"Parse stage failed: {e}", body=traceback.format_exc())
-        if args.debug: print(traceback.format_exc())
-        error_code = 1
-    except ValidationError as e:
-        report.error(f"Validation failed for parameter {e.parameter}: {e}", body=traceback.format_exc())
-        if e.doc != None:
-            report.error(f"Document !{type(e.doc).__name__}::{e.doc.name} {e.doc.print_source()}")
-        if args.debug: print(traceback.format_exc())
-        error_code = 2
-    except ElaborationError as e:
-        report.error(f"Elaboration Error: {e}", body=traceback.format_exc())
-        if e.ph_doc != None:
-            report.error(f"Document !{type(e.ph_doc).__name__}::{e.ph_doc.name} {e.ph_doc.print_source()}")
-        if args.debug: print(traceback.format_exc())
-        error_code = 4
-    except Exception as e:
-        report.error(f"Unexpected failure occurred in BLADE {top_file}: {e}", body=traceback.format_exc())
-        if args.debug: print(traceback.format_exc())
-        error_code = 5
+    for top_file, out_file in targets:
+        target = BuildTarget(top_file, out_file, out_formats[out_file])
+        if args.profile_out or args.memory_profile:
+            target.profile = BuildProfile(top_file, out_file, memory_sites=args.memory_sites)
+        started.append(target)
+
+        # If caching is enabled, check for a result from an identical earlier build
+        if args.cache_dir and args.shard:
+            report.warning("Build caching is not supported with sharded output, ignoring --cache-dir")
+        elif args.cache_dir:
+            # NOTE: The cache is only imported when enabled, as importing it (and
+            #       its hashing modules) slows down the start of every run
+            from blade.cache import BuildCache, hash_file
+            target.cache = BuildCache(
+                args.cache_dir, top_file, include_list, defines,
+                {
+                    "max_depth" : depth,
+                    "run_checks": args.run_checks,
+                    "waivers"   : { x: hash_file(x) for x in args.waiver_file },
+                    "inst_path" : args.path,
+                    "format"    : target.out_format,
+                }
+            )
+            manifest = target.cache.lookup()
+            stat_count("cache.lookup", "hit" if manifest else "miss")
+            if manifest:
+                target.cache.restore(out_file)
+                if target.profile: target.profile.cached = True
+                if args.dependencies and args.MF:
+                    with open(args.MF, 'w') as fh:
+                        fh.write(f"{args.MT}: {' '.join(manifest['deps'])}")
+                continue
+
+        # Trigger the parser
+        target.deps    = [] if (args.MF != None or target.cache) else None
+        target.sources = [] if target.cache else None
+        target.environ = {} if target.cache else None
+        try:
+            target.prepared = prepare_project(
+                top_file = top_file,         # Path to file to elaborate from
+                includes = include_list,     # File and folder paths to include
+                defines  = defines,          # Defined valued passed to the preprocessor phase
+                quiet    = args.quiet,       # Run in quiet mode
+                deps     = target.deps,      # Optionally capture YAML dependencies of blob
+                profile  = args.profile,     # Enable time profiling
+                sources  = target.sources,   # Optionally capture every evaluated file
+                environ  = target.environ,   # Optionally capture environment variables read
+                session  = session,          # Share state with other top files
+                profiler = target.profile,   # Optionally record stage measurements
+            )
+        except Exception as e:
+            top_error  = report_failure(e, top_file, debug=args.debug)
+            error_code = error_code if error_code != 0 else top_error
+            continue
+
+        # If the top file declared nothing, write out an empty file
+        if not target.prepared:
+            write_blob(None, out_file, fmt=target.out_format)
+            continue
+
+        pending.append(target)
+
+    # Elaborate and write out every top file - either in worker processes forked
+    # from this one (sharing the parsed documents), or one after another
+    parallel = (len(pending) > 1 and args.jobs and args.jobs > 1)
+    # NOTE: Only imported for parallel builds, as it slows down the start of a run
+    if parallel: import multiprocessing
+    if parallel and "fork" not in multiprocessing.get_all_start_methods():
+        report.warning("Parallel batch builds require 'fork', running serially")
+        parallel = False
+    if parallel:
+        global active_batch
+        active_batch = (pending, args, depth)
+        try:
+            with multiprocessing.get_context("fork").Pool(min(args.jobs, len(pending))) as pool:
+                results = [pool.apply_async(finish_target_worker, (x,)) for x in range(len(pending))]
+                for target, result in zip(pending, results):
+                    (top_error, items, target.profile, events, stats) = result.get()
+                    report.import_items(items)
+                    trace_import(events)
+                    stats_import(stats)
+                    error_code = error_code if error_code != 0 else top_error
+        finally:
+            active_batch = None
+    else:
+        for target in pending:
+            top_error  = finish_target(target, args, depth, jobs=args.jobs)
+            error_code = error_code if error_code != 0 else top_error
+
+    # Summarise the calls made to expensive operations
+    stats = stop_stats()
+    if stats:
+        for line in stats.format():
+            print(line)
+
+    # Summarise the memory used by each stage of every build
+    if args.memory_profile:
+        stop_memory_tracing()
+        for target in started:
+            for line in target.profile.format_memory():
+                print(line)
+
+    # Write out the function calls captured by cProfile
+    if args.cprofile:
+        cprofile = stop_cprofile()
+        cprofile.dump_stats(args.cprofile)
+        if args.cprofile_stacks:
+            write_collapsed_stacks(cprofile, args.cprofile_stacks)
 
     # Always write out a report if enabled (used for debug)
     if args.report:
@@ -201,24 +590,115 @@ def main():
             verbosity=(ReportCommon.DEBUG if args.debug else ReportCommon.INFO)
         )
 
-    # Write this object out to file
-    if df_blob != None:
-        json_dump = json.dumps(df_blob.dumpObject())
-        with open(out_file, 'w') as fh:
-            fh.write(json_dump)
-        if args.dependencies and args.MF:
-            with open(args.MF, 'w') as fh:
-                fh.write(f"{args.MT}: {' '.join(yaml_deps)}")
-    # If a blob didn't generate and no error was raised, write out an empty file
-    elif error_code == 0:
-        with open(out_file, 'w') as fh:
-            fh.write('{}')
+    # Write out the measurements of each stage of every build
+    if args.profile_out:
+        write_profile(
+            args.profile_out, [x.profile.to_dict() for x in started], entry,
+            stats=stats
+        )
+
+    # Write out the timeline of the build
+    if args.trace:
+        stop_tracing().write(args.trace)
+
+    # Keep the session for later builds
+    if server: server.finish_session(session, success=(error_code == 0))
 
     # Capture the delta between entry and exit time
     if args.profile:
-        delta = (timer() - entry)
+        delta = (timer() - entry.wall)
         print("PROFILING: Total execution time %0.02fs" % delta)
 
+    return error_code
+
+def serve_request(server, argv):
+    """ Handle a build request received by the server.
+
+    Args:
+        server: BuildServer holding state from earlier builds
+        argv  : List of command line arguments for the build
+
+    Returns:
+        int: The exit code of the build
+    """
+    args = build_parser().parse_args(argv)
+    if args.serve or args.connect or args.watch:
+        report.error("The --serve, --connect, and --watch options cannot be sent to a server")
+        return -1
+    # Each build starts with an empty report at the default verbosity
+    verbosity = report.verbosity
+    report.clear_items()
+    report.verbosity = ReportCommon.WARNING
+    try:
+        return run(args, server=server)
+    finally:
+        report.verbosity = verbosity
+        # Don't carry a timeline or profile over if the build ended early
+        stop_tracing()
+        stop_cprofile()
+        stop_stats()
+        stop_memory_tracing()
+
+def watch_builds(args):
+    """
+    Run a build, then wait for any file it depends on to change and run it
+    again - reusing the parsed documents while nothing has changed.
+
+    Args:
+        args: Parsed command line options
+
+    Returns:
+        int: The exit code of the last build
+    """
+    from blade.server import BuildServer
+    server     = BuildServer()
+    error_code = 0
+    try:
+        while True:
+            report.clear_items()
+            error_code = run(args, server=server)
+            # Problems with the options will not be fixed by editing the design
+            if error_code == -1: break
+            if not args.quiet:
+                print("Watching for changes (press Ctrl+C to stop)...")
+            server.wait_for_change()
+    except KeyboardInterrupt:
+        pass
+    return error_code
+
+def main():
+    # Parse the provided command line options
+    args = build_parser().parse_args()
+
+    # Either run as a server, send the build to a server, or run it directly
+    if (args.serve or args.connect) and args.watch:
+        report.error("The --watch option cannot be used with --serve or --connect")
+        sys.exit(-1)
+    elif args.watch:
+        error_code = watch_builds(args)
+    elif args.serve:
+        # NOTE: The server (and its socket modules) is only imported when used
+        from blade.server import serve
+        report.verbosity = ReportCommon.INFO
+        serve(args.serve, serve_request)
+        return
+    elif args.connect:
+        # Forward all other arguments to the server
+        argv = sys.argv[1:]
+        if "--connect" in argv:
+            index = argv.index("--connect")
+            argv  = argv[:index] + argv[index+2:]
+        argv = [x for x in argv if not x.startswith("--connect=")]
+        from blade.server import send_request
+        try:
+            (error_code, output) = send_request(args.connect, argv)
+        except OSError as e:
+            report.error(f"Could not connect to server at {args.connect}: {e}")
+            sys.exit(-1)
+        print(output, end='')
+    else:
+        error_code = run(args)
+
     # If we failed, bail out with the correct exit code
     if error_code != 0: sys.exit(error_code)
 
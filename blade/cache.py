@@ -0,0 +1,257 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Cache of complete build results, allowing an unchanged design to skip parsing
+and elaboration entirely. Each entry is identified by a key built from the BLADE
+source code, the requested options, and the files available for inclusion. The
+entry records a hash of every file the build depended on, so that it is only
+reused if none of those files have changed, and none of the environment
+variables read by the preprocessor have a different value.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+
+from designformat import DFConstants
+
+from .writer import load_blob
+
+from . import reporting
+report = reporting.get_report("cache")
+
+# Environment variables that the source repository of every block is calculated
+# from (see 'tag_source_info'), which therefore alter the result of any build
+REPO_ENVIRON = ('WORK_AREA', 'IMPORT_WORK_AREA')
+
+def repo_environ():
+    """ Return the values of the variables in 'REPO_ENVIRON' (None if not set) """
+    return { x: os.environ.get(x, None) for x in REPO_ENVIRON }
+
+def hash_file(path):
+    """ Calculate the hash of the contents of a file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        str: Hex digest of the file contents, or None if the file doesn't exist
+    """
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_blade():
+    """
+    Calculate a hash of BLADE's own source code along with the DesignFormat
+    version, so that cached results are discarded whenever the tool changes.
+
+    Returns:
+        str: Hex digest identifying the version of the tool
+    """
+    digest = hashlib.sha256(DFConstants.FORMAT.VERSION.encode('utf-8'))
+    root   = Path(os.path.dirname(os.path.abspath(__file__)))
+    for path in sorted(root.rglob('*.py')):
+        digest.update(str(path.relative_to(root)).encode('utf-8'))
+        digest.update(hash_file(path).encode('utf-8'))
+    return digest.hexdigest()
+
+class BuildCache(object):
+    """
+    Stores blobs produced by previous builds, along with a manifest for each one
+    recording the hashes of the files it depended on.
+    """
+
+    def __init__(self, cache_dir, top_file, includes, defines, options):
+        """ Initialise the cache, calculating the key for this build.
+
+        Args:
+            cache_dir: Directory to hold cached results
+            top_file : The top-level file being elaborated
+            includes : List of included files and folders
+            defines  : Defined values passed to the preprocessor
+            options  : Dictionary of other options that alter the result
+        """
+        self.cache_dir = cache_dir
+        # Every YAML file available for inclusion forms part of the key, as a
+        # new file could change how an '#include' is resolved
+        available = []
+        for item in includes:
+            if os.path.isdir(item):
+                available += [str(x) for x in Path(item).rglob('*.yaml')]
+            else:
+                available.append(os.path.abspath(item))
+        self.key = hashlib.sha256(json.dumps({
+            "blade"    : hash_blade(),
+            # NOTE: The top file is recorded as provided, as this is written into
+            #       the 'path' attribute of the project
+            "top"      : [top_file, os.path.abspath(top_file)],
+            "available": sorted(available),
+            "defines"  : { str(k): str(v) for k, v in defines.items() },
+            "options"  : options,
+            "env"      : repo_environ(),
+        }, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @property
+    def blob_path(self):
+        """ Path to the cached blob for this build """
+        return os.path.join(self.cache_dir, f"{self.key}.blob")
+
+    @property
+    def manifest_path(self):
+        """ Path to the manifest describing the cached blob for this build """
+        return os.path.join(self.cache_dir, f"{self.key}.json")
+
+    def lookup(self):
+        """
+        Check for a cached result for this build, where none of the files it
+        depended on and none of the environment variables it read have changed
+        since it was stored.
+
+        Returns:
+            dict: The manifest of the cached result, or None if not available
+        """
+        if not os.path.isfile(self.manifest_path) or not os.path.isfile(self.blob_path):
+            report.debug(f"No cached result found for key {self.key}")
+            return None
+        with open(self.manifest_path, 'r') as fh:
+            manifest = json.load(fh)
+        for path, digest in manifest["hashes"].items():
+            if hash_file(path) != digest:
+                report.debug(f"Cached result is stale as {path} has changed")
+                return None
+        for key, value in manifest["environ"].items():
+            if os.environ.get(key, None) != value:
+                report.debug(f"Cached result is stale as ${key} has changed")
+                return None
+        return manifest
+
+    def restore(self, out_file):
+        """ Copy the cached blob to the output path.
+
+        Args:
+            out_file: Path to write the blob to
+        """
+        shutil.copyfile(self.blob_path, out_file)
+        report.info(f"Restored cached result for key {self.key}")
+
+    def store(self, out_file, sources, deps, environ=None):
+        """ Add the blob produced by this build to the cache.
+
+        Args:
+            out_file: Path to the blob that was written
+            sources : Every file that was evaluated during the build
+            deps    : The YAML dependencies of the blob (as used for '--MF')
+            environ : Environment variables read during the build, mapped to
+                      the value that was read - None if it was not set (optional)
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = {
+            "deps"   : deps,
+            "hashes" : {
+                os.path.abspath(x): hash_file(x) for x in sorted(set(sources + deps))
+            },
+            # NOTE: The variables read are only known once the build has run, so
+            #       are checked on lookup rather than forming part of the key
+            "environ": environ if environ != None else {},
+        }
+        # NOTE: Write to temporary files then move them into place, so that a
+        #       concurrent build never sees a partially written entry
+        tmp_blob = f"{self.blob_path}.{os.getpid()}.tmp"
+        tmp_mani = f"{self.manifest_path}.{os.getpid()}.tmp"
+        shutil.copyfile(out_file, tmp_blob)
+        with open(tmp_mani, 'w') as fh:
+            json.dump(manifest, fh)
+        os.replace(tmp_blob, self.blob_path)
+        os.replace(tmp_mani, self.manifest_path)
+        report.debug(f"Stored result in cache with key {self.key}")
+
+# ==============================================================================
+# Incremental Elaboration
+# ==============================================================================
+
+def incremental_key(top_file, options):
+    """
+    Calculate the key identifying builds whose tracked records can be used to
+    incrementally elaborate each other.
+
+    Args:
+        top_file: The top-level file being elaborated
+        options : Dictionary of other options that alter the result
+
+    Returns:
+        str: Hex digest of the key
+    """
+    return hashlib.sha256(json.dumps({
+        "blade"  : hash_blade(),
+        "top"    : [top_file, os.path.abspath(top_file)],
+        "options": options,
+        "env"    : repo_environ(),
+    }, sort_keys=True).encode('utf-8')).hexdigest()
+
+def records_path(out_file):
+    """ Path to the tracked records stored alongside a blob """
+    return f"{out_file}.elab"
+
+def load_previous_build(out_file, key, fmt=None):
+    """
+    Load the design and tracked records of a previous build from its blob, as
+    long as they were produced with the same key and the blob hasn't changed
+    since.
+
+    Args:
+        out_file: Path to the blob written by the previous build
+        key     : Key of the current build (from 'incremental_key')
+        fmt     : Format of the blob (optional, by default detected from path)
+
+    Returns:
+        tuple: The DFProject and its records by block path, or (None, None) if
+               the previous build can't be used
+    """
+    if not os.path.isfile(out_file) or not os.path.isfile(records_path(out_file)):
+        return (None, None)
+    with open(records_path(out_file), 'r') as fh:
+        manifest = json.load(fh)
+    if manifest["key"] != key:
+        report.debug(f"Tracked records of {out_file} are from a different build")
+        return (None, None)
+    elif manifest["blob"] != hash_file(out_file):
+        report.debug(f"Blob {out_file} has changed since its records were stored")
+        return (None, None)
+    return (load_blob(out_file, fmt=fmt), manifest["blocks"])
+
+def store_build_records(out_file, key, records):
+    """ Store the tracked records of a build alongside its blob.
+
+    Args:
+        out_file: Path to the blob that was written
+        key     : Key of the build (from 'incremental_key')
+        records : Tracked records of the build by block path
+    """
+    manifest = { "key": key, "blob": hash_file(out_file), "blocks": records }
+    tmp_path = f"{records_path(out_file)}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as fh:
+        json.dump(manifest, fh)
+    os.replace(tmp_path, records_path(out_file))
@@ -16,30 +16,34 @@
 # BLADE.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import importlib
 import inspect
 import os
 from pathlib import Path
 
-# Auto-magically import all rules from files in this folder
-checkers_dir = Path(os.path.realpath(__file__)).parent
-checkers_py  = [x for x in checkers_dir.glob("*.py") if not "__init__.py" in x.name]
-
-# Look for all functions starting "check_" and list them
-all_checks = []
-for checker in checkers_py:
-    # Load in the module contained in the file
-    exec(f"from . import {checker.stem} as _")
-
-    # Get all functions
-    functions = inspect.getmembers(_, inspect.isfunction)
-
-    # Filter out just the functions starting with "check_"
-    all_checks += [x for x in functions if x[0].startswith("check_")]
+# Check routines discovered in this folder (populated on first use)
+all_checks = None
 
 def get_all_checkers():
     """ Return all of the check routines discovered in this directory
 
+    Rules are auto-magically imported from every file in this folder the first
+    time this is called, so that runs without rule checks don't import them.
+
     Returns:
         list: List of tuples containing name of the check and the function
     """
+    global all_checks
+    if all_checks == None:
+        checkers_dir = Path(os.path.realpath(__file__)).parent
+        checkers_py  = sorted(x for x in checkers_dir.glob("*.py") if not "__init__.py" in x.name)
+        # Look for all functions starting "check_" and list them
+        all_checks = []
+        for checker in checkers_py:
+            # Load in the module contained in the file
+            module = importlib.import_module(f".{checker.stem}", __name__)
+            # Get all functions
+            functions = inspect.getmembers(module, inspect.isfunction)
+            # Filter out just the functions starting with "check_"
+            all_checks += [x for x in functions if x[0].startswith("check_")]
     return all_checks
@@ -22,6 +22,7 @@ report = reporting.get_report("elaborator.address_map")
 
 # Import other elaborators that twe need
 from .common import ElaborationError
+from ..profiling import stat_timer
 
 # Import schema types that we need
 from ..schema import Point, Initiator, Target
@@ -66,7 +67,8 @@ def elaborate_map(map, block, scope):
         # Try to find the port
         port = None
         try:
-            port = block.resolvePath(f"[{node.port[0].port}]")
+            with stat_timer("designformat.resolvePath", "address_map"):
+                port = block.resolvePath(f"[{node.port[0].port}]")
         except Exception:
             raise ElaborationError(
                 report.error(f"Could not resolve port {node.port[0].port} on block {block.id}"),
@@ -96,7 +98,8 @@ def elaborate_map(map, block, scope):
                 # Try to find the port
                 port = None
                 try:
-                    port = block.resolvePath(f"[{constraint.port}]")
+                    with stat_timer("designformat.resolvePath", "address_map"):
+                        port = block.resolvePath(f"[{constraint.port}]")
                 except Exception:
                     raise ElaborationError(
                         report.error(f"Could not resolve port {constraint.port} on block {block.id}"),
@@ -27,6 +27,7 @@ report = reporting.get_report("elaborator.common")
 
 from designformat import DFBase, DFConstants
 from ..preprocessor import PreprocessorFile
+from ..profiling import stat_count
 from ..schema import Def, Mod, His, Reg
 from ..schema.ph_tag_base import CONSTANTS as PHConstants
 
@@ -52,7 +53,10 @@ class ElaboratorScope(object):
 
     def __init__(self):
         """ Initialise the scope and any maps for holding lookups. """
-        self.__docs = {}
+        self.__docs          = {}
+        self.__interconnects = {}
+        # Optional ElaborationTracker, recording the documents looked up
+        self.tracker         = None
 
     def add_document(self, document):
         """ Add a document to the scope, automatically classifying it's type
@@ -98,18 +102,47 @@ class ElaboratorScope(object):
         """
         doc_type   = expected.__name__ if expected else None
         clean_name = name.strip().lower()
+        found      = None
         # If we know the type, then we can resolve directly
         if doc_type:
-            if doc_type not in self.__docs or clean_name not in self.__docs[doc_type]:
-                return None
-            else:
-                return self.__docs[doc_type][clean_name]
+            if doc_type in self.__docs and clean_name in self.__docs[doc_type]:
+                found = self.__docs[doc_type][clean_name]
         # If we don't know the type, then search for document only by name
         else:
             for doc_map in self.__docs.values():
                 if clean_name in doc_map:
-                    return doc_map[clean_name]
-            return None
+                    found = doc_map[clean_name]
+                    break
+        stat_count("scope.get_document", doc_type if doc_type else "any")
+        if not found:
+            stat_count("scope.get_document.misses", clean_name)
+        # Record the lookup (including misses) if tracking dependencies
+        if self.tracker:
+            self.tracker.record_lookup(name, expected, found)
+        return found
+
+    def get_interconnect(self, his):
+        """ Retrieve a previously built interconnect for a !His (if available)
+
+        Args:
+            his: The !His document the interconnect was built from
+
+        Returns:
+            DFInterconnect: The cached interconnect, or None if not yet built
+        """
+        found = self.__interconnects.get(his, None)
+        stat_count("scope.interconnect_cache", "hit" if found else "miss")
+        return found
+
+    def add_interconnect(self, his, df_intc):
+        """ Store a built interconnect so that it is only evaluated once per build
+
+        Args:
+            his    : The !His document the interconnect was built from
+            df_intc: The DFInterconnect built from the document
+        """
+        # NOTE: Schema tags don't override equality, so this is keyed on identity
+        self.__interconnects[his] = df_intc
 
     @property
     def defs(self):
@@ -142,11 +175,15 @@ class ElaboratorScope(object):
 
         # Check if the expression appears to be a number or boolean value
         if type(expression) in [int, bool, float]:
+            stat_count("scope.evaluate_expression", "literal")
             return expression
         elif expression.replace(".","").isdigit():
+            stat_count("scope.evaluate_expression", "literal")
             return float(expression) if "." in expression else int(expression)
         elif isinstance(expression, str) and len(expression.strip()) == 0:
+            stat_count("scope.evaluate_expression", "literal")
             return None
+        stat_count("scope.evaluate_expression", "evaluated")
 
         # Clean up any leading or trailing whitespace
         expression = str(expression).strip()
@@ -16,6 +16,8 @@
 # BLADE.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from copy import copy
+
 # Get hold of the report
 from .. import reporting
 report = reporting.get_report("elaborator.interconnect")
@@ -31,13 +33,19 @@ from designformat import DFProject
 def build_interconnect(his, scope):
     """
     Evaluate a !His instance, resolving referred interconnect types and converting
-    to a DFInterconnectType.
+    to a DFInterconnectType. Results are cached in the scope, so each !His is only
+    evaluated once - callers must not modify the returned object.
 
     Args:
         his  : The top-level !His to evaluate
         scope: An ElaboratorScope object containing all documents included
                directly or indirectly by the top module.
     """
+    # Return the interconnect if it has already been built
+    cached = scope.get_interconnect(his)
+    if cached:
+        return cached
+
     intc_role = map_ph_to_df_role(his.role)
     new_intc = DFInterconnect(his.name, intc_role, his.ld if his.ld else his.sd)
 
@@ -99,6 +107,9 @@ def build_interconnect(his, scope):
     if isinstance(his.includes, list) and len(his.includes) > 0:
         new_intc.setAttribute('includes', his.includes)
 
+    # Keep hold of the interconnect type for later builds
+    scope.add_interconnect(his, new_intc)
+
     # Return the interconnect type
     return new_intc
 
@@ -120,8 +131,15 @@ def elaborate_interconnect(his, scope, max_depth=None, project=None):
     # Build the top level interconnect
     df_intc = build_interconnect(his, scope)
 
+    # NOTE: Adding a node to a project sets its parent and project, so a copy is
+    #       taken to avoid modifying the cached interconnect (which is shared by
+    #       every build using the same scope)
+    df_intc = copy(df_intc)
+
     # If no project, create one and add the interconnect as principal
+    # NOTE: Marking a node as principal also sets an attribute on it
     if not project:
+        df_intc.attributes = dict(df_intc.attributes)
         project = DFProject(his.name, his.source.path)
         project.addPrincipalNode(df_intc)
     else:
@@ -130,6 +148,9 @@ def elaborate_interconnect(his, scope, max_depth=None, project=None):
     # For any referenced interconnect types, build those as reference nodes
     for component in df_intc.components:
         if component.type == DFConstants.COMPONENT.COMPLEX:
+            # Skip over types that have already been added to the project
+            if component.ref in project.nodes:
+                continue
             ref_his = scope.get_document(component.ref, expected=His)
             if not ref_his:
                 raise ElaborationError(report.error(f"Failed to resolve His {component.ref}"))
@@ -17,6 +17,8 @@
 #
 
 from copy import copy
+from datetime import datetime
+import os
 
 # Get hold of the report
 from .. import reporting
@@ -26,11 +28,15 @@ report = reporting.get_report("elaborator.module")
 from .address_map import elaborate_map
 from .common import ElaborationError, options_to_attributes, tag_source_info
 from .common import map_ph_to_df_role
-from .registers import elaborate_registers
+from .registers import elaborate_registers, find_register_config
+from .tracker import track_block
 from .interconnect import build_interconnect
+from ..profiling import restart_stats, stat_count, stat_timer, stats_export
+from ..profiling import stats_import
+from ..profiling import trace_events, trace_import, trace_mark, trace_span
 
 # Import schema types that we need
-from ..schema import Point, Const, His, HisRef, Port, Mod, Config, Group, Register
+from ..schema import Point, Const, His, HisRef, Port, Mod
 from ..schema.ph_tag_base import CONSTANTS as PHConstants
 from ..schema.schema_helpers import convert_to_class
 
@@ -124,7 +130,8 @@ def resolve_point_to_ports(block, xmap, point):
         list: List of !DFPorts expanded from the provided !Point
     """
     if not point.mod or len(point.mod.strip()) == 0:
-        port = block.resolvePath(f"[{point.port}]");
+        with stat_timer("designformat.resolvePath", "point"):
+            port = block.resolvePath(f"[{point.port}]");
         if not port:
             raise ElaborationError(report.error(f"Could not find port {point.port} on block {block.id}"))
         return [port]
@@ -132,7 +139,8 @@ def resolve_point_to_ports(block, xmap, point):
         mods  = xmap[point.mod] if point.mod in xmap else [point.mod]
         ports = []
         for mod_name in mods:
-            port = block.resolvePath(f"{mod_name}[{point.port}]")
+            with stat_timer("designformat.resolvePath", "point"):
+                port = block.resolvePath(f"{mod_name}[{point.port}]")
             if not port:
                 raise ElaborationError(report.error(f"Could not find port {point.port} on block {mod_name}"))
             ports.append(port)
@@ -251,6 +259,7 @@ def elaborate_p2c_connections(block, p_in, c_ports, relaxed=False, bidir=False):
                             report.warning(f"Multiple candidates for automatic connection to port {child_in.id} in block {block.id}")
                             break
                         block.addConnection(top_in, top_i, child_in, child_i)
+                        stat_count("elaborate.connections", "relaxed" if relaxed else "strict")
 
 def elaborate_c2p_connections(block, p_out, c_ports, relaxed=False):
     """ Elaborate all implicit connections passing from a child block to the parent.
@@ -280,6 +289,7 @@ def elaborate_c2p_connections(block, p_out, c_ports, relaxed=False):
                             report.warning(f"Multiple candidates for automatic connection to port {top_out.id} in block {block.id}")
                             break
                         block.addConnection(child_out, child_i, top_out, top_i)
+                        stat_count("elaborate.connections", "relaxed" if relaxed else "strict")
 
 def elaborate_c2c_connections(block, c_ports, relaxed=False):
     """ Elaborate all implicit connections passing between child blocks.
@@ -314,8 +324,25 @@ def elaborate_c2c_connections(block, c_ports, relaxed=False):
                                 report.warning(f"Multiple candidates for automatic connection to port {tgt.id} in block {block.id}")
                                 break
                             block.addConnection(src, src_i, tgt, tgt_i)
+                            stat_count("elaborate.connections", "relaxed" if relaxed else "strict")
 
-def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
+def stops_elaboration(module):
+    """
+    Check if a !Mod carries the 'STOP_ELAB' option, in which case none of its
+    children are elaborated (only the boundary IO of the block is calculated).
+
+    Args:
+        module: The !Mod to check (with any inheritance already resolved)
+
+    Returns:
+        bool: True if elaboration should stop at this !Mod, False otherwise
+    """
+    return PHConstants.OPTIONS.STOP_ELAB in (x.lower() for x in module.options)
+
+def build_tree(
+    module, instance_name, parent, scope, max_depth=None, depth=0, dispatcher=None,
+    focus=None
+):
     """
     Recursively convert the Phhidle document definition of the design into a
     DesignFormat hierarchy.
@@ -327,6 +354,11 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
         scope        : The Phhidle document scope for resolution
         max_depth    : The maximum depth to elaborate to
         depth        : The current depth we are working at
+        dispatcher   : SubtreeDispatcher holding child subtrees being elaborated
+                       by worker processes (optional)
+        focus        : Instance names leading from this block down to the block
+                       being focused on, only that child is expanded and this
+                       block's connectivity is not elaborated (optional)
 
     Returns:
         DFBlock: The elaborated block complete with ports, children, etc.
@@ -335,6 +367,7 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
     # Stage 1: Build the block
     # ==========================================================================
     report.debug(f"Elaborating {module.name}")
+    stat_count("elaborate.build_tree", module.name)
 
     # If the !Mod specifies an 'extends' attribute, we need to resolve it
     if module.extends != None:
@@ -451,7 +484,13 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
         block.setPrincipalSignal(main_reset)
 
     # If the depth of the elaboration is constrained, check if we should break
-    if max_depth != None and depth >= max_depth:
+    # NOTE: Ancestors of a focused block are always expanded down to it
+    if not focus and max_depth != None and depth >= max_depth:
+        return block
+
+    # Blocks marked with 'STOP_ELAB' are never expanded beyond their boundary IO
+    if not focus and stops_elaboration(module):
+        report.debug(f"Stopping elaboration at {module.name} due to 'STOP_ELAB'")
         return block
 
     # ==========================================================================
@@ -474,9 +513,29 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
             expands_to = []
             for i in range(count):
                 instance_name = f"{item.name}_{i}"
-                sub_block     = build_tree(
-                    mod_ref, instance_name, block, scope, max_depth, (depth+1)
-                )
+                # If focusing on a block, only expand the next step of the path
+                if focus and instance_name != focus[0]:
+                    continue
+                # Pickup the subtree if it was elaborated by a worker process,
+                # or if it is unchanged since the previous build
+                sub_path  = f"{block.hierarchicalPath()}.{instance_name}"
+                sub_block = None
+                if dispatcher:
+                    sub_block = dispatcher.collect(sub_path)
+                if not sub_block and scope.tracker and not focus:
+                    sub_block = scope.tracker.reuse(sub_path, mod_ref, scope)
+                if sub_block:
+                    sub_block.parent = block
+                else:
+                    # NOTE: Depth is measured from the focused block, so it does
+                    #       not advance while walking down the path
+                    with track_block(scope, sub_path, mod_ref):
+                        with trace_span(mod_ref.name, "build_tree", path=sub_path):
+                            sub_block = build_tree(
+                                mod_ref, instance_name, block, scope, max_depth,
+                                (depth if focus else (depth+1)), dispatcher,
+                                focus=(focus[1:] if focus else None)
+                            )
                 if item.ld or item.sd:
                     sub_block.description = item.ld if item.ld else item.sd
                 block.addChild(sub_block)
@@ -485,6 +544,15 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
             expansion_map[item.name] = expands_to
         report.debug(f"Finished expanding children of: {module.name}")
 
+    # If this block is an ancestor of the focused block, it is only elaborated
+    # as far as its ports and the next block along the path
+    if focus:
+        if len(block.children) == 0:
+            raise ElaborationError(report.error(
+                f"Could not find instance {focus[0]} within {block.hierarchicalPath()}"
+            ))
+        return block
+
     # Pickup 'clk_root' and 'rst_root' nominated signals
     if module.clk_root and isinstance(module.clk_root, Point):
         main_clock = resolve_point_to_ports(block, expansion_map, module.clk_root)[0]
@@ -551,6 +619,7 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
                             sources[i], get_signal_index(sources[i]),
                             targets[i], get_signal_index(targets[i])
                         )
+                        stat_count("elaborate.connections", "explicit")
             # Build one->many connections
             elif len(sources) == 1 and len(targets) > 1:
                 for i in range(len(targets)):
@@ -562,6 +631,7 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
                             sources[0], src_index,
                             targets[i], get_signal_index(targets[i])
                         )
+                        stat_count("elaborate.connections", "explicit")
             # Build many->one connections
             elif len(sources) > 1 and len(targets) == 1:
                 for i in range(len(sources)):
@@ -571,6 +641,7 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
                             sources[i], get_signal_index(sources[i]),
                             targets[0], get_signal_index(targets[0])
                         )
+                        stat_count("elaborate.connections", "explicit")
             # Otherwise this is a bad connection
             else:
                 raise ElaborationError(report.error(
@@ -604,6 +675,7 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
                 # Need to work out which signal index is being tied-off
                 tie_index = len([x for x in port.connections if x.end_port == port])
                 block.addTieOff(port, tie_index, tie)
+                stat_count("elaborate.connections", "tie-off")
 
     report.debug(f"Finished expanding explicit connections of: {module.name}")
 
@@ -629,6 +701,7 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
             if len(child_clock.getInboundConnections()) == 0 and not child_clock in defaults:
                 report.debug(f"Connecting clock from {main_clock.id} to {child_clock.id}")
                 block.addConnection(main_clock, 0, child_clock, 0)
+                stat_count("elaborate.connections", "clock")
         # Distribute the main reset signal
         # NOTE: Same applies for a nominated 'rst_root'
         if main_reset and child_reset and child_reset in child.ports.input:
@@ -636,6 +709,7 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
             if len(child_reset.getInboundConnections()) == 0 and not child_reset in defaults:
                 report.debug(f"Connecting reset from {main_reset.id} to {child_reset.id}")
                 block.addConnection(main_reset, 0, child_reset, 0)
+                stat_count("elaborate.connections", "reset")
 
     report.debug(f"Finished distributing clock and reset signals of: {module.name}")
 
@@ -650,25 +724,26 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
     #       run strict followed by relaxed.
 
     for i in range(2):
-        # Build a full listing of the unconnected top-level ports
-        report.debug(f"Listing unconnected ports")
-        unconn = list_unconnected_ports(block, expansion_map, module.defaults)
+        with stat_timer("elaborate.implicit_connections", "relaxed" if i == 1 else "strict"):
+            # Build a full listing of the unconnected top-level ports
+            report.debug(f"Listing unconnected ports")
+            unconn = list_unconnected_ports(block, expansion_map, module.defaults)
 
-        # Elaborate implicit parent->child inbound connections
-        report.debug(f"Elaborating parent->child inbound connections")
-        elaborate_p2c_connections(block, unconn.parent.in_ports, unconn.children, (i==1))
+            # Elaborate implicit parent->child inbound connections
+            report.debug(f"Elaborating parent->child inbound connections")
+            elaborate_p2c_connections(block, unconn.parent.in_ports, unconn.children, (i==1))
 
-        # Elaborate implicit parent->child bidirectional connections (treat as inbound)
-        report.debug(f"Elaborating parent->child bidirectional connections")
-        elaborate_p2c_connections(block, unconn.parent.inout_ports, unconn.children, (i==1), bidir=True)
+            # Elaborate implicit parent->child bidirectional connections (treat as inbound)
+            report.debug(f"Elaborating parent->child bidirectional connections")
+            elaborate_p2c_connections(block, unconn.parent.inout_ports, unconn.children, (i==1), bidir=True)
 
-        # Elaborate implicit child->parent outbound connections
-        report.debug(f"Elaborating child->parent outbound connections")
-        elaborate_c2p_connections(block, unconn.parent.out_ports, unconn.children, (i==1))
+            # Elaborate implicit child->parent outbound connections
+            report.debug(f"Elaborating child->parent outbound connections")
+            elaborate_c2p_connections(block, unconn.parent.out_ports, unconn.children, (i==1))
 
-        # Elaborate implicit child->child interconnections
-        report.debug(f"Elaborating child->child interconnections")
-        elaborate_c2c_connections(block, unconn.children, (i==1))
+            # Elaborate implicit child->child interconnections
+            report.debug(f"Elaborating child->child interconnections")
+            elaborate_c2c_connections(block, unconn.children, (i==1))
 
     report.debug(f"Finished building implicit connections of: {module.name}")
 
@@ -677,22 +752,16 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
     # ==========================================================================
 
     # Detect if a register set was directly included
-    config_tag = None
-    for file in module.source.all_included_files():
-        all_docs = file.get_parsed_documents()
-        # Detect a defined !Config tag
-        if Config in (type(x) for x in all_docs):
-            config_tag = [x for x in all_docs if isinstance(x, Config)][0]
-            break
-        # Construct a !Config tag with the groups listed in order discovered
-        elif Group in (type(x) for x in all_docs):
-            config_tag = Config([Register(x.name) for x in all_docs if isinstance(x, Group)])
-            break
+    (config_tag, config_docs) = find_register_config(module.source)
+    if scope.tracker:
+        scope.tracker.record_config(module, config_docs)
 
     # If a !Config tag has been picked up (or constructed), build the registers
     if config_tag:
-        for reg_group in elaborate_registers(config_tag, scope):
-            block.addRegister(reg_group)
+        with trace_span(f"{module.name} registers", "registers", path=block.hierarchicalPath()):
+            with stat_timer("elaborate.registers", module.name):
+                for reg_group in elaborate_registers(config_tag, scope):
+                    block.addRegister(reg_group)
 
     # ==========================================================================
     # Stage 10: Check for any remaining unconnected ports and warn about them
@@ -724,12 +793,266 @@ def build_tree(module, instance_name, parent, scope, max_depth=None, depth=0):
 
     # Detect if an address map was defined
     if module.addressmap and len(module.addressmap) > 0:
-        elaborate_map(module.addressmap, block, scope)
+        with trace_span(f"{module.name} address map", "address_map", path=block.hierarchicalPath()):
+            with stat_timer("elaborate.address_map", module.name):
+                elaborate_map(module.addressmap, block, scope)
 
     # Return this block
     return block
 
-def elaborate_module(top, scope, max_depth=None):
+def resolve_instance_path(top, path, scope):
+    """
+    Resolve a hierarchical instance path (e.g. 'top.subsys_0.dma_3') to the !Mod
+    that is instantiated at that point in the design.
+
+    Args:
+        top  : The top-level !Mod the path starts from
+        path : The hierarchical path to resolve
+        scope: The Phhidle document scope for resolution
+
+    Returns:
+        Mod: The !Mod instantiated at the end of the path
+    """
+    segments = [x.strip() for x in path.split('.')]
+    if segments[0] != top.name:
+        raise ElaborationError(report.error(
+            f"Path {path} does not start from top-level module {top.name}"
+        ))
+    module = top
+    for segment in segments[1:]:
+        if module.extends != None:
+            module = resolve_mod_inheritance(module, scope)
+        found = None
+        for item in module.modules:
+            count = scope.evaluate_expression(item.count) if item.count else 1
+            if segment in (f"{item.name}_{i}" for i in range(count)):
+                found = scope.get_document(item.ref, Mod)
+                break
+        if not found:
+            raise ElaborationError(report.error(
+                f"Could not find instance {segment} of path {path} within {module.name}"
+            ))
+        module = found
+    return module
+
+# Subtree dispatcher for the active build, inherited by forked worker processes
+active_dispatcher = None
+
+def available_cpus():
+    """ Count the CPUs that this process is allowed to run on """
+    # NOTE: 'sched_getaffinity' respects any restriction on the process (e.g.
+    #       within a container), but is not available on every platform
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Name given to the root of a subtree while it is dumped by a worker process
+# NOTE: Paths within the dump start from the root, if it kept its instance name
+#       and had a child of the same name then paths would resolve to the child
+SUBTREE_ROOT = "subtree-root"
+
+def elaborate_subtree(mod_name, instance_name, parent_path, depth):
+    """
+    Elaborate a child subtree within a worker process, using the scope inherited
+    from the parent process when the worker was forked. The subtree is detached
+    from its parent and its root renamed (see SUBTREE_ROOT) before being dumped,
+    so paths within the dump are relative.
+
+    Args:
+        mod_name     : Name of the !Mod to elaborate
+        instance_name: The name of this instantiation
+        parent_path  : Hierarchical path of the parent block
+        depth        : The depth the subtree sits at within the full hierarchy
+
+    Returns:
+        tuple: Dumped DFBlock, any report items logged by the worker, the
+               tracked records of the subtree (None if not tracking), the spans
+               traced by the worker (None if not tracing), and the counters and
+               timers recorded by the worker (None if stats are disabled)
+    """
+    since  = datetime.now()
+    mark   = trace_mark()
+    restart_stats()
+    scope  = active_dispatcher.scope
+    module = scope.get_document(mod_name, Mod)
+    path   = f"{parent_path}.{instance_name}"
+    # Reuse the subtree if it is unchanged since the previous build
+    block = scope.tracker.reuse(path, module, scope) if scope.tracker else None
+    if not block:
+        # NOTE: A placeholder parent is used so that messages carry the full path
+        with track_block(scope, path, module):
+            with trace_span(module.name, "build_tree", path=path):
+                block = build_tree(
+                    module, instance_name, DFBlock(parent_path), scope,
+                    active_dispatcher.max_depth, depth
+                )
+    block.parent = None
+    block.id     = SUBTREE_ROOT
+    # Return the records of the subtree, so they can be kept by the main process
+    records = scope.tracker.subtree_records(path) if scope.tracker else None
+    # NOTE: The worker inherited the verbosity of the main process when forked
+    shared  = reporting.get_report()
+    return (
+        block.dumpObject(None), shared.export_items(since, verbosity=shared.verbosity),
+        records, trace_events(mark), stats_export()
+    )
+
+class SubtreeDispatcher(object):
+    """
+    Plans which child !ModInst subtrees of a design should be elaborated in worker
+    processes, and collects the serialised results so they can be attached as the
+    parent block is built. Sibling subtrees are independent until the parent wires
+    them together, so they can be elaborated in parallel.
+    """
+
+    # Minimum number of blocks within a subtree for it to be sent to a worker
+    MIN_SUBTREE_SIZE = 64
+
+    # Time taken to dump a subtree in a worker, and to reload it in the main
+    # process, relative to the time taken to elaborate it
+    # NOTE: Measured on the 'large' generated design, where 400 block subtrees
+    #       take 3.1s to elaborate, 0.6s to dump, and 1.6s to reload
+    DUMP_COST   = 0.2
+    RELOAD_COST = 0.5
+
+    # Smallest estimated saving in elaboration time for subtrees to be dispatched
+    MIN_SAVING = 0.25
+
+    def __init__(self, top, scope, max_depth=None, jobs=1, top_path=None):
+        """ Initialise the dispatcher, sizing every subtree of the design.
+
+        Args:
+            top      : The !Mod to elaborate from
+            scope    : The Phhidle document scope for resolution
+            max_depth: The maximum depth to elaborate to
+            jobs     : The number of worker processes to use
+            top_path : Hierarchical path of the instance of 'top' (optional,
+                       by default this is the name of the !Mod)
+        """
+        self.scope     = scope
+        self.max_depth = max_depth
+        self.jobs      = jobs
+        self.__sizes   = {}
+        self.__plan    = []
+        self.__pending = {}
+        # Aim to split the design into a few subtrees per worker
+        self.total = self.subtree_size(top)
+        share      = max(self.MIN_SUBTREE_SIZE, self.total // (jobs * 2))
+        if self.total >= self.MIN_SUBTREE_SIZE:
+            self.plan(top, top_path if top_path else top.name, 0, share)
+
+    def subtree_size(self, module):
+        """ Count the blocks within the subtree of a !Mod (including itself)
+
+        Args:
+            module: The !Mod to count blocks for
+
+        Returns:
+            int: The number of blocks in the subtree
+        """
+        if module.name in self.__sizes:
+            return self.__sizes[module.name]
+        if module.extends != None:
+            module = resolve_mod_inheritance(module, self.scope)
+        size = 1
+        for item in ([] if stops_elaboration(module) else module.modules):
+            mod_ref = self.scope.get_document(item.ref, Mod)
+            if not mod_ref:
+                raise ElaborationError(report.error(f"Could not resolve child {item.name}"))
+            count = self.scope.evaluate_expression(item.count) if item.count else 1
+            size += count * self.subtree_size(mod_ref)
+        self.__sizes[module.name] = size
+        return size
+
+    def plan(self, module, path, depth, share):
+        """
+        Work out which child subtrees to dispatch, descending into any subtree
+        that is too large to be handled by a single worker. A subtree that is too
+        large is still dispatched whole if none of its descendants can be.
+
+        Args:
+            module: The !Mod being planned
+            path  : Hierarchical path of the instance of the !Mod
+            depth : The depth of the instance
+            share : The largest subtree that should be dispatched
+        """
+        # Children beyond the maximum depth are never expanded
+        if self.max_depth != None and depth >= self.max_depth:
+            return
+        if module.extends != None:
+            module = resolve_mod_inheritance(module, self.scope)
+        if stops_elaboration(module):
+            return
+        for item in module.modules:
+            mod_ref = self.scope.get_document(item.ref, Mod)
+            count   = self.scope.evaluate_expression(item.count) if item.count else 1
+            size    = self.subtree_size(mod_ref)
+            for i in range(count):
+                inst_path = f"{path}.{item.name}_{i}"
+                planned   = len(self.__plan)
+                if size > share:
+                    self.plan(mod_ref, inst_path, depth + 1, share)
+                # Dispatch the subtree whole if it is small enough, or if none of
+                # its descendants were large enough to be dispatched instead
+                if len(self.__plan) == planned and size >= self.MIN_SUBTREE_SIZE:
+                    self.__plan.append((inst_path, mod_ref.name, f"{item.name}_{i}", path, depth + 1))
+
+    @property
+    def planned(self):
+        """ Return the hierarchical paths of every subtree to be dispatched """
+        return [x[0] for x in self.__plan]
+
+    @property
+    def estimated_saving(self):
+        """
+        Estimate the fraction of elaboration time saved by dispatching the planned
+        subtrees, taking the time to elaborate each block as equal. The workers
+        elaborate and dump the subtrees while the main process elaborates the
+        rest of the design, but each subtree is then reloaded by the main process
+        one after another.
+        """
+        sizes = [self.subtree_size(self.scope.get_document(x[1], Mod)) for x in self.__plan]
+        if not sizes:
+            return 0
+        workers  = max(sum(sizes) / self.jobs, max(sizes)) * (1 + self.DUMP_COST)
+        parallel = max(self.total - sum(sizes), workers) + sum(sizes) * self.RELOAD_COST
+        return 1 - (parallel / self.total)
+
+    def start(self, pool):
+        """ Submit every planned subtree to a pool of worker processes
+
+        Args:
+            pool: The multiprocessing pool to submit to
+        """
+        for path, mod_name, instance_name, parent_path, depth in self.__plan:
+            self.__pending[path] = pool.apply_async(
+                elaborate_subtree, (mod_name, instance_name, parent_path, depth)
+            )
+
+    def collect(self, path):
+        """ Retrieve and reload a subtree elaborated by a worker process
+
+        Args:
+            path: Hierarchical path of the instance
+
+        Returns:
+            DFBlock: The reloaded block, or None if the path wasn't dispatched
+        """
+        if path not in self.__pending:
+            return None
+        (dump, items, records, events, stats) = self.__pending.pop(path).get()
+        reporting.get_report().import_items(items)
+        trace_import(events)
+        stats_import(stats)
+        if records != None:
+            self.scope.tracker.adopt(path, records)
+        block    = DFBlock().loadObject(dump)
+        block.id = path.split('.')[-1]
+        return block
+
+def elaborate_module(
+    top, scope, max_depth=None, jobs=None, inst_path=None, tracker=None
+):
     """
     Elaborate a !Mod tag instance, expanding hierarchy and resolving connections
     up to the maximum requested depth.
@@ -740,58 +1063,148 @@ def elaborate_module(top, scope, max_depth=None):
                    directly or indirectly by the top module.
         max_depth: The maximum depth to elaborate to (optional, by default
                    performs a full depth elaboration - max_depth=None)
+        jobs     : Number of worker processes to elaborate large child subtrees
+                   with (optional, by default elaboration is serial)
+        inst_path: Hierarchical path of a block to focus on (e.g. 'top.sub_0'),
+                   ancestors are only elaborated as far as their ports and the
+                   next block on the path (optional)
+        tracker  : ElaborationTracker to record the dependencies of each block
+                   with, reusing unchanged subtrees of a previous build if it
+                   holds one (optional)
 
     Returns:
         DFProject: Contains the elaborated block and all interconnects used
     """
+    global active_dispatcher
+
     # Build a new project
     project = DFProject(top.name, top.source.path)
 
+    # If focusing on a block, resolve it and work out the path to it
+    focus  = None
+    target = top
+    if inst_path:
+        target = resolve_instance_path(top, inst_path, scope)
+        focus  = [x.strip() for x in inst_path.split('.')][1:]
+        report.info(f"Focusing elaboration on {inst_path} of type {target.name}")
+
+    # Attach the tracker to the scope, so that every lookup is recorded
+    # NOTE: Ancestors of a focused block are only partially elaborated, so can't
+    #       be tracked
+    if tracker and focus:
+        report.warning("Incremental elaboration is not supported with a focused path")
+        tracker = None
+    scope.tracker = tracker
+
+    # If the whole design is unchanged, reuse it from the previous build
+    block = tracker.reuse(top.name, top, scope) if tracker else None
+
+    # Work out if any subtrees are large enough to elaborate in parallel, using
+    # no more processes than there are CPUs to run them on
+    # NOTE: Workers are forked so that they share the scope with this process
+    # NOTE: 'multiprocessing' is only imported when parallel elaboration is
+    #       requested, as importing it slows down the start of every run
+    dispatcher = None
+    if jobs and jobs > 1 and not block and jobs > available_cpus():
+        jobs = available_cpus()
+        report.info(f"Limiting elaboration to {jobs} processes, as only {jobs} CPUs are available")
+    if jobs and jobs > 1 and not block:
+        import multiprocessing
+        if "fork" not in multiprocessing.get_all_start_methods():
+            report.warning("Parallel elaboration requires 'fork', running serially")
+        else:
+            dispatcher = SubtreeDispatcher(
+                target, scope, max_depth=max_depth, jobs=jobs, top_path=inst_path
+            )
+            if len(dispatcher.planned) == 0:
+                dispatcher = None
+            # Reloading each subtree in this process can outweigh the time saved
+            elif dispatcher.estimated_saving < dispatcher.MIN_SAVING:
+                report.info(
+                    f"Elaborating serially, as using {jobs} processes is only estimated "
+                    f"to save {dispatcher.estimated_saving:.0%} of the time"
+                )
+                dispatcher = None
+            else:
+                report.info(
+                    f"Elaborating {len(dispatcher.planned)} subtrees using {jobs} processes",
+                    body="\n".join(dispatcher.planned)
+                )
+
     # Build the tree for the root block
-    block = build_tree(
-        top,                    # The top-level !Mod to evaluate
-        top.name,               # Name to use for the top-level !Mod instance
-        None,                   # No parent exists
-        scope,                  # Scope to use for elaboration
-        max_depth = max_depth   # Maximum depth to elaborate to
-    )
+    try:
+        if not block and dispatcher:
+            active_dispatcher = dispatcher
+            try:
+                with multiprocessing.get_context("fork").Pool(jobs) as pool:
+                    dispatcher.start(pool)
+                    with track_block(scope, top.name, top):
+                        with trace_span(top.name, "build_tree", path=top.name):
+                            block = build_tree(
+                                top, top.name, None, scope, max_depth=max_depth,
+                                dispatcher=dispatcher, focus=focus
+                            )
+            finally:
+                active_dispatcher = None
+        elif not block:
+            with track_block(scope, top.name, top):
+                with trace_span(top.name, "build_tree", path=top.name):
+                    block = build_tree(
+                        top,                    # The top-level !Mod to evaluate
+                        top.name,               # Name to use for the top-level !Mod instance
+                        None,                   # No parent exists
+                        scope,                  # Scope to use for elaboration
+                        max_depth = max_depth,  # Maximum depth to elaborate to
+                        focus     = focus       # Path down to the block being focused on
+                    )
+    finally:
+        scope.tracker = None
+
+    if tracker and tracker.previous:
+        report.info(
+            f"Reused {len(tracker.reused)} unchanged subtrees from the previous build",
+            body="\n".join(tracker.reused)
+        )
 
     # Attach the block as a principal node to the project
     project.addPrincipalNode(block)
 
     # Get a list of all of the interconnection types directly used by the design
+    # NOTE: A dictionary is used as an ordered set, so that each type is only
+    #       chased once regardless of how many ports use it
+    used_types = {}
     def list_interconnects(block):
-        types = [x.type for x in block.getAllPorts()]
+        for port in block.getAllPorts():
+            used_types[port.type] = True
         for child in block.children:
-            types += list_interconnects(child)
-        return types
-
-    used_types = []
+            list_interconnects(child)
 
     for block in (x for x in project.nodes.values() if isinstance(x, DFBlock)):
-        used_types += list_interconnects(block)
+        list_interconnects(block)
 
-    # Expand the directly used types to include all referenced types
+    # Expand the directly used types to include all referenced types, visiting
+    # each unique !His only once
+    all_required = {}
     def chase_his(his_ref):
         his = scope.get_document(his_ref, His)
         if not his:
             raise ElaborationError(report.error(f"Could not locate His {his_ref}"))
-        sub_his  = [x for x in his.ports if isinstance(x, HisRef)]
-        required = [his] + [scope.get_document(x.ref, His) for x in sub_his]
-        for item in sub_his:
-            required += chase_his(item.ref)
-        return required
+        if his.name in all_required:
+            return
+        all_required[his.name] = his
+        for item in (x for x in his.ports if isinstance(x, HisRef)):
+            chase_his(item.ref)
 
-    all_required = []
     for his_type in used_types:
-        all_required += chase_his(his_type)
+        chase_his(his_type)
 
-    # Ensure the list of His types is unique
-    all_required = list(set(all_required))
+    all_required = list(all_required.values())
 
     # Build and attach descriptions of each interconnect type
+    # NOTE: Attaching sets the project of the interconnect, so a copy is taken to
+    #       avoid modifying the one cached by the scope for later builds
     for his in all_required:
-        project.addReferenceNode(build_interconnect(his, scope))
+        project.addReferenceNode(copy(build_interconnect(his, scope)))
 
     # Log all of the interconnect types that were detected
     report.info(
@@ -24,6 +24,7 @@ from .. import reporting
 report = reporting.get_report("elaborator.registers")
 
 from .common import ElaborationError, options_to_attributes, tag_source_info
+from ..profiling import trace_span
 
 from ..schema import Config, Define, Field, Group, Macro, Reg, Register
 from ..schema.ph_tag_base import CONSTANTS as PHConstants
@@ -604,6 +605,29 @@ def build_group(
     # Return a tuple of the register group and the next free address
     return (df_groups, next_addr)
 
+def find_register_config(source):
+    """
+    Locate the register configuration directly included by the file that a !Mod
+    was declared in. This is either an explicit !Config tag, or one constructed
+    from the !Group tags of the first included file that declares any.
+
+    Args:
+        source: The PreprocessorFile that declared the !Mod (may be None)
+
+    Returns:
+        tuple: The !Config tag and every document parsed from the file that
+               provided it, or (None, []) if no configuration was included
+    """
+    for file in (source.all_included_files() if source else []):
+        all_docs = file.get_parsed_documents()
+        # Detect a defined !Config tag
+        if Config in (type(x) for x in all_docs):
+            return ([x for x in all_docs if isinstance(x, Config)][0], all_docs)
+        # Construct a !Config tag with the groups listed in order discovered
+        elif Group in (type(x) for x in all_docs):
+            return (Config([Register(x.name) for x in all_docs if isinstance(x, Group)]), all_docs)
+    return (None, [])
+
 def elaborate_registers(top, scope, max_depth=None):
     """
     Evaluate either a !Config expanding into a list of registers. !Registers or
@@ -670,9 +694,10 @@ def elaborate_registers(top, scope, max_depth=None):
                     ),
                     ph_doc=item
                 )
-            (reg_groups, next_address) = build_group(
-                resolved, False, next_address, scope, group_defs,
-            )
+            with trace_span(resolved.name, "register_group"):
+                (reg_groups, next_address) = build_group(
+                    resolved, False, next_address, scope, group_defs,
+                )
             all_groups += reg_groups
         elif isinstance(item, Macro):
             resolved = scope.get_document(item.macro, expected=Group)
@@ -695,10 +720,11 @@ def elaborate_registers(top, scope, max_depth=None):
                 ref_ctx={ "group": resolved, "defs": macro_defs }
             )
             # Build the group
-            (reg_groups, next_address) = build_group(
-                resolved, True, next_address, scope, macro_defs,
-                m_prefix=item.name, m_array=m_array, m_align=m_align
-            )
+            with trace_span(resolved.name, "register_group", macro=item.name):
+                (reg_groups, next_address) = build_group(
+                    resolved, True, next_address, scope, macro_defs,
+                    m_prefix=item.name, m_array=m_array, m_align=m_align
+                )
             all_groups += reg_groups
         else:
             raise ElaborationError(
@@ -0,0 +1,286 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Tracks the documents that the elaboration of each block depended on, so that a
+later build can reuse any subtree of the design where none of them have changed.
+"""
+
+import contextlib
+import hashlib
+import json
+
+# Get hold of the report
+from .. import reporting
+report = reporting.get_report("elaborator.tracker")
+
+from designformat import DFBlock
+
+from .. import schema
+from ..profiling import stat_count, stat_timer
+from ..schema import Mod
+from ..schema.ph_tag_base import TagBase
+from .registers import find_register_config
+
+def describe(value):
+    """
+    Convert a value from a Phhidle document into primitive types, so that it can
+    be fingerprinted. Private attributes of documents (such as the marks and the
+    source file) are skipped, apart from the path of the source file.
+
+    Args:
+        value: The value to describe
+
+    Returns:
+        object: A description of the value using only primitive types
+    """
+    if isinstance(value, TagBase):
+        return {
+            "type"  : type(value).__name__,
+            "source": value.source.path if value.source else None,
+            "fields": {
+                k: describe(v) for k, v in vars(value).items() if not k.startswith('_')
+            },
+        }
+    elif isinstance(value, (list, tuple)):
+        return [describe(x) for x in value]
+    elif isinstance(value, dict):
+        return { str(k): describe(v) for k, v in value.items() }
+    elif value == None or isinstance(value, (str, int, float, bool)):
+        return value
+    else:
+        return type(value).__name__
+
+def fingerprint(value):
+    """ Calculate a fingerprint of a Phhidle document (or list of documents).
+
+    Args:
+        value: The document to fingerprint, may be None
+
+    Returns:
+        str: Hex digest identifying the contents of the document
+    """
+    return hashlib.sha256(
+        json.dumps(describe(value), sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+def track_block(scope, path, module):
+    """ Track the elaboration of a block, if the scope has a tracker attached.
+
+    Args:
+        scope : The ElaboratorScope being elaborated with
+        path  : Hierarchical path of the block
+        module: The !Mod the block is elaborated from
+
+    Returns:
+        ContextManager: Context to elaborate the block within
+    """
+    if scope.tracker:
+        return scope.tracker.track(path, module)
+    return contextlib.nullcontext()
+
+class ElaborationTracker(object):
+    """
+    Records every document that the elaboration of each block looked up from the
+    scope, along with the register configuration it included. Each record only
+    holds the block's own dependencies - a subtree is unchanged if the records
+    of every block within it are unchanged.
+
+    Given the records and design from a previous build, blocks are checked as
+    they are reached - and an unchanged subtree is taken from the previous design
+    rather than being elaborated again.
+    """
+
+    def __init__(self, previous=None, records=None):
+        """ Initialise the tracker.
+
+        Args:
+            previous: DFProject produced by a previous build (optional)
+            records : Records of the previous build, by block path (optional)
+        """
+        self.records   = {}
+        self.previous  = previous
+        self.prev_recs = records if (records != None and previous != None) else {}
+        self.reused    = []
+        self.__frames  = []
+        self.__prints  = {}
+
+    def fingerprint(self, doc):
+        """ Fingerprint a document, caching the result for the rest of the build.
+
+        Args:
+            doc: The document to fingerprint, may be None
+
+        Returns:
+            str: Hex digest identifying the contents of the document
+        """
+        # NOTE: Documents are keyed by identity, as tags don't override equality
+        if id(doc) not in self.__prints:
+            self.__prints[id(doc)] = (fingerprint(doc), doc)
+        return self.__prints[id(doc)][0]
+
+    def record_lookup(self, name, expected, doc):
+        """ Record a document being looked up from the scope.
+
+        Args:
+            name    : The name that was looked up
+            expected: The expected type of the document (may be None)
+            doc     : The document that was found (or None if not found)
+        """
+        if self.__frames:
+            key = f"{expected.__name__ if expected else '*'}:{name.strip().lower()}"
+            self.__frames[-1]["deps"][key] = self.fingerprint(doc)
+
+    def record_config(self, module, config_docs):
+        """ Record the register configuration included by a !Mod.
+
+        Args:
+            module     : The !Mod that included the configuration
+            config_docs: Every document from the file providing the configuration
+        """
+        if self.__frames:
+            self.__frames[-1]["deps"][f"config:{module.name.lower()}"] = fingerprint(config_docs)
+
+    @contextlib.contextmanager
+    def track(self, path, module):
+        """ Context within which a block is elaborated.
+
+        Args:
+            path  : Hierarchical path of the block
+            module: The !Mod the block is elaborated from
+        """
+        frame = { "mod": self.fingerprint(module), "deps": {}, "children": [] }
+        self.__frames.append(frame)
+        try:
+            yield
+        finally:
+            self.__frames.pop()
+        # Only record blocks that were successfully elaborated
+        self.records[path] = frame
+        if self.__frames:
+            self.__frames[-1]["children"].append(path)
+
+    def current_value(self, key, scope):
+        """ Calculate the current fingerprint of a recorded dependency.
+
+        Args:
+            key  : The key of the dependency
+            scope: The ElaboratorScope to resolve documents from
+
+        Returns:
+            str: Hex digest of the dependency within the current scope
+        """
+        kind, name = key.split(':', 1)
+        if kind == 'config':
+            module = scope.get_document(name, Mod)
+            return fingerprint(find_register_config(module.source if module else None)[1])
+        expected = getattr(schema, kind) if kind != '*' else None
+        return self.fingerprint(scope.get_document(name, expected))
+
+    def is_unchanged(self, path, scope):
+        """ Check if a subtree from the previous build is unchanged.
+
+        Args:
+            path : Hierarchical path of the root of the subtree
+            scope: The ElaboratorScope to resolve documents from
+
+        Returns:
+            bool: True if every block in the subtree is unchanged
+        """
+        record = self.prev_recs.get(path, None)
+        if not record:
+            return False
+        for key, value in record["deps"].items():
+            if self.current_value(key, scope) != value:
+                report.debug(f"Block {path} has changed due to {key}")
+                return False
+        return all(self.is_unchanged(x, scope) for x in record["children"])
+
+    def adopt(self, path, records):
+        """ Take on the records of a subtree elaborated or reused elsewhere.
+
+        Args:
+            path   : Hierarchical path of the root of the subtree
+            records: Records for every block in the subtree, by path
+        """
+        self.records.update(records)
+        if self.__frames:
+            self.__frames[-1]["children"].append(path)
+
+    def subtree_records(self, path, records=None):
+        """ Gather the records of every block within a subtree.
+
+        Args:
+            path   : Hierarchical path of the root of the subtree
+            records: The records to gather from (default: this build's records)
+
+        Returns:
+            dict: Records of the subtree, by path
+        """
+        records  = records if records != None else self.records
+        gathered = { path: records[path] }
+        for child in records[path]["children"]:
+            gathered.update(self.subtree_records(child, records))
+        return gathered
+
+    def reuse(self, path, module, scope):
+        """
+        Attempt to reuse a subtree from the previous build, which is only possible
+        if it was elaborated from the same !Mod and none of the dependencies of
+        any block within it have changed.
+
+        Args:
+            path  : Hierarchical path of the root of the subtree
+            module: The !Mod the subtree is to be elaborated from
+            scope : The ElaboratorScope to resolve documents from
+
+        Returns:
+            DFBlock: The block from the previous build, or None if not reusable
+        """
+        stat_count("tracker.reuse", "checked")
+        record = self.prev_recs.get(path, None)
+        if not record or record["mod"] != self.fingerprint(module):
+            return None
+        # NOTE: Lookups made while checking are not dependencies of the parent
+        scope.tracker = None
+        try:
+            unchanged = self.is_unchanged(path, scope)
+        finally:
+            scope.tracker = self
+        if not unchanged:
+            return None
+        # Locate the block within the previous design
+        root_id = path.split('.')[0]
+        roots   = [
+            x for x in self.previous.nodes.values()
+            if isinstance(x, DFBlock) and x.id == root_id
+        ]
+        if len(roots) != 1:
+            return None
+        with stat_timer("designformat.resolvePath", "tracker"):
+            block = roots[0] if path == root_id else roots[0].resolvePath(path)
+        # Drop any connections made to the block by its previous parent, as the
+        # new parent is responsible for connecting it up again
+        internal = set(id(x) for x in block.connections)
+        for port in block.getAllPorts():
+            port.connections = [x for x in port.connections if id(x) in internal]
+        report.debug(f"Reusing unchanged subtree {path} from the previous build")
+        self.adopt(path, self.subtree_records(path, self.prev_recs))
+        self.reused.append(path)
+        stat_count("tracker.reuse", "reused")
+        return block
@@ -47,7 +47,9 @@ elaborators = {
 # List of types to ignore
 ignored = []
 
-def elaborate(top_docs, scope, max_depth=None):
+def elaborate(
+    top_docs, scope, max_depth=None, jobs=None, inst_path=None, tracker=None
+):
     """ Elaborate described design from a top-level tag downwards.
 
     Run elaboration, starting from a Phhidle YAML schema object. Depending on the
@@ -60,6 +62,12 @@ def elaborate(top_docs, scope, max_depth=None):
                  : parsed into the tool, allows references to be evaluated.
         max_depth: The maximum depth to elaborate to (optional, by default
                    performs a full depth elaboration - max_depth=None)
+        jobs     : Number of worker processes to use for elaborating large
+                   !Mod hierarchies (optional, by default elaboration is serial)
+        inst_path: Hierarchical path of a block to focus elaboration on, the
+                   first segment selects the top-level !Mod (optional)
+        tracker  : ElaborationTracker to record the dependencies of each block
+                   of every !Mod with (optional)
 
     Returns:
         DFProject: A DesignFormat project describing the elaborated design
@@ -71,6 +79,15 @@ def elaborate(top_docs, scope, max_depth=None):
     # Create a single project to return
     project = DFProject()
 
+    # If focusing on a block, only the !Mod at the root of the path is elaborated
+    focus_mod = None
+    if inst_path:
+        focus_mod = inst_path.split('.')[0].strip()
+        if focus_mod not in (x.name for x in other_tags if isinstance(x, Mod)):
+            raise ElaborationError(
+                report.error(f"No top-level !Mod matches the root of path {inst_path}")
+            )
+
     # Work through all of the non-register tags
     for doc in other_tags:
         if type(doc) in ignored:
@@ -80,7 +97,16 @@ def elaborate(top_docs, scope, max_depth=None):
             raise ElaborationError(
                 report.error(f"Unsupported top level type {type(doc).__name__}", item=doc)
             )
-        df_obj = elaborators[type(doc).__name__](doc, scope, max_depth=max_depth)
+        elif isinstance(doc, Mod) and focus_mod and doc.name != focus_mod:
+            report.debug(f"Skipping top-level !Mod {doc.name} outside of path {inst_path}")
+            continue
+        elif isinstance(doc, Mod):
+            df_obj = elaborate_module(
+                doc, scope, max_depth=max_depth, jobs=jobs,
+                inst_path=(inst_path if focus_mod else None), tracker=tracker
+            )
+        else:
+            df_obj = elaborators[type(doc).__name__](doc, scope, max_depth=max_depth)
         if isinstance(df_obj, DFProject):
             project.mergeProject(df_obj)
         else:
@@ -22,6 +22,8 @@ control statements (#if, #else, #endif, etc.) as well as loops (#for, #endfor)
 and file inclusion (#include).
 """
 
+import contextlib
+import os
 import re
 
 from .. import reporting
@@ -37,9 +39,28 @@ class Preprocessor(object):
     and included files.
     """
 
-    def __init__(self):
-        """Initialisation function for the preprocessor."""
-        self.__scopes = {}
+    def __init__(self, donors=None, changed=None):
+        """Initialisation function for the preprocessor.
+
+        Args:
+            donors : Preprocessors of other builds (e.g. other top files, or
+                     variants built with different defines), whose evaluated
+                     files are reused wherever every define they read has the
+                     same value - tried in order (optional)
+            changed: Paths of files that have changed on disk since the donors
+                     were evaluated, whose evaluations are never reused (optional)
+        """
+        self.__scopes  = {}
+        self.donors    = list(donors) if donors else []
+        self.changed   = set(os.path.abspath(x) for x in changed) if changed else set()
+        self.reused    = [] # Files whose evaluation was reused from a donor
+        # Environment that files are evaluated with
+        # NOTE: This is a copy, as it is looked up for most values and reading
+        #       'os.environ' is slow
+        self.environ   = dict(os.environ)
+        # Evaluations in progress, with the outermost tracking the whole scope
+        self.__windows = [self.__new_window(None)]
+        self.__capture = None # Dictionary capturing reads (see 'capture_reads')
 
     @property
     def scopes(self):
@@ -124,6 +145,245 @@ class Preprocessor(object):
                     found_file = self.__scopes[dep].get_file(file)
             return found_file
 
+    @property
+    def referenced_defines(self):
+        """
+        Defines read by any evaluation before being set by a file - i.e. every
+        define passed to the preprocessor that has affected the evaluated files,
+        mapped to the value that was read (None if it was not defined).
+        """
+        return dict(self.__windows[0]["reads"])
+
+    @property
+    def referenced_environ(self):
+        """
+        Environment variables read by any evaluation, mapped to the value that
+        was read (None if it was not set).
+        """
+        return dict(self.__windows[0]["environ"])
+
+    @staticmethod
+    def __new_window(pre_file):
+        return {
+            "file"    : pre_file,
+            "reads"   : {},    # Defines read before being set, by name
+            "environ" : {},    # Environment variables read, by name
+            "written" : set(), # Names of defines set so far
+            "writes"  : [],    # Every define set as (scope, key, value)
+            "nested"  : [],    # Files evaluated during this evaluation
+            "included": [],    # Files included that were already evaluated
+        }
+
+    @contextlib.contextmanager
+    def track_evaluation(self, pre_file):
+        """
+        Context within which a file is evaluated, recording the defines that it
+        (or any file it causes to be evaluated) reads and sets. The record is
+        only attached to the file if evaluation succeeds.
+
+        Args:
+            pre_file: The PreprocessorFile being evaluated
+        """
+        window = self.__new_window(pre_file)
+        self.__windows.append(window)
+        try:
+            yield
+        finally:
+            self.__windows.pop()
+        pre_file.set_evaluation_record({
+            "reads"   : window["reads"],
+            "environ" : window["environ"],
+            "writes"  : window["writes"],
+            "nested"  : window["nested"],
+            "included": window["included"],
+        })
+        for outer in self.__windows[1:]:
+            outer["nested"].append(pre_file)
+
+    def capture_reads(self):
+        """
+        Start capturing reads of defines, rather than recording them against the
+        files being evaluated, until 'end_capture' is called. Calling this again
+        starts a new capture.
+
+        Returns:
+            dict: Populated with the values read, which can later be passed to
+                  'note_reads' if they turn out to be used
+        """
+        # NOTE: This is called for every define of every file, so is kept cheaper
+        #       than a context manager
+        self.__capture = {}
+        return self.__capture
+
+    def end_capture(self):
+        """ Stop capturing reads of defines (see 'capture_reads') """
+        self.__capture = None
+
+    def note_read(self, scope, key):
+        """ Record a define being read by the file being evaluated.
+
+        Args:
+            scope: The name of the scope the define is read from
+            key  : The name of the define (which may not be defined)
+        """
+        value = self.__scopes[scope].defines.get(key, None)
+        if self.__capture != None:
+            self.__capture[key] = value
+            return
+        # NOTE: Only the first read before the define is set counts
+        for window in self.__windows:
+            if key not in window["reads"] and key not in window["written"]:
+                window["reads"][key] = value
+
+    def note_reads(self, reads):
+        """ Record several defines being read, along with the values read.
+
+        Args:
+            reads: Dictionary of the values read (None if not defined) by name
+        """
+        if self.__capture != None:
+            self.__capture.update(reads)
+            return
+        # NOTE: Only the first read before the define is set counts
+        for window in self.__windows:
+            for key, value in reads.items():
+                if key not in window["reads"] and key not in window["written"]:
+                    window["reads"][key] = value
+
+    def read_environ(self, key):
+        """ Read an environment variable, recording it against any evaluation.
+
+        Args:
+            key: The name of the environment variable (which may not be set)
+
+        Returns:
+            str: The value of the variable, or None if it is not set
+        """
+        value = self.environ.get(key, None)
+        # NOTE: Only names that could be set are recorded, as any expression
+        #       that fails to resolve is also looked up
+        if value != None or key.isidentifier():
+            for window in self.__windows:
+                if key not in window["environ"]:
+                    window["environ"][key] = value
+        return value
+
+    def note_definition(self, scope, key, value):
+        """ Set a define within a scope, recording it against any evaluation.
+
+        Args:
+            scope: The name of the scope to set the define within
+            key  : The name of the define
+            value: The value of the define
+        """
+        self.__scopes[scope].set_definition(key, value)
+        for window in self.__windows:
+            window["written"].add(key)
+            window["writes"].append((scope, key, value))
+
+    def note_include(self, pre_file):
+        """ Record a file that was already evaluated being included.
+
+        Args:
+            pre_file: The PreprocessorFile being included
+        """
+        for window in self.__windows[1:]:
+            if pre_file not in window["nested"] and pre_file not in window["included"]:
+                window["included"].append(pre_file)
+
+    def __local_file(self, pre_file):
+        """ Find the file in this preprocessor matching a file from the donor """
+        return self.find_file(pre_file.scope, pre_file.path)
+
+    def reuse_evaluation(self, pre_file):
+        """
+        Attempt to reuse the evaluation of a file from one of the donors. This
+        is only possible if the file (and every file it evaluated) is unchanged
+        on disk, every define the donated evaluation read before setting has the
+        same value in this scope, every file it evaluated is yet to be evaluated
+        here, and every file it included that was already evaluated produced the
+        same result here. The defines it set are then replayed and the result of
+        every file it evaluated is adopted.
+
+        Args:
+            pre_file: The PreprocessorFile about to be evaluated
+
+        Returns:
+            bool: True if the evaluation was reused
+        """
+        # NOTE: Donors often share an evaluation (adopted from one another), so
+        #       each distinct evaluation is only checked once
+        checked = set()
+        for donor in self.donors:
+            donated = donor.find_file(pre_file.scope, pre_file.path)
+            if (
+                (not donated                                                 ) or
+                (not donated.evaluation_record                               ) or
+                (donated.origin in checked                                   ) or
+                (os.path.abspath(donated.path) != os.path.abspath(pre_file.path))
+            ):
+                continue
+            checked.add(donated.origin)
+            if self.__can_reuse(pre_file, donated):
+                self.__replay(pre_file, donated)
+                return True
+        return False
+
+    def __can_reuse(self, pre_file, donated):
+        """ Check if a donated evaluation is valid for a file (see 'reuse_evaluation') """
+        record = donated.evaluation_record
+        for file in [donated] + record["nested"]:
+            if os.path.abspath(file.path) in self.changed:
+                report.debug(f"Cannot reuse evaluation of {pre_file.path} as {file.path} changed")
+                return False
+        defines = self.__scopes[pre_file.scope].defines
+        for key, value in record["reads"].items():
+            current = defines.get(key, None)
+            if type(current) != type(value) or current != value:
+                report.debug(f"Cannot reuse evaluation of {pre_file.path} as {key} differs")
+                return False
+        for key, value in record["environ"].items():
+            if self.environ.get(key, None) != value:
+                report.debug(f"Cannot reuse evaluation of {pre_file.path} as ${key} differs")
+                return False
+        for file in record["nested"]:
+            local = self.__local_file(file)
+            if not local or local.evaluated:
+                return False
+        # NOTE: Files sharing an origin are known to have the same result
+        for file in record["included"]:
+            local = self.__local_file(file)
+            if (
+                (not local          ) or
+                (not local.evaluated) or
+                (
+                    (local.origin is not file.origin) and
+                    ([str(x) for x in local.get_result()] != [str(x) for x in file.get_result()])
+                )
+            ):
+                return False
+        return True
+
+    def __replay(self, pre_file, donated):
+        """ Replay a donated evaluation of a file (see 'reuse_evaluation') """
+        record = donated.evaluation_record
+        self.note_reads(record["reads"])
+        for window in self.__windows:
+            for key, value in record["environ"].items():
+                window["environ"].setdefault(key, value)
+        for scope, key, value in record["writes"]:
+            self.note_definition(scope, key, value)
+        for file in record["included"]:
+            self.note_include(self.__local_file(file))
+        for file in record["nested"] + [donated]:
+            local = self.__local_file(file)
+            local.adopt_evaluation(file, self.__local_file)
+            if local is not pre_file:
+                for outer in self.__windows[1:]:
+                    outer["nested"].append(local)
+            self.reused.append(local)
+        report.debug(f"Reused evaluation of {pre_file.path} from another build")
+
     def get_all_evaluated_files(self):
         """ Return all files from all scopes that have been successfully evaluated.
 
@@ -22,6 +22,8 @@ import re
 from .. import reporting
 report = reporting.get_report("preprocessor.file")
 
+from ..profiling import stat_count, trace_span
+
 from .block import PreprocessorBlock
 from .common import PreprocessorError, preprocessor_regex
 from .for_block import PreprocessorForBlock
@@ -63,6 +65,8 @@ class PreprocessorFile(object):
         self.__parse_context = []        # The hierarchy down to the block being assembled
         self.__final         = []        # The result of the successful evaluation
         self.__includes      = []        # List of #include'd files
+        self.__record        = None      # Defines read and set by the evaluation
+        self.__origin        = None      # Token identifying the evaluation
         # Extraneous variables
         self.__documents     = []        # Used to relate parsed documents back to source
 
@@ -86,6 +90,71 @@ class PreprocessorFile(object):
         """ Has the file been loaded from disk? """
         return len(self.__lines) > 0
 
+    @property
+    def evaluation_record(self):
+        """ Record of the defines read and set during evaluation (if evaluated) """
+        return self.__record
+
+    @property
+    def origin(self):
+        """
+        Token identifying the evaluation that produced this file's result (None
+        if not evaluated), which is carried over when the result is adopted by
+        a file in another preprocessor. Files with the same origin have produced
+        exactly the same result.
+        """
+        return self.__origin
+
+    @property
+    def referenced_defines(self):
+        """
+        Defines that the evaluation of this file (including any file it caused to
+        be evaluated) read before they were set by a file, mapped to the value
+        that was read (None if not defined). Another variant of the design will
+        produce the same result for this file if all of these values are the same.
+        """
+        return dict(self.__record["reads"]) if self.__record else None
+
+    def set_evaluation_record(self, record):
+        """ Attach the record of the file's evaluation.
+
+        Args:
+            record: Dictionary of the defines read and set, as well as the files
+                    evaluated and included, during the evaluation
+        """
+        self.__record = { **record, "includes": self.__includes[:] }
+
+    def adopt_evaluation(self, donated, local_file):
+        """ Take on the result of evaluating the same file in another preprocessor.
+
+        Args:
+            donated   : The evaluated PreprocessorFile from the other preprocessor
+            local_file: Function mapping a file from the other preprocessor to
+                        the equivalent file in this one
+        """
+        record = donated.evaluation_record
+        self.__final = []
+        for line in donated.get_result():
+            copied = PreprocessorLine(line)
+            if line.source_file:
+                copied.source_file = local_file(line.source_file)
+            if line.input_line >= 0:
+                copied.input_line = line.input_line
+            if line.output_line >= 0:
+                copied.output_line = line.output_line
+            self.__final.append(copied)
+        self.__includes  = record["includes"][:]
+        self.__record    = {
+            "reads"   : dict(record["reads"]),
+            "environ" : dict(record["environ"]),
+            "writes"  : record["writes"][:],
+            "nested"  : [local_file(x) for x in record["nested"]],
+            "included": [local_file(x) for x in record["included"]],
+            "includes": record["includes"][:],
+        }
+        self.__origin    = donated.origin
+        self.__evaluated = True
+
     def set_definition(self, key, value):
         """ Add a new key-value pair to the scope's definitions map.
 
@@ -93,7 +162,7 @@ class PreprocessorFile(object):
             key  : The key for the definition
             value: The value of the definition
         """
-        self.__preprocessor.get_scope(self.__scope).set_definition(key, value)
+        self.__preprocessor.note_definition(self.__scope, key, value)
 
     def list_all_defines(self):
         """ Return all of the values defined in the scope.
@@ -122,6 +191,8 @@ class PreprocessorFile(object):
                     ), path=self.path)
                 if not inc_file.evaluated:
                     inc_file.evaluate()
+                else:
+                    self.__preprocessor.note_include(inc_file)
 
     def all_included_files(self, top=True, recursive=False):
         """ Return a list of all included PreprocessorFile's
@@ -301,20 +372,22 @@ class PreprocessorFile(object):
         elif value.replace('.','').isdigit():
             return float(value) if '.' in value else int(value)
         # See if this value is defined in the environment
-        elif value in os.environ:
+        # NOTE: The read is recorded even if the variable is not set, as setting
+        #       it would change the result
+        elif self.__preprocessor.read_environ(value) != None:
             # Treat 'yes', 'no', 'true', and 'false' as boolean values
-            if value in os.environ and isinstance(value, str):
-                if os.environ[value].lower().strip() in ['yes', 'true']:
+            if value in self.__preprocessor.environ and isinstance(value, str):
+                if self.__preprocessor.environ[value].lower().strip() in ['yes', 'true']:
                     return True
-                elif os.environ[value].lower().strip() in ['no', 'false']:
+                elif self.__preprocessor.environ[value].lower().strip() in ['no', 'false']:
                     return False
-            elif not value in os.environ:
+            elif not value in self.__preprocessor.environ:
                 return False
             # Otherwise just try to evaluate the environment variable
             # NOTE: We don't call resolve_value, as this would result in the value
             #       being referenced against the internal scope - not good.
             try:
-                return eval(os.environ[value])
+                return eval(self.__preprocessor.environ[value])
             except NameError:
                 PreprocessorError(report.error(
                     f"Couldn't resolve environment variable '{value}' to an "
@@ -323,11 +396,14 @@ class PreprocessorFile(object):
         # See if value is defined in this file or included files (expensive)
         else:
             all_defines = self.list_all_defines()
+            if value in all_defines or value.isidentifier():
+                self.__preprocessor.note_read(self.__scope, value)
             if value in all_defines:
                 return self.resolve_value(all_defines[value], line)
             else:
                 constants = re.findall(r"([A-Za-z]{1}[A-Za-z0-9_]+)", value)
                 for val in constants:
+                    self.__preprocessor.note_read(self.__scope, val)
                     if val in all_defines:
                         value = value.replace(val, str(self.resolve_value(all_defines[val], line)), 1)
                     else:
@@ -439,9 +515,23 @@ class PreprocessorFile(object):
         returns the PreprocessorFile object and not the line array, this is so
         later stages can relate parsed documents back to the source code.
 
+        The defines read and set during evaluation are recorded, and if the
+        preprocessor has donors the evaluation may be reused from one instead.
+
         Returns:
             PreprocessorFile: This instance, allowing for chaining of commands.
         """
+        with trace_span(os.path.basename(self.__path), "preprocessor", path=str(self.__path)):
+            with self.__preprocessor.track_evaluation(self):
+                if self.__preprocessor.reuse_evaluation(self):
+                    stat_count("preprocessor.evaluate", "reused")
+                else:
+                    stat_count("preprocessor.evaluate", "evaluated")
+                    self.__evaluate()
+        return self
+
+    def __evaluate(self):
+        """ Perform the evaluation of this file (see 'evaluate') """
         # Check if this file has been loaded?
         if not self.loaded:
             self.load_file()
@@ -497,8 +587,15 @@ class PreprocessorFile(object):
         all_defines = self.list_all_defines()
         def_keys    = all_defines.keys()
         all_values  = {}
-        for key in def_keys:
-            all_values[key] = self.resolve_value(all_defines[key])
+        value_reads = {}
+        # NOTE: Reads are only recorded for the values that are substituted
+        try:
+            for key in def_keys:
+                value_reads[key] = self.__preprocessor.capture_reads()
+                all_values[key]  = self.resolve_value(all_defines[key])
+        finally:
+            self.__preprocessor.end_capture()
+        used_names = set()
 
         # Get the list of all files included one level down
         already_included = self.all_included_files(top=False, recursive=True)
@@ -532,11 +629,13 @@ class PreprocessorFile(object):
                 assert original.input_line >= 0
                 # Explicit matches first
                 matches = explicit_rgx.findall(line)
+                used_names.update(matches)
                 for match in [x for x in matches if x.strip() in def_keys]:
                     # NOTE: Only replace the first occurrence to avoid partial replacement!
                     line = line.replace(f"<{match}>", str(all_values[match.strip()]), 1)
                 # Implicit matches second (not contained in angle brackets)
                 matches = implicit_rgx.findall(line)
+                used_names.update(matches)
                 for match in [x for x in matches if x.strip() in def_keys]:
                     # NOTE: Only replace the first occurrence to avoid partial replacement!
                     line = line.replace(f"{match}", str(all_values[match.strip()]), 1)
@@ -551,9 +650,17 @@ class PreprocessorFile(object):
                 self.__final.append(line)
                 line_no += 1
 
+        # Record every define that could have been substituted (whether or not
+        # it was defined), along with any defines that its value relied upon
+        # NOTE: No defines are set while substituting, so these can be batched
+        self.__preprocessor.note_reads({ x: all_defines.get(x, None) for x in used_names })
+        for name in used_names.intersection(value_reads):
+            self.__preprocessor.note_reads(value_reads[name])
+
         # If we've got here, then evaluation was successful
+        # NOTE: The origin is a plain token rather than this file, so that files
+        #       adopting the result don't keep this preprocessor alive
+        self.__origin    = object()
         self.__evaluated = True
 
         report.debug(f"Evaluation completed for {self.__path}")
-
-        return self
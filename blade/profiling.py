@@ -0,0 +1,751 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from collections import namedtuple
+import contextlib
+import datetime
+import json
+import os
+import resource
+import sys
+import time
+from timeit import default_timer as timer
+
+# Version of the profile file format
+PROFILE_VERSION = 1
+
+# Resource usage at the start of a stage of the pipeline
+StageStart = namedtuple("StageStart", ["wall", "cpu", "peak_rss", "memory"])
+
+# Memory traced by 'tracemalloc' at the start of a stage of the pipeline
+MemoryStart = namedtuple("MemoryStart", ["current", "snapshot"])
+
+# Groups that allocation sites are summarised into, by the path of their file
+MEMORY_GROUPS = [
+    ("preprocessor", os.path.join("blade", "preprocessor")),
+    ("schema"      , os.path.join("blade", "schema")),
+    ("reporting"   , os.path.join("blade", "reporting")),
+    ("elaborate"   , os.path.join("blade", "elaborate")),
+    ("designformat", "designformat"),
+    ("yaml"        , "yaml"),
+]
+
+def peak_rss():
+    """ Peak resident set size of this process in megabytes """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # NOTE: Linux reports kilobytes, while macOS reports bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def short_path(path):
+    """ Shorten the path of a Python file to be relative to its entry in sys.path
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        str: The shortened path (unchanged if not within sys.path)
+    """
+    roots = [x for x in sys.path if x and path.startswith(os.path.join(x, ""))]
+    return os.path.relpath(path, max(roots, key=len)) if roots else path
+
+def start_memory_tracing():
+    """ Start tracing memory allocations with 'tracemalloc' """
+    # NOTE: 'tracemalloc' is only imported when tracing is requested, as importing
+    #       it slows down the start of every run
+    import tracemalloc
+    tracemalloc.start()
+
+def stop_memory_tracing():
+    """ Stop tracing memory allocations (if tracing) """
+    if memory_tracing():
+        sys.modules["tracemalloc"].stop()
+
+def memory_tracing():
+    """ Check if 'tracemalloc' is tracing, without importing it if not loaded.
+
+    Returns:
+        bool: True if memory allocations are being traced
+    """
+    # NOTE: Tracing can only have been started once the module was imported
+    module = sys.modules.get("tracemalloc", None)
+    return module != None and module.is_tracing()
+
+def memory_snapshot():
+    """ Take a snapshot of memory traced by 'tracemalloc', ignoring its own use """
+    import tracemalloc
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<unknown>"),
+    ])
+
+def begin_memory():
+    """ Capture the memory traced at the start of a stage (if tracing).
+
+    Returns:
+        MemoryStart: Traced memory and a snapshot of it, or None if not tracing
+    """
+    if not memory_tracing():
+        return None
+    import tracemalloc
+    # NOTE: The snapshot is taken first, so it is counted at both the start and
+    #       end of the stage and does not skew the memory retained
+    snapshot = memory_snapshot()
+    # NOTE: Resetting the peak requires Python 3.9, before then the peak is the
+    #       highest point reached since tracing started
+    if hasattr(tracemalloc, "reset_peak"): tracemalloc.reset_peak()
+    return MemoryStart(tracemalloc.get_traced_memory()[0], snapshot)
+
+def measure_memory(start, top=10):
+    """ Measure the memory allocated and retained since the start of a stage.
+
+    Args:
+        start: The MemoryStart captured when the stage began
+        top  : Number of allocation sites to list (default: 10)
+
+    Returns:
+        dict: Peak memory above the start of the stage and memory retained at
+              the end (in megabytes), the memory retained by each group of
+              files (see MEMORY_GROUPS), and the sites that retained the most
+    """
+    import tracemalloc
+    (current, peak) = tracemalloc.get_traced_memory()
+    differences     = memory_snapshot().compare_to(start.snapshot, "lineno")
+    groups          = {}
+    for diff in differences:
+        path  = diff.traceback[0].filename
+        group = next((x for x, y in MEMORY_GROUPS if y in path), "other")
+        groups[group] = groups.get(group, 0) + diff.size_diff / (1024 * 1024)
+    return {
+        "peak"    : (peak - start.current) / (1024 * 1024),
+        "retained": (current - start.current) / (1024 * 1024),
+        "groups"  : groups,
+        "sites"   : [{
+            "site" : f"{short_path(x.traceback[0].filename)}:{x.traceback[0].lineno}",
+            "size" : x.size_diff / (1024 * 1024),
+            "count": x.count_diff,
+        } for x in differences[:top] if x.size_diff > 0],
+    }
+
+def begin_stage():
+    """ Capture the resource usage at the start of a stage.
+
+    Returns:
+        StageStart: Wall time, CPU time, peak resident set size, and the memory
+                    traced by 'tracemalloc' (if tracing)
+    """
+    memory = begin_memory()
+    return StageStart(timer(), time.process_time(), peak_rss(), memory)
+
+def count_blocks(project):
+    """ Count the blocks of an elaborated design and the objects they hold.
+
+    Args:
+        project: The elaborated DFProject
+
+    Returns:
+        dict: Number of blocks, ports, connections, and registers
+    """
+    counts   = { "blocks": 0, "ports": 0, "connections": 0, "registers": 0 }
+    to_visit = [x for x in project.getAllPrincipalNodes()]
+    while to_visit:
+        block                  = to_visit.pop()
+        counts["blocks"]      += 1
+        counts["ports"]       += len(block.getAllPorts())
+        counts["connections"] += len(block.connections)
+        counts["registers"]   += sum(len(getattr(x, "registers", [])) for x in block.registers)
+        to_visit              += block.children
+    return counts
+
+class BuildProfile(object):
+    """
+    Measurements taken while building a single top file - the wall time, CPU
+    time, and growth in peak memory of each stage of the pipeline, along with
+    the number of objects that each stage produced.
+    """
+
+    def __init__(self, top_file, out_file=None, memory_sites=10):
+        """ Initialise an empty profile.
+
+        Args:
+            top_file    : Path to the top file being built
+            out_file    : Path the output is written to (optional)
+            memory_sites: Number of allocation sites to list for each stage if
+                          'tracemalloc' is tracing (default: 10)
+        """
+        self.top_file     = top_file
+        self.out_file     = out_file
+        self.memory_sites = memory_sites
+        self.stages   = []    # Measurements of each stage, in the order they ran
+        self.counts   = {}    # Number of each type of object produced by the build
+        self.reused   = False # Were the prepared documents reused from earlier
+        self.cached   = False # Was the output restored from the build cache
+
+    def end_stage(self, index, name, start):
+        """ Record the end of a stage of the pipeline.
+
+        Args:
+            index: Number of the stage
+            name : Name of the stage
+            start: The StageStart captured when the stage began
+        """
+        stage = {
+            "index"         : index,
+            "name"          : name,
+            "wall"          : timer() - start.wall,
+            "cpu"           : time.process_time() - start.cpu,
+            "peak_rss_delta": peak_rss() - start.peak_rss,
+            "counts"        : {},
+        }
+        if start.memory and memory_tracing():
+            stage["memory"] = measure_memory(start.memory, top=self.memory_sites)
+        self.stages.append(stage)
+
+    def add_counts(self, **counts):
+        """ Record the number of objects produced by the last stage to end.
+
+        Args:
+            counts: Number of each type of object, keyed by type
+        """
+        if self.stages: self.stages[-1]["counts"].update(counts)
+        self.counts.update(counts)
+
+    def format_memory(self):
+        """ Summarise the memory measured for each stage as lines of text.
+
+        Returns:
+            list: Lines of the summary
+        """
+        stages = [x for x in self.stages if "memory" in x]
+        if not stages:
+            return []
+        width = max(len(x["name"]) for x in stages)
+        lines = [f"Memory profile of {self.top_file}"]
+        lines.append(f"  {'Stage'.ljust(width)}  {'Peak':>10}  {'Retained':>10}")
+        for stage in stages:
+            lines.append(
+                f"  {stage['name'].ljust(width)}  "
+                f"{'%0.01fMB' % stage['memory']['peak']:>10}  "
+                f"{'%+0.01fMB' % stage['memory']['retained']:>10}"
+            )
+        for stage in stages:
+            groups = sorted(stage["memory"]["groups"].items(), key=lambda x: -x[1])
+            lines.append(f"  {stage['name']} retained by: " + (", ".join(
+                "%s %+0.01fMB" % x for x in groups if abs(x[1]) >= 0.05
+            ) or "-"))
+            for site in stage["memory"]["sites"]:
+                lines.append(
+                    f"    {'%0.02fMB' % site['size']:>10} {site['count']:>8} blocks  {site['site']}"
+                )
+        return lines
+
+    def to_dict(self):
+        """ Convert the profile into a dictionary ready to be written out """
+        return {
+            "top_file": self.top_file,
+            "out_file": self.out_file,
+            "reused"  : self.reused,
+            "cached"  : self.cached,
+            "stages"  : self.stages,
+            "counts"  : self.counts,
+        }
+
+def write_profile(path, builds, start, stats=None):
+    """ Write out the profiles of a run of BLADE as JSON.
+
+    Args:
+        path  : Path to write the profile to
+        builds: List of dictionaries describing each build (see 'to_dict')
+        start : The StageStart captured when the run began
+        stats : StatsRegistry recorded during the run (optional)
+    """
+    import platform
+    extra = { "stats": stats.to_dict() } if stats else {}
+    with open(path, "w") as fh:
+        json.dump({
+            "version" : PROFILE_VERSION,
+            "date"    : datetime.datetime.now().isoformat(),
+            "host"    : platform.node(),
+            "pid"     : os.getpid(),
+            "wall"    : timer() - start.wall,
+            "cpu"     : time.process_time() - start.cpu,
+            "peak_rss": peak_rss(),
+            "builds"  : builds,
+            **extra,
+        }, fh, indent=4)
+
+# Tracer collecting spans for the active build (None when tracing is disabled)
+active_tracer = None
+
+class Tracer(object):
+    """
+    Collects timed spans in the Chrome trace-event format, which can be loaded
+    into Perfetto or 'chrome://tracing'. Spans that open within another span are
+    shown nested beneath it, so the time spent at each level of the design can
+    be seen.
+    """
+
+    def __init__(self):
+        """ Initialise the tracer with no recorded events """
+        self.events = []
+
+    @contextlib.contextmanager
+    def span(self, name, category, args=None):
+        """ Record a span covering the body of the context.
+
+        Args:
+            name    : Name of the span
+            category: Category of the span (e.g. 'preprocessor')
+            args    : Dictionary of details to attach to the span (optional)
+        """
+        start = timer()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, args)
+
+    def complete(self, name, category, start, args=None):
+        """ Record a span from an earlier point up to now.
+
+        Args:
+            name    : Name of the span
+            category: Category of the span
+            start   : The point the span started at (from 'timer')
+            args    : Dictionary of details to attach to the span (optional)
+        """
+        self.events.append({
+            "name": name,
+            "cat" : category,
+            "ph"  : "X",
+            "ts"  : start * 1E6,
+            "dur" : (timer() - start) * 1E6,
+            "pid" : os.getpid(),
+            "tid" : os.getpid(),
+            "args": args if args else {},
+        })
+
+    def export_events(self, since=0):
+        """ Return the events recorded from a point onwards.
+
+        Args:
+            since: Number of events recorded before the point (default: 0)
+
+        Returns:
+            list: The recorded events
+        """
+        return self.events[since:]
+
+    def import_events(self, events):
+        """ Add events recorded by another process (e.g. a worker).
+
+        Args:
+            events: List of events exported by the other process's tracer
+        """
+        self.events += events
+
+    def write(self, path):
+        """ Write out every recorded event as a Chrome trace.
+
+        Args:
+            path: Path to write the trace to
+        """
+        # Name each process, so the main process can be told apart from workers
+        names = [{
+            "name": "process_name", "ph": "M", "pid": pid, "tid": pid,
+            "args": { "name": "blade" if pid == os.getpid() else f"worker {pid}" },
+        } for pid in sorted(set(x["pid"] for x in self.events))]
+        with open(path, "w") as fh:
+            json.dump({
+                "traceEvents"    : names + self.events,
+                "displayTimeUnit": "ms",
+            }, fh)
+
+def start_tracing():
+    """ Start recording spans for the active build.
+
+    Returns:
+        Tracer: The tracer that spans are recorded into
+    """
+    global active_tracer
+    active_tracer = Tracer()
+    return active_tracer
+
+def stop_tracing():
+    """ Stop recording spans.
+
+    Returns:
+        Tracer: The tracer that spans were recorded into (None if not tracing)
+    """
+    global active_tracer
+    (tracer, active_tracer) = (active_tracer, None)
+    return tracer
+
+def trace_span(name, category, **args):
+    """ Record a span covering a block of code, if tracing is enabled.
+
+    Args:
+        name    : Name of the span
+        category: Category of the span
+        args    : Details to attach to the span
+
+    Returns:
+        ContextManager: Context to run the block of code within
+    """
+    if active_tracer:
+        return active_tracer.span(name, category, args)
+    return contextlib.nullcontext()
+
+def trace_mark():
+    """ Number of spans recorded so far, for use with 'trace_events' """
+    return len(active_tracer.events) if active_tracer else 0
+
+def trace_events(since=0):
+    """ Spans recorded since a mark, or None if tracing is disabled.
+
+    Args:
+        since: Mark returned by 'trace_mark' (default: 0)
+
+    Returns:
+        list: The recorded events
+    """
+    return active_tracer.export_events(since) if active_tracer else None
+
+def trace_complete(name, category, start, **args):
+    """ Record a span from an earlier point up to now, if tracing is enabled.
+
+    Args:
+        name    : Name of the span
+        category: Category of the span
+        start   : The point the span started at (from 'timer')
+        args    : Details to attach to the span
+    """
+    if active_tracer:
+        active_tracer.complete(name, category, start, args)
+
+def trace_import(events):
+    """ Add spans exported by another process, if tracing is enabled.
+
+    Args:
+        events: List of events returned by 'trace_events' in the other process
+    """
+    if active_tracer and events:
+        active_tracer.import_events(events)
+
+# Profiler capturing function calls for the active build (None when disabled)
+active_cprofile = None
+
+def start_cprofile():
+    """ Start capturing every function call made by the active build.
+
+    Returns:
+        cProfile.Profile: The profiler calls are captured with
+    """
+    # NOTE: Profiling modules are only imported when profiling is requested, as
+    #       importing them slows down the start of every run
+    import cProfile
+    global active_cprofile
+    active_cprofile = cProfile.Profile()
+    active_cprofile.enable()
+    return active_cprofile
+
+def stop_cprofile():
+    """ Stop capturing function calls.
+
+    Returns:
+        cProfile.Profile: The profiler calls were captured with (None if not
+                          capturing)
+    """
+    global active_cprofile
+    (profiler, active_cprofile) = (active_cprofile, None)
+    if profiler: profiler.disable()
+    return profiler
+
+@contextlib.contextmanager
+def cprofile_paused():
+    """ Stop capturing function calls within the context (if capturing) """
+    profiler = active_cprofile
+    if profiler: profiler.disable()
+    try:
+        yield
+    finally:
+        if profiler: profiler.enable()
+
+def frame_label(func):
+    """ Label of a function from 'pstats' for use in a collapsed stack.
+
+    Args:
+        func: Tuple of file name, line number, and function name
+
+    Returns:
+        str: The label (e.g. 'module.py:build_tree:334')
+    """
+    (file_name, line, name) = func
+    if file_name == "~":
+        return name.replace(";", ",")
+    return f"{os.path.basename(file_name)}:{name}:{line}".replace(";", ",")
+
+def write_collapsed_stacks(profiler, path, min_fraction=0.0001):
+    """
+    Write the calls captured by cProfile as collapsed stacks, the format read
+    by flamegraph tools (e.g. 'flamegraph.pl' and speedscope). Each line holds
+    a stack of functions separated by semicolons, then the time spent within
+    the last function of the stack in microseconds.
+
+    cProfile only records the calls between each pair of functions, not whole
+    stacks. Stacks are therefore rebuilt by splitting the time of each function
+    between its callees in proportion to the time spent in each call - which is
+    exact unless a function's cost depends on where it was called from.
+
+    Args:
+        profiler    : The cProfile.Profile to write out
+        path        : Path to write the stacks to
+        min_fraction: Stacks taking less than this fraction of the total time
+                      are dropped (default: 0.0001)
+    """
+    import pstats
+    stats   = pstats.Stats(profiler).stats
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((func, cumulative))
+    roots    = [x for x, y in stats.items() if not [z for z in y[4] if z in stats]]
+    total    = sum(stats[x][3] for x in roots)
+    minimum  = total * min_fraction
+    stacks   = {}
+    # NOTE: Stacks are walked with an explicit list to avoid Python's recursion
+    #       limit. Recursive calls are folded into the outermost call, as its
+    #       time already includes them and its callees cover every level.
+    to_visit = [((x,), stats[x][3]) for x in roots]
+    while to_visit:
+        (stack, duration) = to_visit.pop()
+        func     = stack[-1]
+        fraction = (duration / stats[func][3]) if stats[func][3] > 0 else 0
+        own      = stats[func][2] * fraction
+        for callee, cumulative in callees.get(func, []):
+            share = cumulative * fraction
+            if callee not in stack and share >= minimum:
+                to_visit.append((stack + (callee,), share))
+        if own >= minimum:
+            key         = ";".join(frame_label(x) for x in stack)
+            stacks[key] = stacks.get(key, 0) + own
+    with open(path, "w") as fh:
+        for key, duration in sorted(stacks.items()):
+            micros = int(duration * 1E6)
+            if micros > 0: fh.write(f"{key} {micros}\n")
+
+# Registry of counters and timers for the active build (None when disabled)
+active_stats = None
+
+class StatsRegistry(object):
+    """
+    Collects counters and timers from across the pipeline, showing how often
+    the expensive operations are performed (e.g. document lookups, expression
+    evaluation, and path resolution). Every counter and timer has a name, and
+    may be broken down by a key (e.g. the name of the !Mod being built).
+    """
+
+    def __init__(self):
+        """ Initialise the registry with no recorded counts """
+        self.counters = {}
+        self.timers   = {}
+
+    def count(self, name, key=None, amount=1):
+        """ Increment a counter.
+
+        Args:
+            name  : Name of the counter
+            key   : Key to break the counter down by (optional)
+            amount: Amount to increment by (default: 1)
+        """
+        counts      = self.counters.setdefault(name, {})
+        counts[key] = counts.get(key, 0) + amount
+
+    def add_time(self, name, duration, key=None, calls=1):
+        """ Add time to a timer.
+
+        Args:
+            name    : Name of the timer
+            duration: Time taken in seconds
+            key     : Key to break the timer down by (optional)
+            calls   : Number of calls the time covers (default: 1)
+        """
+        times      = self.timers.setdefault(name, {})
+        entry      = times.get(key, (0, 0))
+        times[key] = (entry[0] + calls, entry[1] + duration)
+
+    @contextlib.contextmanager
+    def timer(self, name, key=None):
+        """ Time the body of the context.
+
+        Args:
+            name: Name of the timer
+            key : Key to break the timer down by (optional)
+        """
+        start = timer()
+        try:
+            yield
+        finally:
+            self.add_time(name, timer() - start, key)
+
+    def export_stats(self):
+        """ Return every counter and timer, to be merged by another process """
+        return { "counters": self.counters, "timers": self.timers }
+
+    def import_stats(self, stats):
+        """ Merge counters and timers recorded by another process (e.g. a worker).
+
+        Args:
+            stats: Dictionary returned by the other process's 'export_stats'
+        """
+        for name, counts in stats["counters"].items():
+            for key, amount in counts.items():
+                self.count(name, key, amount)
+        for name, times in stats["timers"].items():
+            for key, (calls, duration) in times.items():
+                self.add_time(name, duration, key, calls)
+
+    def to_dict(self):
+        """ Summarise every counter and timer as a dictionary suitable for JSON """
+        def keyed(values, total):
+            return {
+                "total": total(values.values()),
+                "keys" : { str(x): y for x, y in values.items() if x != None },
+            }
+        return {
+            "counters": {
+                x: keyed(y, sum) for x, y in sorted(self.counters.items())
+            },
+            "timers"  : {
+                x: keyed(
+                    { z: { "calls": w[0], "time": w[1] } for z, w in y.items() },
+                    lambda v: {
+                        "calls": sum(w["calls"] for w in v),
+                        "time" : sum(w["time"] for w in v),
+                    }
+                ) for x, y in sorted(self.timers.items())
+            },
+        }
+
+    def format(self, limit=10):
+        """ Summarise every counter and timer as lines of text.
+
+        Args:
+            limit: Number of keys to list beneath each counter or timer, with
+                   the largest listed first (default: 10)
+
+        Returns:
+            list: Lines of the summary
+        """
+        summary = self.to_dict()
+        lines   = []
+        width   = max([len(x) for x in self.counters] + [len(x) for x in self.timers] + [0])
+        def breakdown(keys, value):
+            ranked = sorted(keys.items(), key=lambda x: value(x[1]), reverse=True)
+            return ranked[:limit], len(ranked) - limit
+        if self.counters:
+            lines.append("STATS: Counters")
+            for name, entry in summary["counters"].items():
+                lines.append(f"STATS:   {name.ljust(width)} {entry['total']:>10}")
+                (ranked, more) = breakdown(entry["keys"], lambda x: x)
+                for key, amount in ranked:
+                    lines.append(f"STATS:     {key.ljust(width - 2)} {amount:>10}")
+                if more > 0:
+                    lines.append(f"STATS:     ... and {more} more")
+        if self.timers:
+            lines.append("STATS: Timers")
+            for name, entry in summary["timers"].items():
+                total = entry["total"]
+                lines.append(
+                    f"STATS:   {name.ljust(width)} {total['calls']:>10} calls "
+                    f"{total['time']:>9.03f}s"
+                )
+                (ranked, more) = breakdown(entry["keys"], lambda x: x["time"])
+                for key, times in ranked:
+                    lines.append(
+                        f"STATS:     {key.ljust(width - 2)} {times['calls']:>10} calls "
+                        f"{times['time']:>9.03f}s"
+                    )
+                if more > 0:
+                    lines.append(f"STATS:     ... and {more} more")
+        return lines
+
+def start_stats():
+    """ Start recording counters and timers, discarding any recorded so far.
+
+    Returns:
+        StatsRegistry: The registry that counters and timers are recorded into
+    """
+    global active_stats
+    active_stats = StatsRegistry()
+    return active_stats
+
+def stop_stats():
+    """ Stop recording counters and timers.
+
+    Returns:
+        StatsRegistry: The registry that was recorded into (None if disabled)
+    """
+    global active_stats
+    (stats, active_stats) = (active_stats, None)
+    return stats
+
+def restart_stats():
+    """
+    Discard the counters and timers recorded so far, if enabled. Used by worker
+    processes so that only their own work is returned, and not the counts they
+    inherited when forked.
+    """
+    if active_stats:
+        start_stats()
+
+def stat_count(name, key=None, amount=1):
+    """ Increment a counter, if stats are enabled.
+
+    Args:
+        name  : Name of the counter
+        key   : Key to break the counter down by (optional)
+        amount: Amount to increment by (default: 1)
+    """
+    if active_stats:
+        active_stats.count(name, key, amount)
+
+def stat_timer(name, key=None):
+    """ Time a block of code, if stats are enabled.
+
+    Args:
+        name: Name of the timer
+        key : Key to break the timer down by (optional)
+
+    Returns:
+        ContextManager: Context to run the block of code within
+    """
+    if active_stats:
+        return active_stats.timer(name, key)
+    return contextlib.nullcontext()
+
+def stats_export():
+    """ Counters and timers recorded so far, or None if stats are disabled """
+    return active_stats.export_stats() if active_stats else None
+
+def stats_import(stats):
+    """ Merge counters and timers exported by another process, if enabled.
+
+    Args:
+        stats: Dictionary returned by 'stats_export' in the other process
+    """
+    if active_stats and stats:
+        active_stats.import_stats(stats)
@@ -23,8 +23,7 @@ import sys
 from timeit import default_timer as timer
 from yaml.error import Mark
 
-# Import TQDM for progress bars
-from tqdm import tqdm
+# Options for TQDM progress bars
 tqdm_opts = { "ncols": 50, "bar_format": "{l_bar}{bar}|" }
 
 # Get report for this level
@@ -34,9 +33,8 @@ report = reporting.get_report("project")
 # Import parsing pipeline
 from .preprocessor import Preprocessor, PreprocessorFile
 from .parser import parse_phhidle_file
-from .elaborator import elaborate
 from .elaborate.common import ElaboratorScope
-from .checker import perform_checks
+from .profiling import begin_stage, count_blocks, trace_complete, trace_span
 
 from .schema import Def, Define, Mod, His, Reg, Port, Config, Group, ValidationError
 from designformat import DFProject
@@ -50,7 +48,12 @@ def iterate(iterable, quiet=False, **tqdm_args):
         tqdm_args: Arguments to TQDM
     #
     """
-    return iterable if quiet else tqdm(iterable, **tqdm_args, **tqdm_opts)
+    if quiet:
+        return iterable
+    # NOTE: TQDM is only imported when a progress bar is shown, as it is slow to
+    #       import and quiet runs never need it
+    from tqdm import tqdm
+    return tqdm(iterable, **tqdm_args, **tqdm_opts)
 
 def delta(start):
     """Measure the delta between start and the current time
@@ -63,9 +66,154 @@ def delta(start):
     """
     return "%0.02fs" % (timer() - start)
 
+def end_stage(index, name, start, profile=False, timings=None, profiler=None):
+    """ Record the time taken by a stage of the pipeline.
+
+    Args:
+        index   : Number of the stage
+        name    : Name of the stage
+        start   : The StageStart captured by 'begin_stage'
+        profile : Whether to print the execution time (default: False)
+        timings : Dictionary to store the execution time in seconds (optional)
+        profiler: BuildProfile to record the stage's measurements in (optional)
+    """
+    if profile:
+        report.debug("profiling", f"Stage {index}: {name} took {delta(start.wall)}")
+    if timings != None:
+        timings[name] = timer() - start.wall
+    if profiler != None:
+        profiler.end_stage(index, name, start)
+    trace_complete(name, "stage", start.wall, index=index)
+
+class BuildSession(object):
+    """
+    Holds the state shared between builds of several top-level files within one
+    invocation - the files within the includes, intrinsic types, and every
+    document that has been parsed and validated. Each top-level file is given its
+    own preprocessor, so that defines set while building one never leak into
+    another, but the evaluation of a shared file is adopted from an earlier build
+    wherever every define it read has the same value. Documents are keyed by the
+    evaluation that produced them, so they are only registered and validated once
+    for each distinct evaluation. All builds within a session must use the same
+    includes and defines.
+    """
+
+    def __init__(self, donor=None, changed=None, replace=False):
+        """ Initialise an empty session
+
+        Args:
+            donor  : A BuildSession using the same includes, from which the
+                     evaluation of any file unaffected by differing defines (or
+                     changed files) is reused (optional)
+            changed: Paths of files that have changed since the donor was built
+                     (optional)
+            replace: Whether this session replaces the donor (i.e. the donor is
+                     discarded), in which case the documents parsed from every
+                     reused evaluation are taken over from the donor along with
+                     their validation (default: False)
+        """
+        self.donor          = donor
+        self.changed        = set(changed) if changed else set()
+        self.replace        = replace
+        self.scope_files    = None  # Every file within the includes (once listed)
+        self.preprocessors  = {}    # Preprocessor used for each top file
+        self.intrinsic_docs = []    # Intrinsic documents (e.g. clock and reset)
+        self.declared_docs  = {}    # Documents seen so far, by evaluation, type, and name
+        self.validated      = set() # Documents that have already been validated
+        self.prepared       = {}    # Prepared projects, by top file
+
+    def new_preprocessor(self, top_key):
+        """
+        Create the preprocessor for a top file, which reuses evaluations from the
+        donor's build of the same top file first, then from the most recent
+        builds within this session, and finally from the donor's other builds.
+
+        Args:
+            top_key: Key identifying the top file
+
+        Returns:
+            Preprocessor: The new preprocessor
+        """
+        donors = list(reversed(self.preprocessors.values()))
+        if self.donor:
+            own    = self.donor.preprocessors.get(top_key, None)
+            others = [x for x in reversed(self.donor.preprocessors.values()) if x is not own]
+            donors = ([own] if own else []) + donors + others
+        self.preprocessors[top_key] = Preprocessor(donors=donors, changed=self.changed)
+        return self.preprocessors[top_key]
+
+    def find_document(self, origin, type_key, name):
+        """
+        Find a document parsed from an evaluation of a file earlier in the
+        session, or by the donor if this session replaces it. Documents found in
+        the donor are taken over by this session.
+
+        Args:
+            origin  : Token identifying the evaluation of the file
+            type_key: Name of the document's type
+            name    : Name of the document
+
+        Returns:
+            tuple: The document (None if not found), and whether it was taken
+                   over from the donor
+        """
+        found = self.declared_docs.get(origin, {}).get(type_key, {}).get(name, None)
+        if found != None or not (self.replace and self.donor):
+            return (found, False)
+        found = self.donor.declared_docs.get(origin, {}).get(type_key, {}).get(name, None)
+        if found == None:
+            return (None, False)
+        self.declare_document(origin, type_key, found)
+        if found in self.donor.validated:
+            self.validated.add(found)
+        return (found, True)
+
+    def declare_document(self, origin, type_key, doc):
+        """ Record a document parsed from an evaluation of a file.
+
+        Args:
+            origin  : Token identifying the evaluation of the file
+            type_key: Name of the document's type
+            doc     : The document
+        """
+        self.declared_docs.setdefault(origin, {}).setdefault(type_key, {})[doc.name] = doc
+
+    def release_donors(self):
+        """ Drop all references to donors, which are only needed during evaluation """
+        self.donor = None
+        for pre in self.preprocessors.values():
+            pre.donors = []
+
+class PreparedProject(object):
+    """
+    The parsed and validated documents of a top-level file, ready to be passed
+    to elaboration.
+    """
+
+    def __init__(self, top_file, top_docs, all_documents, intrinsic_docs):
+        """ Initialise the prepared project.
+
+        Args:
+            top_file      : The top module declaration file
+            top_docs      : Documents declared directly within the top file
+            all_documents : Every document visible to the top file (including
+                            intrinsics)
+            intrinsic_docs: Intrinsic documents (e.g. clock and reset)
+        """
+        self.top_file       = top_file
+        self.top_docs       = top_docs
+        self.all_documents  = all_documents
+        self.intrinsic_docs = intrinsic_docs
+        self.deps           = None # YAML dependencies (if captured)
+        self.sources        = None # Every evaluated file (if captured)
+        self.environ        = {}   # Environment variables read, with values
+        self.elab_scope     = None # ElaboratorScope (built on first elaboration)
+
 def build_project(
     top_file, includes=None, defines=None, max_depth=None, run_checks=False,
-    waivers=None, quiet=False, deps=None, profile=False
+    waivers=None, quiet=False, deps=None, profile=False, jobs=None,
+    inst_path=None, sources=None, session=None, timings=None, profiler=None,
+    environ=None
 ):
     """ Parse and elaborate the YAML description into a DesignFormat project.
 
@@ -87,19 +235,100 @@ def build_project(
         deps      : An array can be provided to store the list of YAML files that
                   : the top object depends on.
         profile   : Measure and print execution times of each phase (default: False)
+        jobs      : Number of worker processes to elaborate large subtrees of
+                  : the design with (optional, by default runs serially)
+        inst_path : Hierarchical path of a block to focus on (e.g. 'top.sub_0'),
+                  : only the ancestors' ports and the path are elaborated above
+                  : the block (optional)
+        sources   : An array can be provided to store the path of every file
+                  : evaluated by the preprocessor, including those that only
+                  : hold preprocessor statements (a superset of 'deps').
+        environ   : A dictionary can be provided to store the value of every
+                  : environment variable read by the preprocessor (None if it
+                  : was not set), keyed by the name of the variable.
+        session   : A BuildSession to share state with other builds (optional,
+                  : by default a new session is started)
+        timings   : A dictionary can be provided to store the execution time of
+                  : each stage in seconds, keyed by the name of the stage.
+        profiler  : A BuildProfile can be provided to record the wall time, CPU
+                  : time, peak memory growth, and objects produced by each stage.
 
     Returns:
         tuple: The generated DesignFormat project and a list of rule violations.
     """
+    prepared = prepare_project(
+        top_file, includes=includes, defines=defines, quiet=quiet, deps=deps,
+        profile=profile, sources=sources, session=session, timings=timings,
+        profiler=profiler, environ=environ
+    )
+    if not prepared:
+        return (None, [])
+    return elaborate_project(
+        prepared, max_depth=max_depth, run_checks=run_checks, waivers=waivers,
+        profile=profile, jobs=jobs, inst_path=inst_path, timings=timings,
+        profiler=profiler
+    )
+
+def prepare_project(
+    top_file, includes=None, defines=None, quiet=False, deps=None, profile=False,
+    sources=None, session=None, timings=None, profiler=None, environ=None
+):
+    """ Parse and validate the YAML description ahead of elaboration.
+
+    Runs the first stages of the pipeline driven by 'build_project' - building
+    the scope, preprocessing, parsing, and validating every document visible to
+    the top-level file.
+
+    Args:
+        top_file: The top module declaration file begin elaborating from
+        includes: A list of files or folders to include (optional)
+        defines : Defined values to pass to different phases (optional)
+        quiet   : Disable status messages and progress bars (default: False)
+        deps    : An array can be provided to store the list of YAML files that
+                : the top object depends on.
+        profile : Measure and print execution times of each phase (default: False)
+        sources : An array can be provided to store the path of every file
+                : evaluated by the preprocessor (a superset of 'deps').
+        environ : A dictionary can be provided to store the value of every
+                : environment variable read by the preprocessor (None if it
+                : was not set), keyed by the name of the variable.
+        session : A BuildSession to share state with other builds (optional,
+                : by default a new session is started)
+        timings : A dictionary can be provided to store the execution time of
+                : each stage in seconds, keyed by the name of the stage.
+        profiler: A BuildProfile can be provided to record the wall time, CPU
+                : time, peak memory growth, and objects produced by each stage.
+
+    Returns:
+        PreparedProject: The validated documents, or None if the top file does
+                         not declare any documents.
+    """
 
     # Default arguments
     # NOTE: We don't put lists or maps as default arguments otherwise they become
     #       shared between all calls of 'build_project' (dangerous!)
     includes = includes if includes != None else []
     defines  = defines  if defines  != None else {}
-    waivers  = waivers  if waivers  != None else []
 
-    pre = Preprocessor()
+    session = session if session != None else BuildSession()
+
+    # Reuse the documents prepared by an earlier build of the same top file in
+    # this session, as long as the dependencies requested were captured and the
+    # environment variables read by the preprocessor are unchanged
+    top_key = (top_file, os.path.abspath(top_file))
+    cached  = session.prepared.get(top_key, None)
+    if (
+        (cached                                   ) and
+        (deps    == None or cached.deps    != None) and
+        (sources == None or cached.sources != None) and
+        (all(os.environ.get(x, None) == y for x, y in cached.environ.items()))
+    ):
+        report.info(f"Reusing prepared documents for top file: {top_file}")
+        if deps    != None: deps    += cached.deps
+        if sources != None: sources += cached.sources
+        if environ != None: environ.update(cached.environ)
+        if profiler != None: profiler.reused = True
+        return cached
 
     # Add some debug information to the report
     report.debug("BLADE instance        : " + os.path.abspath(os.path.realpath(__file__)))
@@ -114,37 +343,60 @@ def build_project(
     report.info(f"Top file: {top_file}")
     report.info(f"Including {len(includes)} files and directories", body="\n".join(includes))
 
-    start = timer()
+    start = begin_stage()
+
+    # List every file within the includes
+    # NOTE: The includes are only searched once per session
+    if session.scope_files == None:
+        scope_files = []
+        for item in iterate(includes, quiet=quiet, desc="Building Scope"):
+            if not os.path.exists(item):
+                raise Exception(report.error(
+                    "build_scope", f"Could not locate included path: {item}"
+                ))
+            else:
+                scope_files += Path(item).rglob('*.yaml')
+        session.scope_files = scope_files
 
     # Build a single scope to include all files, passing the list of defines
+    # NOTE: Every top file has its own preprocessor, so that the defines it sets
+    #       cannot affect any other top file in the session
+    pre = session.new_preprocessor(top_key)
     pre.add_scope("main", defines=defines)
-    for item in iterate(includes, quiet=quiet, desc="Building Scope"):
-        if not os.path.exists(item):
-            raise Exception(report.error(
-                "build_scope", f"Could not locate included path: {item}"
-            ))
-        else:
-            for item in Path(item).rglob('*.yaml'): pre.add_file("main", item)
+    for item in session.scope_files: pre.add_file("main", item)
 
     # Just in case the top-level module hasn't been hit by the include list
     if not pre.get_scope("main").get_file(top_file):
         pre.add_file("main", top_file)
 
-    if profile:
-        report.debug("profiling", f"Stage 1: Building scope took {delta(start)}")
+    end_stage(1, "Building scope", start, profile=profile, timings=timings, profiler=profiler)
 
     # ==========================================================================
     # Stage 2: Run the preprocessor from the top-level module, this will also
     #          handle any dependent files that were #include'd
     # ==========================================================================
 
-    start = timer()
+    start = begin_stage()
 
+    # NOTE: Files evaluated by an earlier build (e.g. by another top file in the
+    #       session) are adopted wherever every define they read is the same
     pre_top = pre.get_scope("main").get_file(top_file)
     pre_top.evaluate()
+    if pre.reused:
+        report.info(f"Reused the evaluation of {len(pre.reused)} files from another build")
 
-    if profile:
-        report.debug("profiling", f"Stage 2: Preprocessor evaluation took {delta(start)}")
+    # Populate the 'sources' array with every file that was evaluated
+    if sources != None:
+        for file in pre.get_all_evaluated_files():
+            sources.append(str(file.path))
+
+    # Populate the 'environ' dictionary with every environment variable read
+    if environ != None:
+        environ.update(pre.referenced_environ)
+
+    end_stage(2, "Preprocessor evaluation", start, profile=profile, timings=timings, profiler=profiler)
+    if profiler != None:
+        profiler.add_counts(files=len(pre.get_all_evaluated_files()) - len(pre.reused))
 
     report.info(f"{len(pre.all_files)} files in preprocessor scope", body="\n".join([x.path for x in pre.all_files]))
 
@@ -154,7 +406,7 @@ def build_project(
     #          linked back to the preprocessed source file so it can be tracked.
     # ==========================================================================
 
-    start = timer()
+    start = begin_stage()
 
     # Parse all Phhidle documents from the preprocessed top level file
     parsed_docs = parse_phhidle_file(pre_top.path, prefile=pre_top, buffer=pre_top.get_result())
@@ -162,7 +414,7 @@ def build_project(
     # If no work to do, bail out early
     if not parsed_docs or len(parsed_docs) == 0:
         report.warning("parsing", f"No root documents detected in {top_file}")
-        return (None, [])
+        return None
 
     def rebuild_mark(mark):
         return Mark(
@@ -174,31 +426,38 @@ def build_project(
     # Now work through all documents, associating them to their source file. We
     # also eliminate any duplicate documents due to the same file being #include'd
     # multiple times
-    bypass_types  = [Define]
-    unique_docs   = []
-    declared_docs = {}
+    # NOTE: Declared documents are shared across the session and keyed by the
+    #       evaluation of their file, so that documents from the same evaluation
+    #       of a file in an earlier build are reused
+    bypass_types = [Define]
+    unique_docs  = []
+    unique_set   = set()
     for doc in parsed_docs:
         type_key    = type(doc).__name__
         source_file = pre_top.get_input_line_file(doc.start_mark.line)
         # Check for this exact document being seen before (clashing #includes)
-        if (
-            (source_file.path in declared_docs                            ) and
-            (type_key         in declared_docs[source_file.path]          ) and
-            (doc.name         in declared_docs[source_file.path][type_key]) and
-            # Some tags may be declared multiple times with the same name
-            (type(doc)    not in bypass_types                             )
-        ):
-            doc = declared_docs[source_file.path][type_key][doc.name]
+        # NOTE: Some tags may be declared multiple times with the same name
+        (declared, inherited) = (None, False)
+        if type(doc) not in bypass_types:
+            (declared, inherited) = session.find_document(source_file.origin, type_key, doc.name)
+        if declared != None:
+            # Documents taken over from a replaced session now belong to this one,
+            # so that nothing refers back to the replaced session
+            if inherited:
+                declared.set_source_file(source_file, replace=True)
+                declared.set_file_marks(rebuild_mark(doc.start_mark), rebuild_mark(doc.end_mark))
+            doc = declared
+            # Documents first seen in an earlier build are still used by this one
+            if doc not in unique_set:
+                unique_set.add(doc)
+                unique_docs.append(doc)
         # Otherwise this document is new
         else:
             # Keep track of this document (ignoring bypassed types)
             if type(doc) not in bypass_types:
-                if not source_file.path in declared_docs:
-                    declared_docs[source_file.path] = {}
-                if not type_key in declared_docs[source_file.path]:
-                    declared_docs[source_file.path][type_key] = {}
-                declared_docs[source_file.path][type_key][doc.name] = doc
+                session.declare_document(source_file.origin, type_key, doc)
             # Include in the list of unique documents to use in elaboration
+            unique_set.add(doc)
             unique_docs.append(doc)
             # Adjust the file and line that this document came from
             doc.set_source_file(source_file)
@@ -206,50 +465,52 @@ def build_project(
         # Link parsed document to the preprocessor result
         source_file.add_parsed_document(doc)
 
-    if profile:
-        report.debug("profiling", f"Stage 3: YAML parse took {delta(start)}")
+    end_stage(3, "YAML parse", start, profile=profile, timings=timings, profiler=profiler)
+    if profiler != None: profiler.add_counts(documents=len(unique_docs))
 
     # ==========================================================================
     # Stage 4: Provide intrinsic definitions of the 'clock' and 'reset' His, and
     #          make sure that every scope has reference to them.
     # ==========================================================================
 
-    start = timer()
+    start = begin_stage()
 
     # Add a scope to the preprocessor, and make all other scopes dependent
     # NOTE: To allow some templates to work, we need to make this look as if the
     #       declaration comes from within `interface_definitions`
     intrinsic_key   = "__intrinsics__"
-    intrinsic_docs  = []
     intrinsic_scope = pre.add_scope(intrinsic_key, [])
     for scope_key in (x for x in pre.scopes if x != intrinsic_key):
         pre.scopes[scope_key].add_dependency(intrinsic_key)
-
-    # Add clock defintion to the intrinsic types
-    his_clock = His(
-        "clock", [Port("clk", 1)],
-        options  = ["BOOL", "signal_type=bwt_sc_immediate_clk"],
-        includes = ["bwt_sc_immediate_clk.hpp"]
-    )
     intrinsic_clk = pre.add_file(
         intrinsic_key,
         "interface_definitions/dev/view/yaml_his/intrinsic_clock.yaml",
         evaluated=True
     )
-    intrinsic_clk.add_parsed_document(his_clock)
-    his_clock.set_source_file(intrinsic_clk)
-    intrinsic_docs.append(his_clock)
-
-    # Add reset definition to the intrinsic types
-    his_reset = His("reset", [Port("rst", 1)], options=["BOOL"])
     intrinsic_rst = pre.add_file(
         intrinsic_key,
         "interface_definitions/dev/view/yaml_his/intrinsic_reset.yaml",
         evaluated=True
     )
-    intrinsic_rst.add_parsed_document(his_reset)
-    his_reset.set_source_file(intrinsic_rst)
-    intrinsic_docs.append(his_reset)
+
+    # NOTE: Intrinsics are only constructed once per session
+    intrinsic_docs = session.intrinsic_docs
+    if not intrinsic_docs:
+        # Add clock defintion to the intrinsic types
+        his_clock = His(
+            "clock", [Port("clk", 1)],
+            options  = ["BOOL", "signal_type=bwt_sc_immediate_clk"],
+            includes = ["bwt_sc_immediate_clk.hpp"]
+        )
+        his_clock.set_source_file(intrinsic_clk)
+        intrinsic_docs.append(his_clock)
+
+        # Add reset definition to the intrinsic types
+        his_reset = His("reset", [Port("rst", 1)], options=["BOOL"])
+        his_reset.set_source_file(intrinsic_rst)
+        intrinsic_docs.append(his_reset)
+    intrinsic_clk.add_parsed_document(intrinsic_docs[0])
+    intrinsic_rst.add_parsed_document(intrinsic_docs[1])
 
     # Add the intrinsics as included by all other files
     for file in pre.get_all_evaluated_files():
@@ -259,8 +520,7 @@ def build_project(
     # Add the intrinsics to be validated
     all_documents = (unique_docs + intrinsic_docs)
 
-    if profile:
-        report.debug("profiling", f"Stage 4: Intrinsic construction took {delta(start)}")
+    end_stage(4, "Intrinsic construction", start, profile=profile, timings=timings, profiler=profiler)
 
     # ==========================================================================
     # Stage 5: Validation - we check that every parsed document adheres to the
@@ -268,54 +528,113 @@ def build_project(
     #          stage also builds a map between document name and the document.
     # ==========================================================================
 
-    start = timer()
-
-    for doc in iterate(all_documents, quiet=quiet, desc="Schema Check  "):
-        doc.validate()
+    start = begin_stage()
 
-    if profile:
-        report.debug("profiling", f"Stage 5: Validation took {delta(start)}")
-
-    # ==========================================================================
-    # Stage 6: Elaboration - expand the definition of the top module depending
-    #          on the type.
-    # ==========================================================================
+    # NOTE: Documents validated by an earlier build in the session are skipped
+    to_validate = [x for x in all_documents if x not in session.validated]
+    for doc in iterate(to_validate, quiet=quiet, desc="Schema Check  "):
+        with trace_span(
+            f"!{type(doc).__name__} {doc.name}", "validate",
+            file=(str(doc.source.path) if doc.source else None)
+        ):
+            doc.validate()
+        session.validated.add(doc)
 
-    start = timer()
+    end_stage(5, "Validation", start, profile=profile, timings=timings, profiler=profiler)
+    if profiler != None: profiler.add_counts(validated=len(to_validate))
 
     # Find all documents defined directly in the top document
     top_docs = pre_top.get_parsed_documents()
 
-    # Find all documents included by the top file (including chain)
-    inc_docs = [x for x in unique_docs if x not in top_docs]
-
     # Populate the 'deps' array with dependencies
     if deps != None:
+        # Find all documents included by the top file (including chain)
+        inc_docs = [x for x in unique_docs if x not in top_docs]
         # NOTE: Don't include intrinsics as they don't really exist!
         dep_set = set([x.source.path for x in (top_docs + inc_docs) if x.source.scope != intrinsic_key])
         for dep in dep_set:
             deps.append(dep)
 
-    # Build a scope object
-    elab_scope = ElaboratorScope()
-    for doc in all_documents:
-        # Don't add unnamed documents to the scope, and avoid clashing with any
-        # intrinsic types
-        if doc.name and doc.name not in (x.name for x in intrinsic_docs):
-            elab_scope.add_document(doc)
+    prepared         = PreparedProject(top_file, top_docs, all_documents, intrinsic_docs)
+    prepared.deps    = deps[:]    if deps    != None else None
+    prepared.sources = sources[:] if sources != None else None
+    prepared.environ = pre.referenced_environ
+    session.prepared[top_key] = prepared
+    return prepared
+
+def elaborate_project(
+    prepared, max_depth=None, run_checks=False, waivers=None, profile=False,
+    jobs=None, inst_path=None, tracker=None, timings=None, profiler=None
+):
+    """ Elaborate and check a prepared project, producing a DesignFormat project.
+
+    Runs the final stages of the pipeline driven by 'build_project'.
+
+    Args:
+        prepared  : The PreparedProject returned by 'prepare_project'
+        max_depth : The maximum depth to elaborate to (optional, by default
+                  : performs a full depth elaboration - max_depth=None)
+        run_checks: Enable rule checkers (default: False)
+        waivers   : List of waiver files to provide to the checking stage
+        profile   : Measure and print execution times of each phase (default: False)
+        jobs      : Number of worker processes to elaborate large subtrees of
+                  : the design with (optional, by default runs serially)
+        inst_path : Hierarchical path of a block to focus on (optional)
+        tracker   : ElaborationTracker to record the dependencies of each block
+                  : with, reusing unchanged subtrees of a previous build if it
+                  : holds one (optional)
+        timings   : A dictionary can be provided to store the execution time of
+                  : each stage in seconds, keyed by the name of the stage.
+        profiler  : A BuildProfile can be provided to record the wall time, CPU
+                  : time, peak memory growth, and objects produced by each stage.
+
+    Returns:
+        tuple: The generated DesignFormat project and a list of rule violations.
+    """
+    # NOTE: The elaborators are imported on first use (outside of the measured
+    #       stages), so that runs which stop early don't pay for importing them
+    from .elaborator import elaborate
+
+    waivers        = waivers if waivers != None else []
+    top_file       = prepared.top_file
+    top_docs       = prepared.top_docs
+    all_documents  = prepared.all_documents
+    intrinsic_docs = prepared.intrinsic_docs
+
+    # ==========================================================================
+    # Stage 6: Elaboration - expand the definition of the top module depending
+    #          on the type.
+    # ==========================================================================
+
+    start = begin_stage()
+
+    # Build a scope object (kept with the prepared project for later builds)
+    if not prepared.elab_scope:
+        elab_scope = ElaboratorScope()
+        for doc in all_documents:
+            # Don't add unnamed documents to the scope, and avoid clashing with
+            # any intrinsic types
+            if doc.name and doc.name not in (x.name for x in intrinsic_docs):
+                elab_scope.add_document(doc)
 
-    # Add any intrinsic types
-    for doc in intrinsic_docs:
-        if doc.name:
-            elab_scope.add_document(doc)
+        # Add any intrinsic types
+        for doc in intrinsic_docs:
+            if doc.name:
+                elab_scope.add_document(doc)
+
+        prepared.elab_scope = elab_scope
+    elab_scope = prepared.elab_scope
 
     # Elaborate all documents in the top file into a single DFProject
-    project      = elaborate(top_docs, elab_scope, max_depth=max_depth)
+    project      = elaborate(
+        top_docs, elab_scope, max_depth=max_depth, jobs=jobs, inst_path=inst_path,
+        tracker=tracker
+    )
     project.id   = os.path.splitext(os.path.split(top_file)[-1])[0]
     project.path = top_file
 
-    if profile:
-        report.debug("profiling", f"Stage 6: Elaboration took {delta(start)}")
+    end_stage(6, "Elaboration", start, profile=profile, timings=timings, profiler=profiler)
+    if profiler != None: profiler.add_counts(**count_blocks(project))
 
     # ==========================================================================
     # Stage 7: Checking - perform checks on the elaborated design (optional).
@@ -324,11 +643,14 @@ def build_project(
     violations = []
 
     if run_checks:
-        start = timer()
+        # NOTE: Importing the checkers discovers every rule, so only do so if needed
+        from .checker import perform_checks
+
+        start = begin_stage()
 
         violations = perform_checks(project, waivers)
 
-        if profile:
-            report.debug("profiling", f"Stage 7: Checking took {delta(start)}")
+        end_stage(7, "Checking", start, profile=profile, timings=timings, profiler=profiler)
+        if profiler != None: profiler.add_counts(violations=len(violations))
 
     return (project, violations)
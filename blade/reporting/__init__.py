@@ -20,6 +20,7 @@ from datetime import datetime
 import os
 
 from .render import Renderer
+from ..profiling import stat_count
 
 class ReportCommon(object):
     """ Provide constants required by reporting within a single namespace """
@@ -245,6 +246,7 @@ class ReportCategory(ReportableObject):
         category.add_item(ReportItem(
             title, body, priority=priority, parent=self, root=self.root, **kwargs
         ))
+        stat_count("report.items", ReportCommon.PRIORITY_MAP[priority])
         # If the priority is <= the verbosity, log the message
         if priority <= self.root.verbosity:
             self.root.print_message(priority, path if path else self.path, title)
@@ -323,6 +325,14 @@ class ReportCategory(ReportableObject):
             raise Exception(f"Can't add a ReportCategory with a name matching an existing entry: {self.title}.{item.title}")
         self.__contents.append(item)
 
+    def clear_items(self):
+        """
+        Remove all logged items from this category and those nested within it,
+        keeping the categories themselves (as they may be held elsewhere).
+        """
+        self.__contents = [x for x in self.__contents if isinstance(x, ReportCategory)]
+        for category in self.__contents: category.clear_items()
+
     def summarise(self, verbosity=ReportCommon.INFO):
         """ Produce a summary of this object
 
@@ -391,6 +401,42 @@ class Report(ReportCategory):
             'report': self.summarise(verbosity=verbosity)
         })
 
+    def export_items(self, since, verbosity=ReportCommon.INFO):
+        """
+        Export report items logged after a point in time as primitive tuples,
+        allowing them to be passed between processes.
+
+        Args:
+            since    : Only export items logged at or after this time
+            verbosity: Maximum verbosity of items to export
+
+        Returns:
+            list: List of tuples of category path, priority, title, and body
+        """
+        items = []
+        def chase(category, path):
+            for item in category.contents:
+                if isinstance(item, ReportCategory):
+                    chase(item, path + [item.title])
+                elif item.date >= since and item.priority <= verbosity:
+                    items.append((".".join(path), item.priority, item.title, item.body))
+        chase(self, [])
+        return items
+
+    def import_items(self, items):
+        """
+        Import report items exported by another process. Items are not printed
+        again, as the exporting process is responsible for that.
+
+        Args:
+            items: List of tuples generated by 'export_items'
+        """
+        for path, priority, title, body in items:
+            category = self.get_category(path) if len(path) > 0 else self
+            category.add_item(ReportItem(
+                title, body, priority=priority, parent=category, root=self
+            ))
+
 # A shared report instance
 shared_report = Report()
 
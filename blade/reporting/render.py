@@ -18,9 +18,6 @@
 
 import os
 
-from mako.lookup import TemplateLookup
-from mako import exceptions
-
 class Renderer(object):
     """
     Defines a basic renderer that uses Mako to produce output files from a template
@@ -28,10 +25,10 @@ class Renderer(object):
     """
 
     def __init__(self, template_dir):
-        self.__lookup = TemplateLookup(
-            directories=[template_dir],
-            imports    =[]
-        )
+        # NOTE: Mako is only imported when the first template is rendered, as
+        #       most runs never render a report and importing it is slow
+        self.__template_dir = template_dir
+        self.__lookup       = None
 
     def generate(self, template, out_path, context):
         """
@@ -44,5 +41,11 @@ class Renderer(object):
         """
         if not os.path.isdir(os.path.dirname(os.path.abspath(out_path))):
             raise Exception(f"Could not write to path: {out_path}")
+        if not self.__lookup:
+            from mako.lookup import TemplateLookup
+            self.__lookup = TemplateLookup(
+                directories=[self.__template_dir],
+                imports    =[]
+            )
         with open(out_path, 'w') as fh:
             fh.write(self.__lookup.get_template(template).render(**context))
@@ -87,17 +87,18 @@ class Connect(TagBase):
         self.points    = points
         self.constants = constants
 
-    def set_source_file(self, file):
+    def set_source_file(self, file, replace=False):
         """ Set the source file of this object and propagate it to children.
 
         Args:
-            file: The source file path or object
+            file   : The source file path or object
+            replace: Replace a source file that has already been set (default: False)
         """
-        super().set_source_file(file)
+        super().set_source_file(file, replace=replace)
         for point in self.points:
-            point.set_source_file(file)
+            point.set_source_file(file, replace=replace)
         for constant in self.constants:
-            constant.set_source_file(file)
+            constant.set_source_file(file, replace=replace)
 
     def validate(self):
         """ Check that this tag agrees with our YAML schema """
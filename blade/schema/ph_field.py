@@ -104,15 +104,16 @@ class Field(TagBase):
         self.reset    = 0 if "-" == reset else reset
         self.msb      = None if "-" == msb else msb
 
-    def set_source_file(self, file):
+    def set_source_file(self, file, replace=False):
         """ Set the source file of this object and propagate it to children.
 
         Args:
-            file: The source file path or object
+            file   : The source file path or object
+            replace: Replace a source file that has already been set (default: False)
         """
-        super().set_source_file(file)
+        super().set_source_file(file, replace=replace)
         for enum in (self.enums if self.enums else []):
-            enum.set_source_file(file)
+            enum.set_source_file(file, replace=replace)
 
     def set_file_marks(self, start, end):
         """ Set start and end marks of the declaration and propagate to children
@@ -71,15 +71,16 @@ class His(TagBase):
         self.role        = role.strip().upper() if isinstance(role, str) else ""
         self.includes    = includes # TODO: Remove - not used?
 
-    def set_source_file(self, file):
+    def set_source_file(self, file, replace=False):
         """ Set the source file of this object and propagate it to children.
 
         Args:
-            file: The source file path or object
+            file   : The source file path or object
+            replace: Replace a source file that has already been set (default: False)
         """
-        super().set_source_file(file)
+        super().set_source_file(file, replace=replace)
         for port in self.ports:
-            port.set_source_file(file)
+            port.set_source_file(file, replace=replace)
 
     def set_file_marks(self, start, end):
         """ Set start and end marks of the declaration and propagate to children
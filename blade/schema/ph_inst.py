@@ -125,15 +125,16 @@ class Inst(TagBase):
         self.hir_name = hir_name
         self.hir_ref  = hir_ref
 
-    def set_source_file(self, file):
+    def set_source_file(self, file, replace=False):
         """ Set the source file of this object and propagate it to children.
 
         Args:
-            file: The source file path or object
+            file   : The source file path or object
+            replace: Replace a source file that has already been set (default: False)
         """
-        super().set_source_file(file)
+        super().set_source_file(file, replace=replace)
         for field in self.fields:
-            field.set_source_file(file)
+            field.set_source_file(file, replace=replace)
 
     def set_file_marks(self, start, end):
         """ Set start and end marks of the declaration and propagate to children
@@ -131,28 +131,29 @@ class Mod(TagBase):
         self.extends       = extends.strip() if isinstance(extends, str) else extends
         self.addressmap    = addressmap
 
-    def set_source_file(self, file):
+    def set_source_file(self, file, replace=False):
         """ Set the source file of this object and propagate it to children.
 
         Args:
-            file: The source file path or object
+            file   : The source file path or object
+            replace: Replace a source file that has already been set (default: False)
         """
-        super().set_source_file(file)
+        super().set_source_file(file, replace=replace)
         for port in self.ports:
-            port.set_source_file(file)
+            port.set_source_file(file, replace=replace)
         for module in self.modules:
-            module.set_source_file(file)
+            module.set_source_file(file, replace=replace)
         for connection in self.connections:
-            connection.set_source_file(file)
+            connection.set_source_file(file, replace=replace)
         if self.clk_root:
             for point in self.clk_root:
-                point.set_source_file(file)
+                point.set_source_file(file, replace=replace)
         if self.rst_root:
             for point in self.rst_root:
-                point.set_source_file(file)
+                point.set_source_file(file, replace=replace)
         if self.addressmap:
             for node in self.addressmap:
-                node.set_source_file(file)
+                node.set_source_file(file, replace=replace)
 
     def set_file_marks(self, start, end):
         """ Set start and end marks of the declaration and propagate to children
@@ -77,6 +77,7 @@ CONSTANTS = convert_to_class({
         # ======================================================================
         'NO_AUTO_CLK_RST'   : 'no_auto_clk_rst',    # Don't create implicit clock and reset signals
         'NO_CLK_RST'        : 'no_clk_rst',         # Block has no clock and reset signals
+        'STOP_ELAB'         : 'stop_elab',          # Don't elaborate beyond the boundary of the block
         # Automatic register decode signal bundling (properties propagate downwards)
         'DECODE_ON'         : 'decode_on',          # Enable bundling for a !Config, !Group, or !Reg
         'DECODE_OFF'        : 'decode_off',         # Disable bundling for a !Config, !Group, or !Reg
@@ -234,15 +235,17 @@ class TagBase(yaml.YAMLObject):
             self.__end_mark.buffer, self.__end_mark.pointer
         )
 
-    def set_source_file(self, file):
+    def set_source_file(self, file, replace=False):
         """
         Set the source file that this tag was generated from (this can be a string
         or object - in the case of a preprocessor)
 
         Args:
-            file: The path or object representing the source file
+            file   : The path or object representing the source file
+            replace: Replace a source file that has already been set, e.g. when
+                     the same file is preprocessed again (default: False)
         """
-        if self.__source:
+        if self.__source and not replace:
             raise Exception(report.error(
                 "Source file has already been set for this tag", item=self
             ))
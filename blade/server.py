@@ -0,0 +1,347 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""
+Resident build server, which keeps the preprocessor state, parsed documents, and
+elaboration scopes in memory between builds. Build requests are received over a
+local Unix socket, carrying the same arguments and environment as the command
+line. State is reused for as long as none of the files or environment variables
+it was built from have changed - when they do, only the changed files and the
+files that depend on them are evaluated, parsed, and validated again.
+"""
+
+import contextlib
+import io
+import json
+import os
+from pathlib import Path
+import signal
+import socket
+import socketserver
+import time
+import traceback
+
+from .cache import hash_file, repo_environ
+from .project import BuildSession
+
+from . import reporting
+report = reporting.get_report("server")
+
+def file_stamp(path):
+    """ Get the modification time and size of a file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        tuple: Modification time (in nanoseconds) and size, or None if the file
+               doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def list_includes(includes):
+    """ List every YAML file made available by the include paths.
+
+    Args:
+        includes: List of included files and folders
+
+    Returns:
+        set: Absolute paths of every available file
+    """
+    available = set()
+    for item in includes:
+        if os.path.isdir(item):
+            available.update(os.path.abspath(str(x)) for x in Path(item).rglob('*.yaml'))
+        else:
+            available.add(os.path.abspath(item))
+    return available
+
+class ServedSession(object):
+    """
+    A BuildSession held by the server, along with the state of every file that
+    it was built from - so that it can be replaced when any of them change.
+    """
+
+    def __init__(self, includes, donor=None, changed=None, replace=False):
+        """ Initialise a new session.
+
+        Args:
+            includes: List of included files and folders
+            donor   : ServedSession for the same or another variant of the
+                      design, whose evaluated files are reused wherever they are
+                      unaffected by changed files and differing defines (optional)
+            changed : Paths of files that have changed since the donor was built
+                      (optional)
+            replace : Whether this session replaces the donor, taking over its
+                      parsed and validated documents (default: False)
+        """
+        self.session  = BuildSession(
+            donor   = donor.session if donor else None,
+            changed = changed,
+            replace = replace,
+        )
+        self.includes = includes
+        self.listing  = list_includes(includes)
+        self.stamps   = {}    # Modification time, size, and hash of each file
+        self.failed   = False # Whether a build using the session failed
+
+    def record(self, all_files=False):
+        """ Record the state of every file evaluated by the session so far.
+
+        Args:
+            all_files: Record every file in the scope, not just those that were
+                       evaluated (default: False)
+        """
+        for pre in self.session.preprocessors.values():
+            for pre_file in (pre.all_files if all_files else pre.get_all_evaluated_files()):
+                path = os.path.abspath(pre_file.path)
+                if path not in self.stamps:
+                    self.stamps[path] = (file_stamp(path), hash_file(path))
+
+    def changed_files(self):
+        """
+        List the files that have changed since the session was built, including
+        files added to or removed from the includes. A file is only hashed if its
+        modification time or size has changed, and is considered unchanged if its
+        contents are the same (e.g. if it was just touched).
+
+        Returns:
+            set: Absolute paths of every changed file
+        """
+        listing = list_includes(self.includes)
+        changed = listing ^ self.listing
+        if changed:
+            report.info(f"{len(changed)} files have been added to or removed from the includes")
+        for path, (stamp, digest) in self.stamps.items():
+            new_stamp = file_stamp(path)
+            if new_stamp == stamp:
+                continue
+            new_digest = hash_file(path)
+            if new_digest != digest:
+                report.info(f"File has changed: {path}")
+                changed.add(path)
+            else:
+                self.stamps[path] = (new_stamp, digest)
+        return changed
+
+    def is_stale(self):
+        """ Check if any file the session was built from has changed.
+
+        Returns:
+            bool: True if the session can no longer be used as it is
+        """
+        return len(self.changed_files()) > 0
+
+    def environ_changed(self):
+        """
+        Check if any environment variable read by the preprocessor while building
+        the session has a different value (or has been set or unset) since.
+
+        Returns:
+            bool: True if an environment variable has changed
+        """
+        for pre in self.session.preprocessors.values():
+            for key, value in pre.referenced_environ.items():
+                if os.environ.get(key, None) != value:
+                    report.info(f"Environment variable has changed: {key}")
+                    return True
+        return False
+
+class BuildServer(object):
+    """
+    Holds the sessions kept between builds. A session is kept for each distinct
+    set of top files, includes, defines, and source repository variables - so
+    that every build produces the same result as it would from the command line.
+    Only the most recently used sessions are kept. When files change, the
+    session is replaced by one that takes over the evaluation, documents, and
+    validation of every file unaffected by the change. A session for a new set of
+    top files or defines reuses the evaluation of files from an existing session
+    with the same includes, where the files are unaffected by the defines that
+    differ.
+    """
+
+    # Maximum number of sessions to keep in memory at once
+    MAX_SESSIONS = 4
+
+    def __init__(self):
+        """ Initialise the server with no sessions """
+        self.sessions = {} # Sessions by key, from least to most recently used
+
+    def get_session(self, top_files, includes, defines):
+        """ Get a session for a build, reusing an existing one if still valid.
+
+        Args:
+            top_files: List of top files being built
+            includes : List of included files and folders
+            defines  : Defined values passed to the preprocessor
+
+        Returns:
+            BuildSession: The session to build with
+        """
+        inc_key = sorted(os.path.abspath(x) for x in includes)
+        key     = json.dumps({
+            "tops"    : [os.path.abspath(x) for x in top_files],
+            "includes": inc_key,
+            "defines" : { str(k): str(v) for k, v in defines.items() },
+            "env"     : repo_environ(),
+        }, sort_keys=True)
+        served  = self.sessions.pop(key, None)
+        changed = served.changed_files() if served else set()
+        if served and not served.failed and not changed and not served.environ_changed():
+            report.info("Reusing the existing build session")
+            self.sessions[key] = served
+            return served.session
+        # NOTE: A failed session still holds every evaluation and validation that
+        #       completed, so it can be replaced in the same way as a stale one.
+        #       Evaluations that read a changed environment variable are never
+        #       reused, so the same applies when the environment has changed.
+        if served:
+            report.info("Replacing the build session, reusing every unchanged file")
+            replace = True
+        # Otherwise reuse files from the most recent session with the same includes
+        else:
+            report.info("Starting a new build session")
+            replace = False
+            for other in reversed(list(self.sessions.values())):
+                if sorted(os.path.abspath(x) for x in other.includes) == inc_key:
+                    (served, changed) = (other, other.changed_files())
+                    break
+        self.sessions[key] = ServedSession(
+            includes, donor=served, changed=changed, replace=replace
+        )
+        # Discard the least recently used sessions beyond the limit
+        while len(self.sessions) > self.MAX_SESSIONS:
+            self.sessions.pop(next(iter(self.sessions)))
+        return self.sessions[key].session
+
+    def finish_session(self, session, success):
+        """
+        Record the files a session has been built from once a build completes.
+        If the build failed, the session is never reused as it is (as its state
+        may be incomplete) - but every file in its scope is recorded, so that a
+        change to any of them can be detected.
+
+        Args:
+            session: The BuildSession that was built with
+            success: Whether the build succeeded
+        """
+        for served in self.sessions.values():
+            if served.session is session:
+                served.record(all_files=not success)
+                served.failed = not success
+                # NOTE: The donor is only needed while files are being evaluated
+                served.session.release_donors()
+
+    def wait_for_change(self, interval=0.5):
+        """ Poll the files recorded by every session until any of them change.
+
+        Args:
+            interval: Time to wait between polls in seconds (default: 0.5)
+        """
+        while not any(x.is_stale() for x in self.sessions.values()):
+            time.sleep(interval)
+
+def serve(socket_path, handler):
+    """
+    Listen for build requests on a Unix socket until interrupted. Each request
+    is a single line of JSON holding the working directory, arguments, and
+    environment of the build, and the response is a single line of JSON holding the exit code and
+    everything the build printed. Requests are handled one at a time.
+
+    Args:
+        socket_path: Path of the Unix socket to listen on
+        handler    : Function called with the build server and the list of
+                     arguments for each request, returning the exit code
+    """
+    server = BuildServer()
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            output  = io.StringIO()
+            cwd     = os.getcwd()
+            environ = dict(os.environ)
+            try:
+                os.chdir(request["cwd"])
+                # Build with the environment of the client, as the preprocessor
+                # and the source repository of each block depend upon it
+                os.environ.clear()
+                os.environ.update(request["env"])
+                with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                    try:
+                        code = handler(server, request["args"])
+                    except SystemExit as e:
+                        # Argument errors exit directly
+                        code = e.code if isinstance(e.code, int) else 1
+                    except Exception:
+                        # Keep serving, but drop sessions as their state is unknown
+                        print(traceback.format_exc())
+                        server.sessions = {}
+                        code = 5
+            finally:
+                os.chdir(cwd)
+                os.environ.clear()
+                os.environ.update(environ)
+            print(output.getvalue(), end='')
+            response = { "code": code, "output": output.getvalue() }
+            self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+
+    # Remove a socket left behind by a server that is no longer running
+    if os.path.exists(socket_path):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+            raise Exception(f"A server is already listening on {socket_path}")
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+
+    # Treat termination in the same way as an interrupt, so the socket is removed
+    def terminate(signum, frame):
+        raise KeyboardInterrupt()
+    signal.signal(signal.SIGTERM, terminate)
+
+    with socketserver.UnixStreamServer(socket_path, RequestHandler) as listener:
+        report.info(f"Listening for build requests on {socket_path}")
+        try:
+            listener.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+def send_request(socket_path, args):
+    """ Send a build request to a running server, and wait for it to complete.
+
+    Args:
+        socket_path: Path of the Unix socket the server is listening on
+        args       : List of command line arguments for the build
+
+    Returns:
+        tuple: Exit code of the build and everything that it printed
+    """
+    request = { "cwd": os.getcwd(), "args": args, "env": dict(os.environ) }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        with sock.makefile('rb') as fh:
+            response = json.loads(fh.readline().decode('utf-8'))
+    return (response["code"], response["output"])
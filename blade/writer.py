@@ -0,0 +1,360 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import gzip
+import io
+import json
+import os
+
+from designformat import DFConstants, DFBlock, DFProject
+from designformat.common import cleanID
+
+# NOTE: The encoder uses the same defaults as 'json.dumps', so that the streamed
+#       output is byte-identical to dumping the whole project in one go
+encoder = json.JSONEncoder()
+
+def dump_block_only(block, project):
+    """ Dump a DFBlock without descending into its children.
+
+    Args:
+        block  : The DFBlock to serialise
+        project: The DFProject being written (used to calculate references)
+
+    Returns:
+        dict: Serialised block, with an empty list of children
+    """
+    # NOTE: The children are swapped out temporarily, then restored
+    children = block.children
+    try:
+        block.children = []
+        return block.dumpObject(project)
+    finally:
+        block.children = children
+
+def write_block(block, project, fh):
+    """
+    Stream the serialised form of a DFBlock to a file handle. Only the block's
+    own ports, connections, and registers are held in memory at once - children
+    are written out recursively in place.
+
+    Args:
+        block  : The DFBlock to serialise
+        project: The DFProject being written (used to calculate references)
+        fh     : The file handle to write to
+    """
+    obj      = dump_block_only(block, project)
+    children = block.children
+    # Write out each key in turn, streaming the children as they are reached
+    fh.write('{')
+    for index, (key, value) in enumerate(obj.items()):
+        if index > 0: fh.write(', ')
+        fh.write(encoder.encode(key) + ': ')
+        if key == 'children':
+            fh.write('[')
+            for child_idx, child in enumerate(children):
+                if child_idx > 0: fh.write(', ')
+                write_block(child, project, fh)
+            fh.write(']')
+        else:
+            for chunk in encoder.iterencode(value): fh.write(chunk)
+    fh.write('}')
+
+def write_project(project, fh):
+    """
+    Stream the serialised form of a DFProject to a file handle as JSON. This
+    produces exactly the same output as 'json.dumps(project.dumpObject())', but
+    never holds the whole serialised project (or its JSON string) in memory.
+
+    Args:
+        project: The DFProject to serialise
+        fh     : The file handle to write to
+    """
+    # Dump the project without its nodes (restoring them afterwards)
+    nodes = project.nodes
+    try:
+        project.nodes = {}
+        obj = project.dumpObject()
+    finally:
+        project.nodes = nodes
+    # Write out each key in turn, streaming the nodes as they are reached
+    fh.write('{')
+    for index, (key, value) in enumerate(obj.items()):
+        if index > 0: fh.write(', ')
+        fh.write(encoder.encode(key) + ': ')
+        if key == 'nodes':
+            fh.write('[')
+            for node_idx, node in enumerate(nodes.values()):
+                if node_idx > 0: fh.write(', ')
+                fh.write(
+                    '{' + encoder.encode(DFConstants.ATTRIBUTES.TYPE) + ': ' +
+                    encoder.encode(cleanID(type(node).__name__)) + ', ' +
+                    encoder.encode(DFConstants.ATTRIBUTES.DUMP) + ': '
+                )
+                if isinstance(node, DFBlock):
+                    write_block(node, project, fh)
+                else:
+                    for chunk in encoder.iterencode(node.dumpObject(project)):
+                        fh.write(chunk)
+                fh.write('}')
+            fh.write(']')
+        else:
+            for chunk in encoder.iterencode(value): fh.write(chunk)
+    fh.write('}')
+
+# ==============================================================================
+# Output Formats
+# ==============================================================================
+
+# Supported formats of blob, along with the file extensions that select them and
+# the optional Python package each requires
+FORMATS = {
+    "json"    : { "extensions": [],                   "package": None        },
+    "json.gz" : { "extensions": [".gz"],              "package": None        },
+    "json.zst": { "extensions": [".zst"],             "package": "zstandard" },
+    "msgpack" : { "extensions": [".msgpack", ".mpk"], "package": "msgpack"   },
+    "cbor"    : { "extensions": [".cbor"],            "package": "cbor2"     },
+}
+
+# Compression level used for 'json.gz' blobs
+# NOTE: Python defaults to the slowest level (9), which takes twice as long as
+#       level 6 while only producing a slightly smaller blob
+GZIP_LEVEL = 6
+
+def detect_format(path):
+    """ Determine the format of a blob from the extension of its path.
+
+    Args:
+        path: Path to the blob
+
+    Returns:
+        str: Name of the format (from FORMATS), plain JSON if not recognised
+    """
+    for name, details in FORMATS.items():
+        if any(path.lower().endswith(x) for x in details["extensions"]):
+            return name
+    return "json"
+
+def import_format(fmt):
+    """ Import the optional package required to handle a format.
+
+    Args:
+        fmt: Name of the format (from FORMATS)
+
+    Returns:
+        module: The imported package, or None if no package is required
+    """
+    if fmt not in FORMATS:
+        raise Exception(f"Unknown blob format '{fmt}', expecting one of: {', '.join(FORMATS.keys())}")
+    package = FORMATS[fmt]["package"]
+    if not package:
+        return None
+    try:
+        return __import__(package)
+    except ImportError:
+        raise Exception(f"The '{fmt}' blob format requires the '{package}' package to be installed")
+
+def write_blob(project, path, fmt=None):
+    """
+    Write a DFProject to file in one of the supported formats. JSON formats are
+    streamed (see 'write_project'), while binary formats are encoded from the
+    dumped project.
+
+    Args:
+        project: The DFProject to write, if None an empty object is written
+        path   : Path to write to
+        fmt    : Name of the format (optional, by default detected from path)
+    """
+    fmt    = fmt if fmt else detect_format(path)
+    module = import_format(fmt)
+    def write_json(fh):
+        if project: write_project(project, fh)
+        else:       fh.write('{}')
+    if fmt == "json":
+        with open(path, 'w') as fh:
+            write_json(fh)
+    elif fmt == "json.gz":
+        with gzip.open(path, 'wt', compresslevel=GZIP_LEVEL) as fh:
+            write_json(fh)
+    elif fmt == "json.zst":
+        with open(path, 'wb') as raw:
+            with module.ZstdCompressor().stream_writer(raw) as zfh:
+                with io.TextIOWrapper(zfh, encoding='utf-8') as fh:
+                    write_json(fh)
+    else:
+        obj = project.dumpObject() if project else {}
+        with open(path, 'wb') as fh:
+            if fmt == "msgpack":
+                module.pack(obj, fh)
+            else:
+                module.dump(obj, fh)
+
+def load_blob(path, fmt=None):
+    """ Load a DFProject from a blob written in any of the supported formats.
+
+    Args:
+        path: Path to the blob
+        fmt : Name of the format (optional, by default detected from path)
+
+    Returns:
+        DFProject: The reloaded project
+    """
+    fmt    = fmt if fmt else detect_format(path)
+    module = import_format(fmt)
+    if fmt == "json":
+        with open(path, 'r') as fh:
+            obj = json.load(fh)
+    elif fmt == "json.gz":
+        with gzip.open(path, 'rt') as fh:
+            obj = json.load(fh)
+    elif fmt == "json.zst":
+        with open(path, 'rb') as raw:
+            with module.ZstdDecompressor().stream_reader(raw) as zfh:
+                obj = json.load(io.TextIOWrapper(zfh, encoding='utf-8'))
+    elif fmt == "msgpack":
+        with open(path, 'rb') as fh:
+            obj = module.unpack(fh, raw=False, strict_map_key=False)
+    else:
+        with open(path, 'rb') as fh:
+            obj = module.load(fh)
+    project = DFProject()
+    project.loadObject(obj)
+    return project
+
+# ==============================================================================
+# Sharded Output
+# ==============================================================================
+
+def write_shards(project, path):
+    """
+    Write a DFProject as a set of shards - one JSON file per DFBlock, along with
+    a file holding all other nodes of the project (interconnects, defines, etc.)
+    and an index. The index is written to 'path', and maps the hierarchical path
+    of every block to its shard, its parent, and its children. Shards are stored
+    in a directory alongside the index named '<path>.shards'.
+
+    Args:
+        project: The DFProject to write
+        path   : Path to write the index to
+    """
+    base_dir  = os.path.dirname(os.path.abspath(path))
+    shard_dir = os.path.basename(path) + ".shards"
+    os.makedirs(os.path.join(base_dir, shard_dir, "blocks"), exist_ok=True)
+
+    def write_json(obj, rel_path):
+        with open(os.path.join(base_dir, rel_path), 'w') as fh:
+            for chunk in encoder.iterencode(obj): fh.write(chunk)
+
+    index = {
+        "version": project.version,
+        "project": os.path.join(shard_dir, "project.json"),
+        "roots"  : [],
+        "blocks" : {},
+    }
+
+    def write_block_shard(block):
+        blk_path = block.hierarchicalPath()
+        shard    = os.path.join(shard_dir, "blocks", f"{blk_path}.json")
+        write_json(dump_block_only(block, project), shard)
+        index["blocks"][blk_path] = {
+            "shard"   : shard,
+            "type"    : block.type,
+            "parent"  : block.parent.hierarchicalPath() if isinstance(block.parent, DFBlock) else None,
+            "children": [x.hierarchicalPath() for x in block.children],
+        }
+        for child in block.children:
+            write_block_shard(child)
+
+    # Write out every block, starting from the root blocks
+    blocks = [x for x in project.nodes.values() if isinstance(x, DFBlock)]
+    for block in blocks:
+        index["roots"].append(block.hierarchicalPath())
+        write_block_shard(block)
+
+    # Write out all other nodes as a project of their own
+    nodes = project.nodes
+    try:
+        project.nodes = { k: v for k, v in nodes.items() if not isinstance(v, DFBlock) }
+        write_json(project.dumpObject(), index["project"])
+    finally:
+        project.nodes = nodes
+
+    # Write out the index last, so it is only present once all shards exist
+    with open(path, 'w') as fh:
+        for chunk in encoder.iterencode(index): fh.write(chunk)
+
+def load_shards(path, block_path=None):
+    """
+    Load a DFProject from a sharded blob. Either every root block is loaded, or
+    just the subtree below a single block. When loading a subtree, its ancestors
+    are present only as empty placeholder blocks (with the outermost attached to
+    the project), so that hierarchical paths are the same as in the full design.
+
+    Args:
+        path      : Path to the index of the sharded blob
+        block_path: Hierarchical path of the block to load (optional, by default
+                    the whole design is loaded)
+
+    Returns:
+        DFProject: The reloaded project, holding all interconnects and defines
+                   along with the requested blocks
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, 'r') as fh:
+        index = json.load(fh)
+
+    def read_json(rel_path):
+        with open(os.path.join(base_dir, rel_path), 'r') as fh:
+            return json.load(fh)
+
+    def assemble(blk_path):
+        entry           = index["blocks"][blk_path]
+        obj             = read_json(entry["shard"])
+        obj["children"] = [assemble(x) for x in entry["children"]]
+        return obj
+
+    # Reload interconnects, defines, and any other shared nodes
+    project = DFProject()
+    project.loadObject(read_json(index["project"]))
+
+    # Reload each requested block
+    for blk_path in ([block_path] if block_path else index["roots"]):
+        if blk_path not in index["blocks"]:
+            raise Exception(f"Block {blk_path} is not present in sharded blob {path}")
+        # Build placeholders for the ancestors of the block (outermost first)
+        ancestors = []
+        parent    = index["blocks"][blk_path]["parent"]
+        while parent:
+            ancestors.insert(0, parent)
+            parent = index["blocks"][parent]["parent"]
+        root, holder = None, None
+        for anc_path in ancestors:
+            placeholder = DFBlock(
+                anc_path.split('.')[-1], index["blocks"][anc_path]["type"], holder
+            )
+            if holder: holder.children.append(placeholder)
+            root   = root if root else placeholder
+            holder = placeholder
+        block = DFBlock().loadObject(assemble(blk_path), root)
+        # Attach the outermost block to the project (root blocks are principal)
+        if root:
+            project.addPrincipalNode(root)
+        elif block.getAttribute(DFConstants.ATTRIBUTES.PRINCIPAL):
+            project.addPrincipalNode(block)
+        else:
+            project.addReferenceNode(block)
+    return project
@@ -57,6 +57,11 @@ setup(
         'tqdm',
     ],
     extras_require={
+        "formats": [
+            'zstandard',
+            'msgpack',
+            'cbor2',
+        ],
         "documentation": [
             'sphinx',
             'recommonmark',
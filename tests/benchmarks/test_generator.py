@@ -0,0 +1,68 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import os
+
+import pytest
+
+from benchmarks.generator import SCALES, design_parameters, generate_design
+from blade.project import build_project
+
+from ..common.design import block_paths
+
+## read_design
+#  Read the contents of every file of a generated design
+#
+def read_design(path):
+    contents = {}
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), "r") as fh:
+            contents[name] = fh.read()
+    return contents
+
+## test_parameters
+#  Test that scales and overrides are applied on top of the defaults
+#
+def test_parameters():
+    params = design_parameters("medium", depth=2)
+    assert params["depth"] == 2
+    assert params["registers"] == SCALES["medium"]["registers"]
+    with pytest.raises(Exception, match="Unknown design parameters"):
+        design_parameters(depths=2)
+    with pytest.raises(Exception, match="Unknown design scale"):
+        design_parameters("huge")
+
+## test_deterministic
+#  Test that the same parameters always generate the same design
+#
+def test_deterministic(tmp_path):
+    generate_design(str(tmp_path / "a"), scale="small")
+    generate_design(str(tmp_path / "b"), scale="small")
+    generate_design(str(tmp_path / "c"), scale="small", seed=1)
+    assert read_design(tmp_path / "a") == read_design(tmp_path / "b")
+    assert read_design(tmp_path / "a") != read_design(tmp_path / "c")
+
+## test_builds
+#  Test that the generated designs build (the large scale is left to the
+#  benchmarks, as it takes too long to build here)
+#
+@pytest.mark.parametrize("scale", ["small", "medium"])
+def test_builds(tmp_path, scale):
+    top_file     = generate_design(str(tmp_path), scale=scale)
+    (project, _) = build_project(top_file, includes=[str(tmp_path)], quiet=True)
+    assert len(block_paths(project, top="bench_top")) > 1
@@ -0,0 +1,150 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from blade.__main__ import build_parser, run
+from blade.cache import BuildCache, hash_file
+from blade.writer import load_blob
+
+from ..common.design import DESIGN, normalise, write_design
+
+## cache_for
+#  Create a cache for building 'top.yaml', overriding any of the inputs
+#
+def cache_for(path, defines=None, options=None, top="top.yaml"):
+    return BuildCache(
+        str(path / "cache"), str(path / top), [str(path)],
+        defines if defines != None else { "A": 1 },
+        options if options != None else { "depth": None },
+    )
+
+## test_key_stable
+#  Test that the key is the same when none of the inputs change
+#
+def test_key_stable(tmp_path):
+    write_design(tmp_path)
+    assert cache_for(tmp_path).key == cache_for(tmp_path).key
+
+## test_key_inputs
+#  Test that the key changes along with each of the inputs
+#
+@pytest.mark.parametrize("change", [
+    { "defines": { "A": 2 } },
+    { "defines": {} },
+    { "options": { "depth": 1 } },
+    { "top"    : "mid.yaml" },
+])
+def test_key_inputs(tmp_path, change):
+    write_design(tmp_path)
+    assert cache_for(tmp_path, **change).key != cache_for(tmp_path).key
+
+## test_key_repo_environ
+#  Test that the key changes along with the variables that the source repository
+#  of each block is calculated from
+#
+@pytest.mark.parametrize("name", ["WORK_AREA", "IMPORT_WORK_AREA"])
+def test_key_repo_environ(tmp_path, monkeypatch, name):
+    write_design(tmp_path)
+    monkeypatch.delenv(name, raising=False)
+    key = cache_for(tmp_path).key
+    monkeypatch.setenv(name, str(tmp_path))
+    assert cache_for(tmp_path).key != key
+
+## test_key_available_files
+#  Test that the key changes when a file is added to the included paths, as it
+#  could change how an '#include' is resolved
+#
+def test_key_available_files(tmp_path):
+    write_design(tmp_path)
+    key = cache_for(tmp_path).key
+    (tmp_path / "new.yaml").write_text("")
+    assert cache_for(tmp_path).key != key
+
+## test_lookup
+#  Test that a stored result is found until a file it depends on changes
+#
+def test_lookup(tmp_path):
+    write_design(tmp_path)
+    cache = cache_for(tmp_path)
+    assert cache.lookup() == None
+    (tmp_path / "top.df_blob").write_text("{}")
+    cache.store(
+        str(tmp_path / "top.df_blob"), [str(tmp_path / "his.yaml")],
+        [str(tmp_path / "top.yaml")]
+    )
+    manifest = cache.lookup()
+    assert manifest["deps"] == [str(tmp_path / "top.yaml")]
+    assert manifest["hashes"][str(tmp_path / "his.yaml")] == hash_file(tmp_path / "his.yaml")
+    # Restoring copies the stored blob
+    cache.restore(str(tmp_path / "restored.df_blob"))
+    assert (tmp_path / "restored.df_blob").read_text() == "{}"
+    # Changing a source file makes the result stale
+    (tmp_path / "his.yaml").write_text("- !Def [BUS_W, 8]\n")
+    assert cache.lookup() == None
+
+## test_lookup_environ
+#  Test that a stored result is found until an environment variable it read
+#  changes, including one that was not set when it was stored
+#
+def test_lookup_environ(tmp_path, monkeypatch):
+    write_design(tmp_path)
+    monkeypatch.setenv("BLADE_FLAG", "yes")
+    monkeypatch.delenv("BLADE_UNSET", raising=False)
+    cache = cache_for(tmp_path)
+    (tmp_path / "top.df_blob").write_text("{}")
+    cache.store(
+        str(tmp_path / "top.df_blob"), [], [str(tmp_path / "top.yaml")],
+        { "BLADE_FLAG": "yes", "BLADE_UNSET": None }
+    )
+    assert cache.lookup() != None
+    monkeypatch.setenv("BLADE_UNSET", "1")
+    assert cache.lookup() == None
+    monkeypatch.delenv("BLADE_UNSET")
+    monkeypatch.setenv("BLADE_FLAG", "no")
+    assert cache.lookup() == None
+
+## test_build_environ_miss
+#  Test that changing an environment variable read by the preprocessor causes a
+#  cached build to be run again
+#
+def test_build_environ_miss(tmp_path, monkeypatch):
+    write_design(tmp_path, {
+        **DESIGN,
+        "flag.yaml": """
+#include "his.yaml"
+- !Mod
+  name : flag
+  ports:
+  - !HisRef [din, bus, "In", 1, Slave]
+#if BLADE_FLAG == 2
+  - !HisRef [extra, bus, "Extra", 1, Slave]
+#endif
+""",
+    })
+    argv = [
+        "--quiet", "--include", str(tmp_path), "--top", str(tmp_path / "flag.yaml"),
+        "--output", str(tmp_path / "flag.json"), "--cache-dir", str(tmp_path / "cache"),
+    ]
+    results = []
+    for value in ("2", "3"):
+        monkeypatch.setenv("BLADE_FLAG", value)
+        assert run(build_parser().parse_args(argv)) == 0
+        results.append(str(normalise(load_blob(str(tmp_path / "flag.json")))))
+    assert "extra" in results[0]
+    assert "extra" not in results[1]
@@ -0,0 +1,145 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import json
+
+# A small design with three levels of hierarchy, interconnects, and registers
+DESIGN = {
+    "his.yaml": """
+#define DATA_W 32
+- !Def [BUS_W, 16]
+- !His
+  name : channel
+  ports:
+  - !Port [valid, 1, "Valid", 1, 0, Master]
+  - !Port [ack, 1, "Ack", 1, 0, Slave]
+  - !Port [data, DATA_W, "Data", 1, 0, Master]
+- !His
+  name : bus
+  ports:
+  - !HisRef [tx, channel, "Tx", 1, Master]
+  - !HisRef [rx, channel, "Rx", 1, Slave]
+  - !Port [en, BUS_W, "Enable", 2, 0, Master]
+""",
+    "regs.yaml": """
+- !Group
+  name: ctrl
+  regs:
+  - !Reg
+    name: control
+    array: 4
+    fields:
+    - !Field [enable, 1, 0, U, 0, "Enable"]
+    - !Field [mode, 3, 1, U, 2, "Mode"]
+""",
+    "leaf.yaml": """
+#include "his.yaml"
+#include "regs.yaml"
+- !Mod
+  name : leaf
+  ports:
+  - !HisRef [din, bus, "In", 1, Slave]
+  - !HisRef [dout, bus, "Out", 1, Master]
+""",
+    "mid.yaml": """
+#include "leaf.yaml"
+- !Mod
+  name : mid
+  ports:
+  - !HisRef [din, bus, "In", 1, Slave]
+  - !HisRef [dout, bus, "Out", 1, Master]
+  modules:
+  - !ModInst [leaf_a, leaf, "A", 1]
+  - !ModInst [leaf_b, leaf, "B", 1]
+  connections:
+  - !Connect
+    points:
+    - !Point [din]
+    - !Point [din, leaf_a]
+  - !Connect
+    points:
+    - !Point [dout, leaf_a]
+    - !Point [din, leaf_b]
+  - !Connect
+    points:
+    - !Point [dout, leaf_b]
+    - !Point [dout]
+""",
+    "top.yaml": """
+#include "mid.yaml"
+- !Mod
+  name : top
+  ports:
+  - !HisRef [din, bus, "In", 1, Slave]
+  - !HisRef [dout, bus, "Out", 1, Master]
+  modules:
+  - !ModInst [mid, mid, "Mids", 3]
+  connections:
+  - !Connect
+    points:
+    - !Point [din]
+    - !Point [din, mid_0]
+  - !Connect
+    points:
+    - !Point [dout, mid_0]
+    - !Point [din, mid_1]
+  - !Connect
+    points:
+    - !Point [dout, mid_1]
+    - !Point [din, mid_2]
+  - !Connect
+    points:
+    - !Point [dout, mid_2]
+    - !Point [dout]
+""",
+}
+
+## write_design
+#  Write the files of a design into a directory, returning the directory
+#
+def write_design(path, files=DESIGN):
+    for name, text in files.items():
+        (path / name).write_text(text.lstrip("\n"))
+    return path
+
+## normalise
+#  Convert an elaborated DFProject into a form that can be compared, ignoring
+#  the creation time and the order of the nodes
+#
+def normalise(project):
+    obj = json.loads(json.dumps(project.dumpObject()))
+    obj.pop("created", None)
+    obj["nodes"] = sorted(obj["nodes"], key=lambda x: json.dumps(x, sort_keys=True))
+    return obj
+
+## block_paths
+#  List the hierarchical path of every block below the top of a project
+#
+def block_paths(project, top="top"):
+    paths = []
+    def chase(block):
+        paths.append(block.hierarchicalPath())
+        for child in block.children: chase(child)
+    chase(project.nodes[top])
+    return sorted(paths)
+
+## find_child
+#  Find a child block by name
+#
+def find_child(block, name):
+    return [x for x in block.children if x.id == name][0]
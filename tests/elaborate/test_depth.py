@@ -0,0 +1,60 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from blade.project import build_project
+
+from ..common.design import DESIGN, block_paths, find_child, write_design
+
+## build
+#  Build the test design
+#
+def build(path, **kwargs):
+    (project, _) = build_project(
+        str(path / "top.yaml"), includes=[str(path)], quiet=True, **kwargs
+    )
+    return project
+
+## test_depth
+#  Test that only the requested number of levels are expanded, with the blocks
+#  at the limit still having their boundary IO
+#
+def test_depth(tmp_path):
+    write_design(tmp_path)
+    project = build(tmp_path, max_depth=1)
+    assert block_paths(project) == ["top", "top.mid_0", "top.mid_1", "top.mid_2"]
+    assert len(find_child(project.nodes["top"], "mid_1").getAllPorts()) > 0
+    assert len(block_paths(build(tmp_path, max_depth=2))) == 10
+
+## test_stop_elab
+#  Test that a !Mod carrying 'STOP_ELAB' is never expanded, in the same way as
+#  a block at the depth limit
+#
+def test_stop_elab(tmp_path):
+    write_design(tmp_path)
+    shallow = build(tmp_path, max_depth=1)
+    (tmp_path / "mid.yaml").write_text(DESIGN["mid.yaml"].lstrip("\n").replace(
+        "  name : mid\n", "  name : mid\n  options: [STOP_ELAB]\n"
+    ))
+    project = build(tmp_path)
+    assert block_paths(project) == ["top", "top.mid_0", "top.mid_1", "top.mid_2"]
+    # Options are carried through as attributes, otherwise the blocks are the same
+    for name in ("mid_0", "mid_1", "mid_2"):
+        block = find_child(project.nodes["top"], name)
+        assert block.getAttribute("STOP_ELAB") == True
+        assert [x.dumpObject(project) for x in block.getAllPorts()] == \
+               [x.dumpObject(shallow) for x in find_child(shallow.nodes["top"], name).getAllPorts()]
@@ -0,0 +1,111 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from blade.cache import incremental_key, load_previous_build, store_build_records
+from blade.elaborate.tracker import ElaborationTracker, fingerprint
+from blade.project import build_project, elaborate_project, prepare_project
+from blade.schema import Def
+from blade.writer import write_blob
+
+from ..common.design import DESIGN, normalise, write_design
+
+## build
+#  Build the test design incrementally from the blob of the previous build (if
+#  one exists), writing the blob and records out for the next build
+#
+def build(path):
+    top_file = str(path / "top.yaml")
+    out_file = str(path / "top.df_blob")
+    key      = incremental_key(top_file, { "max_depth": None })
+    tracker  = ElaborationTracker(*load_previous_build(out_file, key))
+    prepared = prepare_project(top_file, includes=[str(path)], quiet=True)
+    (project, _) = elaborate_project(prepared, tracker=tracker)
+    write_blob(project, out_file)
+    store_build_records(out_file, key, tracker.records)
+    return (normalise(project), tracker)
+
+## build_full
+#  Build the test design from scratch
+#
+def build_full(path):
+    (project, _) = build_project(
+        str(path / "top.yaml"), includes=[str(path)], quiet=True
+    )
+    return normalise(project)
+
+## test_fingerprint
+#  Test that fingerprints only change when the contents of a document change
+#
+def test_fingerprint():
+    assert fingerprint(Def("WIDTH", 8)) == fingerprint(Def("WIDTH", 8))
+    assert fingerprint(Def("WIDTH", 8)) != fingerprint(Def("WIDTH", 16))
+    assert fingerprint(Def("WIDTH", 8)) != fingerprint(Def("DEPTH", 8))
+    assert fingerprint(None) != fingerprint(Def("WIDTH", 8))
+
+## test_records
+#  Test that a record is kept for every block of the design
+#
+def test_records(tmp_path):
+    write_design(tmp_path)
+    (_, tracker) = build(tmp_path)
+    assert len(tracker.records) == 10
+    assert "top.mid_1.leaf_b_0" in tracker.records
+
+## test_unchanged
+#  Test that an unchanged design is reused whole
+#
+def test_unchanged(tmp_path):
+    write_design(tmp_path)
+    (first, _)        = build(tmp_path)
+    (second, tracker) = build(tmp_path)
+    assert tracker.reused == ["top"]
+    assert second == first
+
+## test_incremental_matches_full
+#  Test that after an edit, only the affected subtrees are elaborated again and
+#  the result is the same as a full build
+#
+@pytest.mark.parametrize("file,old,new,reused", [
+    # Changing the top only elaborates the top again
+    ("top.yaml", '"Mids", 3', '"Mids", 4', ["top.mid_0", "top.mid_1", "top.mid_2"]),
+    # Changing a leaf elaborates every block again
+    ("leaf.yaml", '"Out", 1', '"Out", 2', []),
+    # Changing registers included by the leaves elaborates every block again
+    ("regs.yaml", "array: 4", "array: 2", []),
+])
+def test_incremental_matches_full(tmp_path, file, old, new, reused):
+    write_design(tmp_path)
+    build(tmp_path)
+    assert old in DESIGN[file]
+    (tmp_path / file).write_text(DESIGN[file].lstrip("\n").replace(old, new))
+    (result, tracker) = build(tmp_path)
+    assert sorted(tracker.reused) == reused
+    assert result == build_full(tmp_path)
+
+## test_changed_blob
+#  Test that the previous build is ignored if its blob has been modified
+#
+def test_changed_blob(tmp_path):
+    write_design(tmp_path)
+    build(tmp_path)
+    (tmp_path / "top.df_blob").write_text("{}")
+    key = incremental_key(str(tmp_path / "top.yaml"), { "max_depth": None })
+    assert load_previous_build(str(tmp_path / "top.df_blob"), key) == (None, None)
+    assert load_previous_build(str(tmp_path / "top.df_blob"), key + "0") == (None, None)
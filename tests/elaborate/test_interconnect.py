@@ -0,0 +1,44 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from designformat import DFInterconnect
+
+from blade.project import BuildSession, build_project
+
+from ..common.design import normalise, write_design
+
+## test_cached_interconnects_not_shared
+#  Test that interconnects cached by the scope are not attached to the projects
+#  of later builds that reuse it
+#
+def test_cached_interconnects_not_shared(tmp_path):
+    write_design(tmp_path)
+    session  = BuildSession()
+    projects = []
+    for top in ("top.yaml", "top.yaml", "his.yaml"):
+        (project, _) = build_project(
+            str(tmp_path / top), includes=[str(tmp_path)], quiet=True,
+            session=session
+        )
+        projects.append(project)
+    for project in projects:
+        intcs = [x for x in project.nodes.values() if isinstance(x, DFInterconnect)]
+        assert len(intcs) > 0
+        for intc in intcs:
+            assert intc.project is project
+    assert normalise(projects[0]) == normalise(projects[1])
@@ -0,0 +1,86 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from designformat import DFBlock
+
+from blade.elaborate.common import ElaboratorScope
+from blade.elaborate.interconnect import build_interconnect
+from blade.project import build_project, prepare_project
+from blade.schema import His, HisRef
+
+from ..common.design import DESIGN, write_design
+
+## fresh_scope
+#  Build a scope holding every document of the design, without any interconnects
+#  cached from an earlier elaboration
+#
+def fresh_scope(path):
+    prepared = prepare_project(str(path / "top.yaml"), includes=[str(path)], quiet=True)
+    scope    = ElaboratorScope()
+    for doc in prepared.all_documents + prepared.intrinsic_docs:
+        if doc.name: scope.add_document(doc)
+    return scope
+
+## undeduplicated_interconnects
+#  List the interconnect types of a project in the same way as elaboration did
+#  before deduplication - one entry for every port of every block, chasing each
+#  entry through its !HisRef components and only then discarding duplicates
+#
+def undeduplicated_interconnects(project, scope):
+    def list_interconnects(block):
+        types = [x.type for x in block.getAllPorts()]
+        for child in block.children:
+            types += list_interconnects(child)
+        return types
+    def chase_his(his_ref):
+        his      = scope.get_document(his_ref, His)
+        sub_his  = [x for x in his.ports if isinstance(x, HisRef)]
+        required = [his] + [scope.get_document(x.ref, His) for x in sub_his]
+        for item in sub_his:
+            required += chase_his(item.ref)
+        return required
+    used_types = []
+    for block in (x for x in project.nodes.values() if isinstance(x, DFBlock)):
+        used_types += list_interconnects(block)
+    all_required = []
+    for his_type in used_types:
+        all_required += chase_his(his_type)
+    return list(set(all_required))
+
+## test_interconnects_deduplicated
+#  Test that a design instantiating the same !Mod many times carries exactly the
+#  interconnects that elaborating every port separately would produce
+#
+def test_interconnects_deduplicated(tmp_path):
+    write_design(tmp_path)
+    assert '"Mids", 3' in DESIGN["top.yaml"]
+    (project, _) = build_project(
+        str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True
+    )
+    scope    = fresh_scope(tmp_path)
+    expected = {
+        x.name: build_interconnect(x, scope).dumpObject(project)
+        for x in undeduplicated_interconnects(project, scope)
+    }
+    found = {
+        k: v.dumpObject(project) for k, v in project.nodes.items()
+        if not isinstance(v, DFBlock)
+    }
+    # Nested types (e.g. 'channel' within 'bus') are included
+    assert "channel" in found
+    assert found == expected
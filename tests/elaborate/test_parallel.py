@@ -0,0 +1,150 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from datetime import datetime
+
+import pytest
+
+from benchmarks.generator import generate_design
+from blade import reporting
+from blade.elaborate import module
+from blade.elaborate.common import ElaboratorScope
+from blade.elaborate.module import SubtreeDispatcher, resolve_instance_path
+from blade.project import build_project, prepare_project
+from blade.reporting import ReportCommon
+from blade.schema import Mod
+
+from ..common.design import normalise, write_design
+
+## small_subtrees
+#  Allow the subtrees of the small test design to be dispatched, however little
+#  time is saved and however many CPUs are available
+#
+@pytest.fixture
+def small_subtrees(monkeypatch):
+    monkeypatch.setattr(SubtreeDispatcher, "MIN_SUBTREE_SIZE", 2)
+    monkeypatch.setattr(SubtreeDispatcher, "MIN_SAVING", float("-inf"))
+    monkeypatch.setattr(module, "available_cpus", lambda: 8)
+
+## prepare_scope
+#  Prepare a design, returning its top !Mod and the scope to elaborate it with
+#
+def prepare_scope(top_file, includes):
+    prepared = prepare_project(top_file, includes=includes, quiet=True)
+    scope    = ElaboratorScope()
+    for doc in prepared.all_documents + prepared.intrinsic_docs:
+        if doc.name: scope.add_document(doc)
+    top = [x for x in prepared.top_docs if isinstance(x, Mod)][0]
+    return (top, scope)
+
+## test_plan_small_design
+#  Test that children of the top are dispatched once large enough
+#
+def test_plan_small_design(tmp_path, small_subtrees):
+    write_design(tmp_path)
+    (top, scope) = prepare_scope(str(tmp_path / "top.yaml"), [str(tmp_path)])
+    planned = SubtreeDispatcher(top, scope, jobs=2).planned
+    assert planned == ["top.mid_0", "top.mid_1", "top.mid_2"]
+
+## test_plan_large_design
+#  Test that the subtrees planned for a large design cover most of it without
+#  overlapping, for any number of jobs
+#
+@pytest.mark.parametrize("jobs", [2, 4, 8, 32])
+def test_plan_large_design(tmp_path, jobs):
+    top_file     = generate_design(str(tmp_path), scale="large")
+    (top, scope) = prepare_scope(top_file, [str(tmp_path)])
+    dispatcher   = SubtreeDispatcher(top, scope, jobs=jobs)
+    planned      = dispatcher.planned
+    assert len(planned) > 0
+    for path in planned:
+        assert not any(path.startswith(x + ".") for x in planned)
+    covered = sum(
+        dispatcher.subtree_size(resolve_instance_path(top, x, scope)) for x in planned
+    )
+    assert covered >= dispatcher.subtree_size(top) // 2
+
+## test_estimated_saving
+#  Test that dispatching to more workers is estimated to save more time, but that
+#  two workers save too little to outweigh reloading every subtree
+#
+def test_estimated_saving(tmp_path):
+    top_file     = generate_design(str(tmp_path), scale="large")
+    (top, scope) = prepare_scope(top_file, [str(tmp_path)])
+    savings      = [SubtreeDispatcher(top, scope, jobs=x).estimated_saving for x in (2, 4, 8)]
+    assert savings == sorted(savings)
+    assert savings[0] < SubtreeDispatcher.MIN_SAVING
+
+## test_parallel_gated
+#  Test that subtrees are elaborated serially when there is only one CPU, or when
+#  too little time would be saved
+#
+@pytest.mark.parametrize("cpus, min_saving", [(1, float("-inf")), (8, 1)])
+def test_parallel_gated(tmp_path, small_subtrees, monkeypatch, cpus, min_saving):
+    write_design(tmp_path)
+    monkeypatch.setattr(module, "available_cpus", lambda: cpus)
+    monkeypatch.setattr(SubtreeDispatcher, "MIN_SAVING", min_saving)
+    started = []
+    monkeypatch.setattr(SubtreeDispatcher, "start", lambda self, pool: started.append(self))
+    (project, _) = build_project(
+        str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True, jobs=4
+    )
+    assert started == []
+    (serial, _) = build_project(str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True)
+    assert normalise(project) == normalise(serial)
+
+## test_parallel_matches_serial
+#  Test that elaborating subtrees in worker processes gives the same design as
+#  elaborating serially
+#
+def test_parallel_matches_serial(tmp_path, small_subtrees):
+    write_design(tmp_path)
+    results = []
+    for jobs in (None, 2):
+        (project, _) = build_project(
+            str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True, jobs=jobs
+        )
+        results.append(normalise(project))
+    assert results[0] == results[1]
+
+## test_parallel_debug_items
+#  Test that debug messages logged by worker processes are kept when the report
+#  is at debug verbosity
+#
+def test_parallel_debug_items(tmp_path, small_subtrees):
+    write_design(tmp_path)
+    shared    = reporting.get_report()
+    verbosity = shared.verbosity
+    shared.verbosity = ReportCommon.DEBUG
+    try:
+        logged = []
+        for jobs in (None, 2):
+            since = datetime.now()
+            build_project(
+                str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True,
+                jobs=jobs
+            )
+            items = shared.export_items(since, verbosity=ReportCommon.DEBUG)
+            logged.append(sorted(
+                x[2] for x in items
+                if x[0].startswith("elaborator") and x[1] == ReportCommon.DEBUG
+            ))
+    finally:
+        shared.verbosity = verbosity
+    assert "Elaborating leaf" in logged[1]
+    assert logged[0] == logged[1]
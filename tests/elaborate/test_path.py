@@ -0,0 +1,70 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from blade.elaborate.common import ElaborationError
+from blade.project import build_project
+
+from ..common.design import block_paths, find_child, write_design
+
+## build
+#  Build the test design
+#
+def build(path, **kwargs):
+    (project, _) = build_project(
+        str(path / "top.yaml"), includes=[str(path)], quiet=True, **kwargs
+    )
+    return project
+
+## test_path
+#  Test that focusing on a block elaborates it fully, with its ancestors only
+#  holding their ports and the next block on the path
+#
+def test_path(tmp_path):
+    write_design(tmp_path)
+    full    = build(tmp_path)
+    project = build(tmp_path, inst_path="top.mid_1")
+    assert block_paths(project) == [
+        "top", "top.mid_1", "top.mid_1.leaf_a_0", "top.mid_1.leaf_b_0"
+    ]
+    top = project.nodes["top"]
+    assert len(top.getAllPorts()) == len(full.nodes["top"].getAllPorts())
+    assert find_child(top, "mid_1").dumpObject(project) == \
+           find_child(full.nodes["top"], "mid_1").dumpObject(full)
+
+## test_path_depth
+#  Test that the depth limit is measured from the focused block
+#
+def test_path_depth(tmp_path):
+    write_design(tmp_path)
+    project = build(tmp_path, inst_path="top.mid_1", max_depth=1)
+    assert block_paths(project) == [
+        "top", "top.mid_1", "top.mid_1.leaf_a_0", "top.mid_1.leaf_b_0"
+    ]
+    project = build(tmp_path, inst_path="top.mid_1", max_depth=0)
+    assert block_paths(project) == ["top", "top.mid_1"]
+
+## test_path_unknown
+#  Test that focusing on a block that doesn't exist is an error
+#
+@pytest.mark.parametrize("inst_path", ["top.mid_3", "mid.leaf_a_0"])
+def test_path_unknown(tmp_path, inst_path):
+    write_design(tmp_path)
+    with pytest.raises(ElaborationError):
+        build(tmp_path, inst_path=inst_path)
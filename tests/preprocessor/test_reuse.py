@@ -0,0 +1,149 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from blade.preprocessor import Preprocessor
+
+# Files shared by each test - 'top.yaml' includes 'shared.yaml', which only
+# declares a field when 'USE_EXTRA' is defined
+FILES = {
+    "shared.yaml": "\n".join([
+        "#define SHARED_W 8",
+        "- !Def [WIDTH, SHARED_W]",
+        "#ifdef USE_EXTRA",
+        "- !Def [EXTRA, 1]",
+        "#endif",
+    ]),
+    "top.yaml": "\n".join([
+        '#include "shared.yaml"',
+        "- !Def [TOP, SHARED_W]",
+    ]),
+}
+
+def write_files(path):
+    for name, text in FILES.items():
+        (path / name).write_text(text + "\n")
+
+def evaluate(path, defines=None, donors=None, changed=None):
+    pre = Preprocessor(donors=donors, changed=changed)
+    pre.add_scope("main", defines=(defines or {}))
+    for name in FILES:
+        pre.add_file("main", path / name)
+    pre.get_scope("main").get_file("top.yaml").evaluate()
+    return pre
+
+def result(pre, name):
+    return [str(x) for x in pre.get_scope("main").get_file(name).get_result()]
+
+## test_referenced_defines
+#  Test that the defines read before being set are recorded against each file
+#
+def test_referenced_defines(tmp_path):
+    write_files(tmp_path)
+    pre    = evaluate(tmp_path)
+    shared = pre.get_scope("main").get_file("shared.yaml")
+    # USE_EXTRA was read while undefined, SHARED_W was set before being read
+    assert shared.referenced_defines["USE_EXTRA"] == None
+    assert "SHARED_W" not in shared.referenced_defines
+    assert pre.referenced_defines["USE_EXTRA"] == None
+    # Every file's result was produced by its own evaluation
+    assert shared.origin != None
+    assert shared.origin is not pre.get_scope("main").get_file("top.yaml").origin
+
+## test_reuse_same_defines
+#  Test that evaluations are reused when every define read has the same value
+#
+def test_reuse_same_defines(tmp_path):
+    write_files(tmp_path)
+    donor = evaluate(tmp_path)
+    pre   = evaluate(tmp_path, donors=[donor])
+    assert len(pre.reused) == 2
+    for name in FILES:
+        assert result(pre, name) == result(donor, name)
+        local = pre.get_scope("main").get_file(name)
+        assert local.origin is donor.get_scope("main").get_file(name).origin
+    # Defines set by the reused evaluation are replayed
+    assert pre.get_scope("main").defines["SHARED_W"] == "8"
+
+## test_reuse_differing_defines
+#  Test that evaluations are not reused when a define read has a different value
+#
+def test_reuse_differing_defines(tmp_path):
+    write_files(tmp_path)
+    donor = evaluate(tmp_path)
+    pre   = evaluate(tmp_path, defines={ "USE_EXTRA": 1 }, donors=[donor])
+    assert pre.reused == []
+    assert result(pre, "top.yaml") != result(donor, "top.yaml")
+    assert result(pre, "top.yaml") == result(evaluate(tmp_path, defines={ "USE_EXTRA": 1 }), "top.yaml")
+
+## test_reuse_several_donors
+#  Test that the first donor with a valid evaluation is used
+#
+def test_reuse_several_donors(tmp_path):
+    write_files(tmp_path)
+    other = evaluate(tmp_path, defines={ "USE_EXTRA": 1 })
+    donor = evaluate(tmp_path)
+    pre   = evaluate(tmp_path, donors=[other, donor])
+    assert len(pre.reused) == 2
+    assert result(pre, "top.yaml") == result(donor, "top.yaml")
+
+## test_reuse_changed_file
+#  Test that evaluations are not reused once a file they read has changed
+#
+def test_reuse_changed_file(tmp_path):
+    write_files(tmp_path)
+    donor = evaluate(tmp_path)
+    (tmp_path / "shared.yaml").write_text("#define SHARED_W 16\n- !Def [WIDTH, SHARED_W]\n")
+    pre = evaluate(tmp_path, donors=[donor], changed=[tmp_path / "shared.yaml"])
+    # Neither file is reused, as 'top.yaml' evaluated the changed file
+    assert pre.reused == []
+    assert "- !Def [TOP, 16]" in result(pre, "top.yaml")
+
+## test_reuse_differing_environ
+#  Test that evaluations are not reused when an environment variable read has a
+#  different value
+#
+@pytest.mark.parametrize("value", ["2", "3"])
+def test_reuse_differing_environ(tmp_path, monkeypatch, value):
+    write_files(tmp_path)
+    (tmp_path / "shared.yaml").write_text("#if BLADE_FLAG == 2\n- !Def [FLAG, 1]\n#endif\n")
+    monkeypatch.setenv("BLADE_FLAG", "2")
+    donor = evaluate(tmp_path)
+    assert donor.referenced_environ == { "BLADE_FLAG": "2" }
+    monkeypatch.setenv("BLADE_FLAG", value)
+    pre = evaluate(tmp_path, donors=[donor])
+    assert len(pre.reused) == (2 if value == "2" else 0)
+    assert pre.referenced_environ == { "BLADE_FLAG": value }
+    assert ("- !Def [FLAG, 1]" in result(pre, "top.yaml")) == (value == "2")
+
+## test_reuse_adopted_environ
+#  Test that the environment variables read by an evaluation are kept when it is
+#  adopted, so that it is checked again when donated on to another build
+#
+@pytest.mark.parametrize("value", ["2", "3"])
+def test_reuse_adopted_environ(tmp_path, monkeypatch, value):
+    write_files(tmp_path)
+    (tmp_path / "shared.yaml").write_text("#if BLADE_FLAG == 2\n- !Def [FLAG, 1]\n#endif\n")
+    monkeypatch.setenv("BLADE_FLAG", "2")
+    adopted = evaluate(tmp_path, donors=[evaluate(tmp_path)])
+    assert len(adopted.reused) == 2
+    monkeypatch.setenv("BLADE_FLAG", value)
+    pre = evaluate(tmp_path, donors=[adopted])
+    assert len(pre.reused) == (2 if value == "2" else 0)
+    assert ("- !Def [FLAG, 1]" in result(pre, "top.yaml")) == (value == "2")
@@ -0,0 +1,113 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from blade import profiling
+from blade.profiling import StatsRegistry, stat_count, stat_timer, start_stats, stop_stats
+from blade.project import build_project
+
+from ..common.design import write_design
+
+## no_stats
+#  Make sure stats are disabled after each test
+#
+@pytest.fixture(autouse=True)
+def no_stats():
+    yield
+    stop_stats()
+
+## test_counters
+#  Test that counters are totalled, and broken down by any keys given
+#
+def test_counters():
+    stats = StatsRegistry()
+    stats.count("lookup", "a")
+    stats.count("lookup", "a", amount=2)
+    stats.count("lookup", "b")
+    stats.count("lookup")
+    summary = stats.to_dict()["counters"]["lookup"]
+    assert summary["total"] == 5
+    assert summary["keys"] == { "a": 3, "b": 1 }
+
+## test_timers
+#  Test that timers record both the number of calls and the time taken
+#
+def test_timers():
+    stats = StatsRegistry()
+    stats.add_time("eval", 0.5, key="x")
+    stats.add_time("eval", 0.25, key="x", calls=3)
+    with stats.timer("eval", key="y"):
+        pass
+    summary = stats.to_dict()["timers"]["eval"]
+    assert summary["total"]["calls"] == 5
+    assert summary["keys"]["x"] == { "calls": 4, "time": 0.75 }
+    assert summary["keys"]["y"]["calls"] == 1
+
+## test_import
+#  Test that stats exported by another process are merged into the totals
+#
+def test_import():
+    stats = StatsRegistry()
+    stats.count("lookup", "a", amount=2)
+    stats.add_time("eval", 0.5)
+    other = StatsRegistry()
+    other.import_stats(stats.export_stats())
+    other.import_stats(stats.export_stats())
+    assert other.to_dict()["counters"]["lookup"]["total"] == 4
+    assert other.to_dict()["timers"]["eval"]["total"] == { "calls": 2, "time": 1.0 }
+
+## test_format
+#  Test that the summary lists the largest keys first, up to the limit
+#
+def test_format():
+    stats = StatsRegistry()
+    for idx in range(5):
+        stats.count("lookup", f"key_{idx}", amount=idx + 1)
+    lines = stats.format(limit=2)
+    assert lines[0] == "STATS: Counters"
+    assert lines[1].split() == ["STATS:", "lookup", "15"]
+    assert lines[2].split() == ["STATS:", "key_4", "5"]
+    assert lines[3].split() == ["STATS:", "key_3", "4"]
+    assert lines[4] == "STATS:     ... and 3 more"
+
+## test_disabled
+#  Test that nothing is recorded unless stats have been started
+#
+def test_disabled():
+    stat_count("lookup")
+    with stat_timer("eval"):
+        pass
+    assert profiling.active_stats == None
+    stats = start_stats()
+    stat_count("lookup")
+    assert stop_stats() is stats
+    stat_count("lookup")
+    assert stats.to_dict()["counters"]["lookup"]["total"] == 1
+
+## test_build_stats
+#  Test that a build counts each block built, and builds each interconnect once
+#
+def test_build_stats(tmp_path):
+    write_design(tmp_path)
+    stats = start_stats()
+    build_project(str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True)
+    summary = stats.to_dict()["counters"]
+    assert summary["elaborate.build_tree"]["keys"] == { "top": 1, "mid": 3, "leaf": 6 }
+    assert summary["scope.interconnect_cache"]["keys"] == { "miss": 4 }
+    assert summary["scope.get_document"]["total"] > 0
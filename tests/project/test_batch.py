@@ -0,0 +1,108 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from blade.__main__ import build_parser, run
+from blade.project import BuildSession, build_project
+from blade.writer import load_blob
+
+from ..common.design import DESIGN, normalise, write_design
+
+# Two top files sharing 'his.yaml', where 'a.yaml' sets a define that would add
+# a port to 'b.yaml' if it leaked between the builds
+BATCH = {
+    **DESIGN,
+    "a.yaml": """
+#include "his.yaml"
+#define USE_EXTRA 1
+- !Mod
+  name : a
+  ports:
+  - !HisRef [din, bus, "In", 1, Slave]
+""",
+    "b.yaml": """
+#include "his.yaml"
+- !Mod
+  name : b
+  ports:
+  - !HisRef [din, bus, "In", 1, Slave]
+#ifdef USE_EXTRA
+  - !HisRef [extra, bus, "Extra", 1, Slave]
+#endif
+""",
+}
+
+def build(path, top, session=None):
+    (project, _) = build_project(
+        str(path / top), includes=[str(path)], quiet=True, session=session
+    )
+    return normalise(project)
+
+## test_batch_matches_standalone
+#  Test that every top file built within a shared session produces the same
+#  result as building it on its own
+#
+def test_batch_matches_standalone(tmp_path):
+    write_design(tmp_path, BATCH)
+    tops    = ["a.yaml", "b.yaml", "top.yaml", "mid.yaml"]
+    session = BuildSession()
+    batch   = { x: build(tmp_path, x, session=session) for x in tops }
+    for top in tops:
+        assert batch[top] == build(tmp_path, top)
+
+## test_batch_defines_isolated
+#  Test that a define set while building one top file doesn't affect another
+#
+def test_batch_defines_isolated(tmp_path):
+    write_design(tmp_path, BATCH)
+    session = BuildSession()
+    build(tmp_path, "a.yaml", session=session)
+    result  = build(tmp_path, "b.yaml", session=session)
+    assert "extra" not in str(result)
+
+## test_batch_reuses_evaluations
+#  Test that files shared between top files are only evaluated and validated once
+#
+def test_batch_reuses_evaluations(tmp_path):
+    write_design(tmp_path, BATCH)
+    session = BuildSession()
+    build(tmp_path, "top.yaml", session=session)
+    validated = len(session.validated)
+    build(tmp_path, "mid.yaml", session=session)
+    # Every file included by 'mid.yaml' was evaluated the same way for 'top.yaml'
+    # NOTE: The two intrinsic files are never evaluated
+    pre = list(session.preprocessors.values())[-1]
+    assert len(pre.reused) == len(pre.get_all_evaluated_files()) - 2
+    assert len(session.validated) == validated
+
+## test_parallel_batch
+#  Test that building the top files of a batch in worker processes gives the
+#  same results as building them one after another
+#
+def test_parallel_batch(tmp_path):
+    write_design(tmp_path, BATCH)
+    tops    = ["a.yaml", "b.yaml", "top.yaml"]
+    results = []
+    for jobs in ("1", "2"):
+        argv = ["--quiet", "--include", str(tmp_path), "--jobs", jobs]
+        for top in tops:
+            argv += ["--top", str(tmp_path / top), "--output", str(tmp_path / f"{top}.{jobs}.json")]
+        assert run(build_parser().parse_args(argv)) == 0
+        results.append([
+            normalise(load_blob(str(tmp_path / f"{x}.{jobs}.json"))) for x in tops
+        ])
+    assert results[0] == results[1]
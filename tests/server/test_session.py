@@ -0,0 +1,140 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from blade.project import build_project
+from blade.schema import His
+from blade.server import BuildServer
+
+from ..common.design import DESIGN, normalise, write_design
+
+def build(server, path, top="top.yaml"):
+    session = server.get_session([str(path / top)], [str(path)], {})
+    (project, _) = build_project(
+        str(path / top), includes=[str(path)], quiet=True, session=session
+    )
+    server.finish_session(session, success=True)
+    return (session, normalise(project))
+
+def standalone(path, top="top.yaml"):
+    (project, _) = build_project(str(path / top), includes=[str(path)], quiet=True)
+    return normalise(project)
+
+## test_session_reused
+#  Test that a session is reused as it is while no file has changed
+#
+def test_session_reused(tmp_path):
+    write_design(tmp_path)
+    server       = BuildServer()
+    (first, _)   = build(server, tmp_path)
+    (second, _)  = build(server, tmp_path)
+    assert first is second
+
+## test_session_replaced
+#  Test that when a file changes, only that file and the files depending on it
+#  are evaluated and validated again - and the result matches a fresh build
+#
+def test_session_replaced(tmp_path):
+    write_design(tmp_path)
+    server          = BuildServer()
+    (first, _)      = build(server, tmp_path)
+    his_docs        = [
+        x for x in first.validated if isinstance(x, His) and x.source.path.endswith("his.yaml")
+    ]
+    (tmp_path / "leaf.yaml").write_text(
+        DESIGN["leaf.yaml"].replace('"Out", 1, Master', '"Out", 2, Master').lstrip("\n")
+    )
+    (second, result) = build(server, tmp_path)
+    assert second is not first
+    assert result == standalone(tmp_path)
+    # Only the files that don't include 'leaf.yaml' are reused
+    pre    = list(second.preprocessors.values())[0]
+    reused = sorted(x.path.split("/")[-1] for x in pre.reused)
+    assert reused == ["his.yaml", "regs.yaml"]
+    # Documents from the unchanged files are taken over along with their validation
+    assert len(his_docs) == 2
+    for doc in his_docs:
+        assert doc in second.validated
+        assert doc.source is pre.get_scope("main").get_file("his.yaml")
+
+## test_session_added_file
+#  Test that adding a file to the includes replaces the session
+#
+def test_session_added_file(tmp_path):
+    write_design(tmp_path)
+    server     = BuildServer()
+    (first, _) = build(server, tmp_path)
+    (tmp_path / "extra.yaml").write_text("- !Def [EXTRA, 1]\n")
+    (second, result) = build(server, tmp_path)
+    assert second is not first
+    assert result == standalone(tmp_path)
+
+## test_session_environ_changed
+#  Test that a session is replaced when an environment variable read by the
+#  preprocessor changes, and that the result matches a fresh build
+#
+def test_session_environ_changed(tmp_path, monkeypatch):
+    write_design(tmp_path, {
+        **DESIGN,
+        "regs.yaml": "#if BLADE_FLAG == 2\n" + DESIGN["regs.yaml"] + "#endif\n",
+    })
+    monkeypatch.setenv("BLADE_FLAG", "2")
+    server     = BuildServer()
+    (first, _) = build(server, tmp_path)
+    assert build(server, tmp_path)[0] is first
+    monkeypatch.setenv("BLADE_FLAG", "3")
+    (second, result) = build(server, tmp_path)
+    assert second is not first
+    assert result == standalone(tmp_path)
+    assert "control" not in str(result)
+    # Only the files that don't include 'regs.yaml' are reused
+    pre    = list(second.preprocessors.values())[0]
+    reused = sorted(x.path.split("/")[-1] for x in pre.reused)
+    assert reused == ["his.yaml"]
+
+## test_session_repo_environ
+#  Test that a separate session is kept for each value of the variables that the
+#  source repository of each block is calculated from
+#
+def test_session_repo_environ(tmp_path, monkeypatch):
+    write_design(tmp_path)
+    monkeypatch.delenv("WORK_AREA", raising=False)
+    server     = BuildServer()
+    (first, _) = build(server, tmp_path)
+    monkeypatch.setenv("WORK_AREA", str(tmp_path.parent))
+    (second, result) = build(server, tmp_path)
+    assert second is not first
+    assert result == standalone(tmp_path)
+    assert len(server.sessions) == 2
+
+## test_sessions_bounded
+#  Test that only the most recently used sessions are kept
+#
+def test_sessions_bounded(tmp_path, monkeypatch):
+    write_design(tmp_path)
+    monkeypatch.setattr(BuildServer, "MAX_SESSIONS", 2)
+    server   = BuildServer()
+    sessions = [
+        server.get_session([str(tmp_path / "top.yaml")], [str(tmp_path)], { "SKU": x })
+        for x in range(3)
+    ]
+    assert len(server.sessions) == 2
+    # Using the oldest remaining session keeps it over the newest
+    assert server.get_session([str(tmp_path / "top.yaml")], [str(tmp_path)], { "SKU": 1 }) is sessions[1]
+    server.get_session([str(tmp_path / "top.yaml")], [str(tmp_path)], { "SKU": 3 })
+    kept = [x.session for x in server.sessions.values()]
+    assert sessions[1] in kept and sessions[2] not in kept
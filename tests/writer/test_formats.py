@@ -0,0 +1,67 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import json
+
+import pytest
+
+from blade.project import build_project
+from blade.writer import FORMATS, detect_format, load_blob, write_blob
+
+from ..common.design import normalise, write_design
+
+## test_detect_format
+#  Test that formats are chosen from the extension, falling back to plain JSON
+#
+@pytest.mark.parametrize("path,fmt", [
+    ("top.df_blob"        , "json"    ),
+    ("top.df_blob.gz"     , "json.gz" ),
+    ("top.df_blob.ZST"    , "json.zst"),
+    ("top.df_blob.mpk"    , "msgpack" ),
+    ("top.df_blob.msgpack", "msgpack" ),
+    ("top.df_blob.cbor"   , "cbor"    ),
+])
+def test_detect_format(path, fmt):
+    assert detect_format(path) == fmt
+
+## test_format_round_trip
+#  Test that a project written in each format reloads to the same design
+#
+@pytest.mark.parametrize("fmt", list(FORMATS.keys()))
+def test_format_round_trip(tmp_path, fmt):
+    if FORMATS[fmt]["package"]:
+        pytest.importorskip(FORMATS[fmt]["package"])
+    write_design(tmp_path)
+    (project, _) = build_project(
+        str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True
+    )
+    path = str(tmp_path / "top.df_blob")
+    write_blob(project, path, fmt=fmt)
+    assert normalise(load_blob(path, fmt=fmt)) == normalise(project)
+
+## test_json_matches_dump
+#  Test that the streamed JSON blob is the same as dumping the whole project
+#
+def test_json_matches_dump(tmp_path):
+    write_design(tmp_path)
+    (project, _) = build_project(
+        str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True
+    )
+    write_blob(project, str(tmp_path / "top.df_blob"))
+    with open(tmp_path / "top.df_blob", "r") as fh:
+        assert json.load(fh) == json.loads(json.dumps(project.dumpObject()))
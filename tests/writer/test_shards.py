@@ -0,0 +1,89 @@
+# Copyright (C) 2019 Blu Wireless Ltd.
+# All Rights Reserved.
+#
+# This file is part of BLADE.
+#
+# BLADE is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# BLADE is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# BLADE.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import json
+
+import pytest
+
+from designformat import DFBlock
+
+from blade.project import build_project
+from blade.writer import load_shards, write_shards
+
+from ..common.design import normalise, write_design
+
+## sharded
+#  Build the test design and write it out as shards, returning the project and
+#  the path to the index
+#
+@pytest.fixture
+def sharded(tmp_path):
+    write_design(tmp_path)
+    (project, _) = build_project(
+        str(tmp_path / "top.yaml"), includes=[str(tmp_path)], quiet=True
+    )
+    index = str(tmp_path / "top.df_index")
+    write_shards(project, index)
+    return (project, index)
+
+## test_shard_index
+#  Test that the index lists every block along with its parent and children
+#
+def test_shard_index(sharded):
+    (_, index) = sharded
+    with open(index, "r") as fh:
+        blocks = json.load(fh)["blocks"]
+    assert len(blocks) == 10
+    assert blocks["top"]["parent"] == None
+    assert blocks["top"]["children"] == ["top.mid_0", "top.mid_1", "top.mid_2"]
+    assert blocks["top.mid_1.leaf_b_0"]["parent"] == "top.mid_1"
+    assert blocks["top.mid_1.leaf_b_0"]["children"] == []
+
+## test_shard_round_trip
+#  Test that loading every shard gives the same design as was written
+#
+def test_shard_round_trip(sharded):
+    (project, index) = sharded
+    assert normalise(load_shards(index)) == normalise(project)
+
+## test_shard_subtree
+#  Test that loading a single subtree keeps its hierarchical paths, with only
+#  placeholders for its ancestors
+#
+def test_shard_subtree(sharded):
+    (project, index) = sharded
+    loaded = load_shards(index, block_path="top.mid_1")
+    roots  = [x for x in loaded.nodes.values() if isinstance(x, DFBlock)]
+    assert [x.id for x in roots] == ["top"]
+    assert [x.id for x in roots[0].children] == ["mid_1"]
+    assert roots[0].getAllPorts() == []
+    block    = roots[0].children[0]
+    original = [x for x in project.nodes["top"].children if x.id == "mid_1"][0]
+    assert block.hierarchicalPath() == "top.mid_1"
+    assert block.dumpObject(loaded) == original.dumpObject(project)
+    # Interconnects are loaded along with the subtree
+    assert set(x for x in loaded.nodes if x != "top") == \
+           set(x for x in project.nodes if x != "top")
+
+## test_shard_missing_block
+#  Test that requesting a block that isn't present raises an error
+#
+def test_shard_missing_block(sharded):
+    (_, index) = sharded
+    with pytest.raises(Exception, match="not present"):
+        load_shards(index, block_path="top.mid_3")